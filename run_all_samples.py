@@ -3,42 +3,71 @@
 @brief Runs the solver on all available samples.
 
 @details Runs the solver on all available samples. Used for determining success
-in different situations, as well as for profiling.
+in different situations, as well as for profiling. The samples are solved in parallel
+by a pool of worker processes, whose number and chunk size can be passed as arguments.
+With a result cache, only the puzzles without a stored result for the configuration are solved.
 
 @author Created by I. Petrov on 26/11/2023
 """
+import argparse
 import glob
-import io
-import sys
+import time
 
-from src.solver.solver import SudokuSolver
+from src.solver.corpus import run_corpus, summarize
+from src.solver.result_cache import ResultCache
 
 from src.logic.backtracking import SelectiveBacktracker
 from src.logic.singles_logic import ObviousSingles, HiddenSingles
 from src.logic.complex_logic import HiddenPointers, ObviousPairs
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the solver on all samples.")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Number of worker processes."
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=None, help="Files sent to a worker at once."
+    )
+    parser.add_argument(
+        "--cache", default=None, help="Path of an SQLite cache of results to reuse."
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=100000, help="Results kept in the cache."
+    )
+    args = parser.parse_args()
+
     step_list = [ObviousSingles, HiddenSingles, HiddenPointers, ObviousPairs]
     backtracker = SelectiveBacktracker
-    visualization = "none"
-    for directory in ["easy", "medium", "hard", "impossible", "many_solutions"]:
-        total = 0
-        success = 0
-        # Disabling printing
-        text_trap = io.StringIO()
-        sys.stdout = text_trap
-
-        # Get all sample files.
-        for path in glob.glob(f"./test/samples/{directory}/*.txt"):
-            solver = SudokuSolver(path, step_list, backtracker, visualization)
-            result = solver.run()
-            if result:
-                success += 1
-            total += 1
-
-        # Reenabling printing
-        sys.stdout = sys.__stdout__
+    directories = ["easy", "medium", "hard", "impossible", "many_solutions"]
+
+    # Get all sample files.
+    paths = []
+    for directory in directories:
+        paths += glob.glob(f"./test/samples/{directory}/*.txt")
+
+    cache = None
+    if args.cache is not None:
+        cache = ResultCache(args.cache, max_entries=args.cache_size)
+
+    start = time.perf_counter()
+    results = run_corpus(
+        paths,
+        step_list,
+        backtracker,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        cache=cache,
+    )
+    elapsed = time.perf_counter() - start
 
+    summary = summarize(results)
+    for directory in directories:
+        success, total, duration = summary[directory]
         print(
-            f"Solved {success} / {total} ({100*success/total:.2f}%) {directory} puzzles."
+            f"Solved {success} / {total} ({100*success/total:.2f}%) {directory} puzzles"
+            f" in {duration:.2f}s."
         )
+    print(f"Solved {len(results)} puzzles in {elapsed:.2f}s.")
+    if cache is not None:
+        print(f"Reused {cache.hits} cached results.")
+        cache.close()
@@ -0,0 +1,76 @@
+"""!@file run_service.py
+
+@brief Runs the local solving service.
+
+@details Runs the local solving service, listening on a Unix socket or a localhost TCP port
+for requests of its line-delimited JSON protocol, which is described in src/solver/service.py.
+The service runs until it is interrupted.
+"""
+import argparse
+import asyncio
+
+from src.solver.service import SolverService
+
+
+async def main(args: argparse.Namespace) -> None:
+    """! Starts the service and serves clients until interrupted.
+
+    @param args - The parsed command line arguments.
+    """
+    service = SolverService(
+        workers=args.workers,
+        max_pending=args.max_pending,
+        timeout=args.timeout,
+        max_queued=args.max_queued,
+    )
+    try:
+        server = await service.serve(path=args.socket, host=args.host, port=args.port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Listening on {addresses}.")
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the local solving service.")
+    parser.add_argument(
+        "--socket", default=None, help="Path of a Unix socket to listen on."
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="Host to listen on, if no socket is given."
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Port to listen on, if no socket is given.",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Number of worker processes."
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=None,
+        help="Requests solved or queued at once.",
+    )
+    parser.add_argument(
+        "--max-queued",
+        type=int,
+        default=None,
+        help="Unanswered requests of a single client.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Default time limit of a request in seconds.",
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
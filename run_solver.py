@@ -2,24 +2,35 @@
 @brief A script for solving a sudoku board.
 
 @details A script for solving a sudoku board. Currently accepts only
-input in the form of a 9x9 or 11x11 board.
+input in the form of a 9x9 or 11x11 board. With a result cache (--cache), a stored result
+of the same board and configuration is reused instead of solving, unless a visualization is requested.
 
 @author Created by I. Petrov on 26/11/2023
 """
+import argparse
 import os
-import sys
+import time
 import src.parsing.config_parsing as cfg_parse
+from src.solver.board import Board
 from src.solver.solver import SudokuSolver
+from src.solver.result_cache import ResultCache
 from src.logic.backtracking import SelectiveBacktracker
 from src.logic.singles_logic import ObviousSingles, HiddenSingles
 from src.logic.complex_logic import HiddenPointers, ObviousPairs
 
 if __name__ == "__main__":
-    if len(sys.argv) == 1:
+    parser = argparse.ArgumentParser(description="Solves a sudoku board.")
+    parser.add_argument("path", nargs="?", help="Configuration or sudoku file.")
+    parser.add_argument(
+        "--cache", default=None, help="Path of an SQLite cache of results to reuse."
+    )
+    args = parser.parse_args()
+
+    if args.path is None:
         print("No configuration passed - terminating.")
         exit(1)
 
-    path = sys.argv[1]
+    path = args.path
 
     step_list = [ObviousSingles, HiddenSingles, HiddenPointers, ObviousPairs]
     backtracker = SelectiveBacktracker
@@ -65,13 +76,52 @@ if __name__ == "__main__":
             print(f"Could not create folder {os.path.dirname(output_path)}")
             exit(1)
 
-    success = solver.run(animation_path=animation_path)
+    # Reuse a stored result, unless the solving steps should be visualized.
+    cache, key, stored = None, None, None
+    if (
+        args.cache is not None
+        and visualization == "none"
+        and solver.is_solvable is None
+    ):
+        cache = ResultCache(args.cache)
+        key = cache.make_key(solver.board.board, step_list, backtracker)
+        stored = cache.get(key)
+
+    if stored is not None:
+        solvable, solution, n_steps, duration = stored
+        print(f"Reusing the cached result of {n_steps} steps, taking {duration:.3f}s.")
+        success = solution is not None
+        if success:
+            solution = Board(solution)
+            print("Solution found:")
+            print(solution)
+        else:
+            print(
+                "The board has no solution"
+                if solvable is False
+                else "Could not find solution."
+            )
+    else:
+        start = time.perf_counter()
+        success = solver.run(animation_path=animation_path)
+        duration = time.perf_counter() - start
+        solution = solver.get_solution() if success else None
+
+        if cache is not None:
+            solvable = (
+                True if success else (False if solver.is_solvable is False else None)
+            )
+            board = solution.board if success else None
+            cache.put(key, solvable, board, solver.n_steps, duration)
+
+    if cache is not None:
+        cache.close()
 
     # Print solution upon reaching it.
     if success and output_path is not None:
         try:
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            output_str = str(solver.get_solution())
+            output_str = str(solution)
             with open(output_path, "w") as f:
                 f.write(output_str)
         except OSError:
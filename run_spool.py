@@ -0,0 +1,84 @@
+"""!@file run_spool.py
+
+@brief Runs the solver over the samples on several machines through a shared spool directory.
+
+@details Runs the solver over the samples on several machines through a shared spool directory,
+as described in src/solver/spool.py. The "split" command creates the jobs of a spool, the "work" command
+runs worker processes on the current machine until all jobs are solved, and the "merge" command
+combines the result shards into a report and prints a summary.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+
+from src.solver.corpus import summarize
+from src.solver.spool import split_corpus, run_worker, merge_results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solves the samples through a spool.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    split = commands.add_parser("split", help="Splits the samples into jobs.")
+    split.add_argument("spool", help="Path of the spool directory.")
+    split.add_argument(
+        "--directories",
+        nargs="+",
+        default=["easy", "medium", "hard", "impossible", "many_solutions"],
+        help="Sample directories to solve.",
+    )
+    split.add_argument(
+        "--logic",
+        default='["ObviousSingles", "HiddenSingles", "HiddenPointers", "ObviousPairs"]',
+        help="JSON list of logic rules.",
+    )
+    split.add_argument(
+        "--backtracker", default="SelectiveBacktracker", help="Backtracking algorithm."
+    )
+    split.add_argument("--jobsize", type=int, default=16, help="Boards per job.")
+
+    work = commands.add_parser("work", help="Solves jobs until all are done.")
+    work.add_argument("spool", help="Path of the spool directory.")
+    work.add_argument(
+        "--processes", type=int, default=1, help="Number of worker processes."
+    )
+    work.add_argument(
+        "--lease", type=float, default=60.0, help="Lease timeout of a job in seconds."
+    )
+    work.add_argument(
+        "--poll", type=float, default=1.0, help="Seconds between checks for jobs."
+    )
+
+    merge = commands.add_parser("merge", help="Merges the results into a report.")
+    merge.add_argument("spool", help="Path of the spool directory.")
+    merge.add_argument("--report", default=None, help="Path of the JSON report.")
+    args = parser.parse_args()
+
+    if args.command == "split":
+        paths = []
+        for directory in args.directories:
+            paths += sorted(glob.glob(f"./test/samples/{directory}/*.txt"))
+        n_jobs = split_corpus(
+            paths, args.spool, json.loads(args.logic), args.backtracker, args.jobsize
+        )
+        print(f"Split {len(paths)} puzzles into {n_jobs} jobs.")
+    elif args.command == "work":
+        workers = [
+            multiprocessing.Process(
+                target=run_worker,
+                args=(args.spool,),
+                kwargs={"lease": args.lease, "poll": args.poll},
+            )
+            for _ in range(args.processes)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    else:
+        results = merge_results(args.spool, args.report)
+        for directory, (success, total, duration) in summarize(results).items():
+            print(
+                f"Solved {success} / {total} ({100*success/total:.2f}%) {directory} puzzles"
+                f" in {duration:.2f}s."
+            )
@@ -9,7 +9,6 @@ a naive backtracking algorithm, which guesses arbitrarily.
 from src.logic.base_logic import BaseBacktracker
 from src.exceptions import InvalidBoardException
 from src.solver.board import Board
-import copy
 import numpy as np
 
 
@@ -42,11 +41,7 @@ class NaiveBacktracker(BaseBacktracker):
                     num = next(iter(cell_possibilities[i, j]))
 
                     # Store the previous board state
-                    self.board_memory.append(board.board.copy())
-                    self.cell_pos_memory.append(
-                        copy.deepcopy(board.get_possibilities())
-                    )
-                    self.guess_memory.append((i, j, num))
+                    self.remember(board, (i, j, num))
                     
                     # Update the board based on the guess
                     board.update(i, j, num)
@@ -59,13 +54,16 @@ class NaiveBacktracker(BaseBacktracker):
 class SelectiveBacktracker(BaseBacktracker):
     """! A class for improved selection backtracking."""
 
-    def __init__(self, print_results: bool = False):
+    def __init__(self, print_results: bool = False, seed: int = None):
         """! Creates a selective backtracker.
 
         @param print_results - A configuration parameter on whether to print the step results.
+        @param seed - If given, ties between the best cells and the guessed value are chosen randomly
+        with this seed, instead of taking the first ones.
         """
         super(SelectiveBacktracker, self).__init__(print_results)
         self.name = "SelectiveBacktracker"
+        self.seed = seed
 
     def step(self, board):
         """! Attempts to make progress on the board. Attempts to guess a possibility on the most
@@ -82,20 +80,26 @@ class SelectiveBacktracker(BaseBacktracker):
             (n_possibilities == 1) & (board.board != 0), 10, n_possibilities
         )
 
-        # Get the indeces of the best cell.
-        i, j = np.unravel_index(n_possibilities.argmin(), (9, 9))
+        # Get the indeces of the best cell. The random generator belongs to the solve, not the backtracker.
+        rng = None if self.seed is None else board.context.get_generator(self, self.seed)
+        if rng is None:
+            i, j = np.unravel_index(n_possibilities.argmin(), (9, 9))
+        else:
+            best = np.flatnonzero(n_possibilities == n_possibilities.min())
+            i, j = np.unravel_index(rng.choice(best), (9, 9))
 
         # If there is a cell with no possibilities, report the error.
         if len(board.cell_possibilities[i, j]) == 0:
             raise InvalidBoardException("No option for number selection")
 
         
-        num = next(iter(board.cell_possibilities[i, j]))
+        if rng is None:
+            num = next(iter(board.cell_possibilities[i, j]))
+        else:
+            num = int(rng.choice(sorted(board.cell_possibilities[i, j])))
         
         # Store previous state in memory
-        self.board_memory.append(board.board.copy())
-        self.cell_pos_memory.append(copy.deepcopy(board.cell_possibilities))
-        self.guess_memory.append((i, j, num))
+        self.remember(board, (i, j, num))
         
         # Update the board with the new guess.
         board.update(i, j, num)
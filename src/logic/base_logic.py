@@ -7,6 +7,7 @@ a generic backtracker class.
 @author Created by I. Petrov on 26/11/2023
 """
 
+import numpy as np
 from src.solver.board import Board
 from src.exceptions import InvalidBoardException
 
@@ -36,8 +37,8 @@ class BaseLogic:
                 f"Found Number {num} at coordinate "
                 + f"{row}, {col} with method {self.name}"
             )
-            print(msg)
-            print(board)
+            board.context.log(msg)
+            board.context.log(board)
 
     def step(self, board: Board) -> bool:
         """! Attempts to make progress on the board. For the base class, this does nothing.
@@ -58,21 +59,50 @@ class BaseBacktracker(BaseLogic):
         """
         super(BaseBacktracker, self).__init__(print_results)
         self.name = "BaseBacktracker"
-        self.board_memory = []
-        self.guess_memory = []
-        self.cell_pos_memory = []
+
+    def remember(self, board: Board, guess: tuple) -> None:
+        """! Stores the board state in the memory of the solve before making a guess.
+
+        @param board - The board container, before the guess is made.
+        @param guess - The row, column and value of the guess.
+        """
+        context = board.context
+        context.board_memory.append(board.board.copy())
+        context.cell_pos_memory.append(
+            np.array([[set(cell) for cell in row] for row in board.cell_possibilities])
+        )
+        context.applied_memory.append(board.applied.copy())
+        context.guess_memory.append(guess)
 
     def backtrack(self, board: Board) -> None:
-        """! Restores the previous valid board state.
+        """! Restores the previous valid board state. If the restored state is symmetric, the guesses
+        equivalent to the last one are removed as well, as they must also fail.
+        The memory of the guesses is kept in the solve context of the board.
         @param board - The board container to modify.
         @throws InvalidBoardException - If we are at the root of the backtracking list
         - likely meaning the board has no solution.
         """
-        if len(self.board_memory) == 0:
+        context = board.context
+        if len(context.board_memory) == 0:
             raise InvalidBoardException("No backtracking to be undone.")
         # Recover state from memory
-        board.board = self.board_memory.pop(-1)
-        board.cell_possibilities = self.cell_pos_memory.pop(-1)
-        last_guess = self.guess_memory.pop(-1)
+        board.restore(
+            context.board_memory.pop(-1),
+            context.cell_pos_memory.pop(-1),
+            context.applied_memory.pop(-1),
+        )
+        last_guess = context.guess_memory.pop(-1)
+
+        # Find the images of the last guess under the symmetries of the restored state.
+        equivalent_guesses = []
+        if len(board.automorphisms) > 0:
+            values = board.board.flatten()
+            possibilities = board.get_candidate_tensor().reshape(9, 81)
+            for automorphism in board.automorphisms:
+                if automorphism.preserves(values, possibilities):
+                    equivalent_guesses.append(automorphism.map_guess(*last_guess))
+
         # Remove last guess from memory
-        board.cell_possibilities[last_guess[0], last_guess[1]].discard(last_guess[2])
+        board.eliminate(last_guess[0], last_guess[1], {last_guess[2]})
+        for row, col, num in equivalent_guesses:
+            board.eliminate(row, col, {num})
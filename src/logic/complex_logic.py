@@ -1,16 +1,67 @@
 """!@file complex_logic.py
 @brief Logic components that operate on multiple cells.
 
-@details Logic components that operate on multiple cells. Currently includes the Hidden pointers rule.
+@details Logic components that operate on multiple cells. Currently includes the Hidden pointers,
+Obvious pairs, Obvious subsets, Hidden subsets and Box-line reduction rules.
 
 @author Created by I. Petrov on 28/11/2023
 """
+from itertools import combinations
 from src.logic.base_logic import BaseLogic
-from src.solver.board import Board
+from src.solver.board import (
+    Board,
+    HOUSES,
+    HOUSE_ROWS,
+    HOUSE_COLS,
+    CELL_HOUSES,
+    get_house_name,
+    mask_to_possibilities,
+)
+from src.exceptions import InvalidBoardException
 import numpy as np
 from typing import Tuple, Set
 
 
+def get_intersection_tables() -> (
+    Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+):
+    """! Computes the tables of the 54 intersections between a line (the 9 rows, followed by
+    the 9 columns) and a block. All cells are given by their flattened index.
+
+    @return A tuple containing, for each intersection, the index of the line (as in HOUSES), the index
+    of the block, the 3 shared cells, the 6 remaining cells of the line, and the 6 remaining cells of the block.
+    """
+    lines, blocks, shared, line_rest, block_rest = [], [], [], [], []
+    for line in range(18):
+        for block_pos in range(3):
+            # Rows intersect the blocks of their band, columns the blocks of their stack.
+            if line < 9:
+                block = 3 * (line // 3) + block_pos
+            else:
+                block = 3 * block_pos + (line - 9) // 3
+            line_cells = [9 * row + col for row, col in HOUSES[line]]
+            block_cells = [9 * row + col for row, col in HOUSES[18 + block]]
+
+            lines.append(line)
+            blocks.append(block)
+            shared.append([cell for cell in line_cells if cell in block_cells])
+            line_rest.append([cell for cell in line_cells if cell not in block_cells])
+            block_rest.append([cell for cell in block_cells if cell not in line_cells])
+
+    return tuple(
+        np.array(table) for table in (lines, blocks, shared, line_rest, block_rest)
+    )
+
+
+(
+    INTERSECTION_LINES,
+    INTERSECTION_BLOCKS,
+    INTERSECTION_CELLS,
+    LINE_REST_CELLS,
+    BLOCK_REST_CELLS,
+) = get_intersection_tables()
+
+
 class HiddenPointers(BaseLogic):
     """! A class implementing the detction of the Hidden pointers rule."""
 
@@ -22,100 +73,53 @@ class HiddenPointers(BaseLogic):
         super(HiddenPointers, self).__init__(print_results)
         self.name = "HiddenPointers"
 
-        # Keep memory of detected pointers, so as to not repeat actions.
-        self.applied_pointers = [set() for _ in range(9)]
-
-    def print_msg(self, find_type: str, idx: int, num: int):
+    def print_msg(self, find_type: str, idx: int, num: int, board: Board):
         """! Prints the finding of the logic rule if text-based reporting is allowed.
 
         @param find_type - Whether the signal was found in a column, row or block.
         @param idx - The index of the row, column or block.
         @param num - The value of the signal found.
+        @param board - The board on which the finding was made.
         """
         if self.print_results:
-            print(f"Found hidden pointer of number {num} in {find_type} {idx + 1}.")
-
-    def __check_block(self, block: int, num: int) -> Tuple[str, int]:
-        """! Private method for checking a block for a given signal.
-
-        @param block - The values of the block.
-        @param num - The value of the signal to be checked.
-
-        @return A pair of values - one for the finding type - row or column. The second is the index of the
-        relevant row/column. If there is no signal, the first value of the tuple is None.
-        """
-        has_num = np.array([[num in cell for cell in row] for row in block])
-
-        in_col = np.sum(has_num, axis=0)
-        # To avoid re-computation
-        max_col = in_col.argmax()
-        if np.count_nonzero(in_col) == 1 and in_col[max_col] != 1:
-            return "column", max_col
-
-        in_row = np.sum(has_num, axis=1)
-        # To avoid re-computation
-        max_row = in_row.argmax()
-        if np.count_nonzero(in_row) == 1 and in_row[max_row] != 1:
-            return "row", max_row
-
-        return None, 0
-
-    def __clean_row(self, board: Board, row: int, block_col: int, num: int):
-        """! Removes the possibilities from the given row.
-
-        @param board - The current board state.
-        @param row - The index of the row.
-        @param block_col - The column index of the block. All values within the block will be ignored.
-        @param num - The value of the signal found"""
-        for i in range(9):
-            if i // 3 != block_col:
-                board.cell_possibilities[row, i].discard(num)
-
-    def __clean_col(self, board: Board, col: int, block_row: int, num: int):
-        """! Removes the possibilities from the given column.
-
-        @param board - The current board state.
-        @param row - The index of the column.
-        @param block_col - The row index of the block. All values within the block will be ignored.
-        @param num - The value of the signal found"""
-        for i in range(9):
-            if i // 3 != block_row:
-                board.cell_possibilities[i, col].discard(num)
+            board.context.log(
+                f"Found hidden pointer of number {num} in {find_type} {idx + 1}."
+            )
 
     def step(self, board: Board) -> bool:
         """! Attempts to make progress on the board. Checks if a block contains
         values only on a given row/column and removes all possibilities from the other blocks.
+        The pointers of all blocks and numbers are found at once and applied together.
 
         @param board - The board to attempt progress on.
 
         @return Whether the step succeeded.
         """
-        for i in range(9):
-            block_x, block_y = i // 3, i % 3
-            for num in range(1, 10):
-                if num in self.applied_pointers[i]:
-                    continue
-                action, idx = self.__check_block(
-                    board.get_possibilities()[
-                        3 * block_x : 3 * block_x + 3, 3 * block_y : 3 * block_y + 3
-                    ],
-                    num,
-                )
-                if action == "column":
-                    self.applied_pointers[i].add(num)
-                    self.__clean_col(board, block_y * 3 + idx, block_x, num)
-                    self.print_msg("column", block_y * 3 + idx, num)
+        possibilities = board.analysis.unsolved_tensor.reshape(9, 81)
 
-                    return True
+        # Indexed by number and intersection. A pointer needs at least 2 cells,
+        # as a single cell would be a hidden single.
+        n_in_intersection = possibilities[:, INTERSECTION_CELLS].sum(axis=2)
+        in_block_rest = np.any(possibilities[:, BLOCK_REST_CELLS], axis=2)
+        in_line_rest = np.any(possibilities[:, LINE_REST_CELLS], axis=2)
+        pointers = (n_in_intersection >= 2) & ~in_block_rest & in_line_rest
 
-                if action == "row":
-                    self.applied_pointers[i].add(num)
-                    self.__clean_row(board, block_x * 3 + idx, block_y, num)
-                    self.print_msg("row", block_x * 3 + idx, num)
+        # Bit (9 * intersection + number - 1) is set for each pointer applied on this board state.
+        applied = board.applied.get(self.name, 0)
+        success = False
+        for num, intersection in zip(*np.nonzero(pointers)):
+            bit = 1 << int(9 * intersection + num)
+            if applied & bit:
+                continue
+            applied |= bit
 
-                    return True
+            for cell in LINE_REST_CELLS[intersection]:
+                success = board.eliminate(cell // 9, cell % 9, {num + 1}) or success
+            line = INTERSECTION_LINES[intersection]
+            self.print_msg(get_house_name(line), line % 9, num + 1, board)
 
-        return False
+        board.applied[self.name] = applied
+        return success
 
 
 class ObviousPairs(BaseLogic):
@@ -129,186 +133,294 @@ class ObviousPairs(BaseLogic):
         super(ObviousPairs, self).__init__(print_results)
         self.name = "ObviousPairs"
 
-        # Keeps track of which numbers have succeeded with checks, so we do not
-        # redo the computation.
-        self.pair_memory = {
-            "row": {i: set() for i in range(9)},
-            "col": {i: set() for i in range(9)},
-            "block": {i: set() for i in range(9)},
-        }
-
-    def print_msg(self, find_type: str, idx: int, nums: int):
+    def print_msg(self, find_type: str, idx: int, nums: int, board: Board):
         """! Prints the finding of the logic rule if text-based reporting is allowed.
 
         @param find_type - Whether the signal was found in a column, row or block.
         @param idx - The index of the row, column or block.
         @param num - The value of the signal found.
+        @param board - The board on which the finding was made.
         """
         if self.print_results:
-            print(
+            board.context.log(
                 f"Found Obvious Pair {tuple(nums)} in {find_type} {idx + 1}.\
                    Removing all instances from {find_type}."
             )
 
-    def __clean_row(
-        self, board: Board, row: int, idxs: Tuple[int, int], nums: Set[int]
-    ):
-        """! Clean the row for the found pair.
+    def step(self, board: Board):
+        """! Attempts to make progress on the board. Groups the cells with exactly 2 possibilities
+        in each house by their possibilities. Two such cells with the same possibilities form a pair,
+        and these possibilities are removed from the rest of the house. All pairs are applied at once.
 
-        @param board - The current board state.
-        @param row - The index of the row containing the pair.
-        @param idxs - The column indeces of the relevant row.
-        @param nums - The 2 values in the pair.
+        @param board - The board to attempt progress on.
+        @throws InvalidBoardException - If 3 cells in a house share the same 2 possibilities.
+
+        @return Whether the step succeeded.
         """
-        self.pair_memory["row"][row].add(tuple(sorted(nums)))
-        for i in range(9):
-            # Ignore the relevant pair
-            if i in idxs:
+        # Group the bivalue cells by house and possibility bitmask in a single pass.
+        groups = {}
+        for cell, mask in board.bivalue_cells.items():
+            for house in CELL_HOUSES[cell]:
+                groups.setdefault((house, mask), []).append(cell)
+
+        # Bit (512 * house + mask) is set for each pair applied on this board state.
+        applied = board.applied.get(self.name, 0)
+        eliminations = []
+        for (house, mask), cells in groups.items():
+            if len(cells) > 2:
+                raise InvalidBoardException(
+                    f"{len(cells)} cells share the same 2 possibilities."
+                )
+            bit = 1 << (512 * house + mask)
+            if len(cells) < 2 or applied & bit:
                 continue
-            board.cell_possibilities[row, i] = board.cell_possibilities[row, i] - nums
+            applied |= bit
 
-    def __check_row(self, board: Board, row: int) -> bool:
-        """! Checks a row for a hidden pair
+            nums = mask_to_possibilities(mask)
+            for row, col in HOUSES[house]:
+                if 9 * row + col not in cells:
+                    eliminations.append((row, col, nums))
+            self.print_msg(get_house_name(house), house % 9, sorted(nums), board)
 
-        @param board - The current board state.
-        @param row - The index of the row containing the pair.
+        board.applied[self.name] = applied
 
-        @return Whether the check succeeded.
-        """
-        for i in range(9):
-            # If the cell contains only 2 values,...
-            if len(board.cell_possibilities[row, i]) != 2:
-                continue
-            # Or if it has already been checked - skip
-            elif (
-                tuple(sorted(board.cell_possibilities[row, i]))
-                in self.pair_memory["row"][row]
-            ):
-                continue
-            for j in range(i + 1, 9):
-                if board.cell_possibilities[row, i] == board.cell_possibilities[row, j]:
-                    self.__clean_row(
-                        board, row, [i, j], board.cell_possibilities[row, i]
-                    )
-                    self.print_msg("row", row, board.cell_possibilities[row, i])
-                    return True
+        success = False
+        for row, col, nums in eliminations:
+            success = board.eliminate(row, col, nums) or success
+
+        return success
 
-        return False
 
-    def __clean_col(
-        self, board: Board, col: int, idxs: Tuple[int, int], nums: Set[int]
-    ):
-        """! Clean the column for the found pair.
+class ObviousSubsets(BaseLogic):
+    """! A class implementing the detection of the Obvious subsets rule - the generalisation
+    of Obvious pairs to triples and quads."""
 
-        @param board - The current board state.
-        @param row - The index of the column containing the pair.
-        @param idxs - The row indeces of the relevant row.
-        @param nums - The 2 values in the pair.
+    def __init__(self, print_results: bool = False, max_size: int = 4):
+        """! Creates a logic rule to apply the Obvious subsets rule.
+
+        @param print_results - A configuration parameter on whether to print the step results.
+        @param max_size - The largest subset size to search for.
         """
-        self.pair_memory["col"][col].add(tuple(sorted(nums)))
-        for i in range(9):
-            if i in idxs:
-                continue
-            board.cell_possibilities[i, col] = board.cell_possibilities[i, col] - nums
+        super(ObviousSubsets, self).__init__(print_results)
+        self.name = "ObviousSubsets"
+        self.max_size = max_size
+
+    def print_msg(self, house: int, nums: Set[int], board: Board):
+        """! Prints the finding of the logic rule if text-based reporting is allowed.
+
+        @param house - The index of the house containing the subset.
+        @param nums - The values of the subset.
+        @param board - The board on which the finding was made.
+        """
+        if self.print_results:
+            find_type = get_house_name(house)
+            board.context.log(
+                f"Found Obvious Subset {tuple(sorted(nums))} in {find_type} {house % 9 + 1}. "
+                + f"Removing all instances from {find_type}."
+            )
 
-    def __check_col(self, board: Board, col: int) -> bool:
-        """! Checks a column for a hidden pair.
+    def __find_subsets(self, board: Board, masks: np.ndarray, house: int) -> dict:
+        """! Finds all obvious subsets in a house - groups of k cells whose possibilities
+        combined contain exactly k values.
 
         @param board - The current board state.
-        @param col - The index of the column containing the pair.
+        @param masks - The bitmasks of the cell possibilities.
+        @param house - The index of the house to check.
+        @throws InvalidBoardException - If k cells share fewer than k possibilities.
 
-        @return Whether the check succeeded.
+        @return A dictionary mapping each affected cell to the bitmask of values to be removed.
         """
-        for i in range(9):
-            # If the cell contains only 2 values,...
-            if len(board.cell_possibilities[i, col]) != 2:
-                continue
-            # Or if it has already been checked - skip
-            elif (
-                tuple(sorted(board.cell_possibilities[i, col]))
-                in self.pair_memory["col"][col]
-            ):
-                continue
-            for j in range(i + 1, 9):
-                if board.cell_possibilities[i, col] == board.cell_possibilities[j, col]:
-                    self.__clean_col(
-                        board, col, [i, j], board.cell_possibilities[i, col]
+        cells = [cell for cell in HOUSES[house] if board.board[cell] == 0]
+        eliminations = {}
+
+        # A subset covering all unsolved cells of the house cannot remove anything.
+        for size in range(2, min(self.max_size, len(cells) - 1) + 1):
+            # Only cells with at most as many possibilities as the subset size can take part.
+            candidates = [cell for cell in cells if bin(masks[cell]).count("1") <= size]
+            for subset in combinations(candidates, size):
+                union = 0
+                for cell in subset:
+                    union |= int(masks[cell])
+
+                n_values = bin(union).count("1")
+                if n_values < size:
+                    raise InvalidBoardException(
+                        f"{size} cells share only {n_values} possibilities."
                     )
-                    self.print_msg("column", col, board.cell_possibilities[i, col])
-                    return True
+                if n_values > size:
+                    continue
 
-        return False
+                found = False
+                for cell in cells:
+                    if cell not in subset and masks[cell] & union:
+                        eliminations[cell] = eliminations.get(cell, 0) | union
+                        found = True
+                if found:
+                    self.print_msg(house, mask_to_possibilities(union), board)
 
-    def __clean_block(
-        self, board: Board, block: int, idxs: Tuple[int, int], nums: Set[int]
-    ):
-        """! Clean the block for the found pair.
+        return eliminations
 
-        @param board - The current board state.
-        @param block - The index of the block containing the pair.
-        @param idxs - The cell indeces of the relevant (flattened) block.
-        @param nums - The 2 values in the pair.
+    def step(self, board: Board) -> bool:
+        """! Attempts to make progress on the board. Finds every group of 2 to max_size cells
+        in a house, which together contain only as many possibilities as there are cells, and
+        removes these possibilities from the rest of the house. All eliminations are applied at once.
+
+        @param board - The board to attempt progress on.
+
+        @return Whether the step succeeded.
         """
-        self.pair_memory["block"][block].add(tuple(sorted(nums)))
-        block_x, block_y = (block // 3) * 3, (block % 3) * 3
-        for i in range(9):
-            if i in idxs:
-                continue
-            board.cell_possibilities[block_x + i // 3, block_y + i % 3] = (
-                board.cell_possibilities[block_x + i // 3, block_y + i % 3] - nums
+        masks = board.get_candidate_masks()
+
+        eliminations = {}
+        for house in range(len(HOUSES)):
+            for cell, mask in self.__find_subsets(board, masks, house).items():
+                eliminations[cell] = eliminations.get(cell, 0) | mask
+
+        success = False
+        for (row, col), mask in eliminations.items():
+            success = board.eliminate(row, col, mask_to_possibilities(mask)) or success
+
+        return success
+
+
+class HiddenSubsets(BaseLogic):
+    """! A class implementing the detection of the Hidden pairs and Hidden triples rules."""
+
+    def __init__(self, print_results: bool = False, max_size: int = 3):
+        """! Creates a logic rule to apply the Hidden subsets rule.
+
+        @param print_results - A configuration parameter on whether to print the step results.
+        @param max_size - The largest subset size to search for.
+        """
+        super(HiddenSubsets, self).__init__(print_results)
+        self.name = "HiddenSubsets"
+        self.max_size = max_size
+
+    def print_msg(self, house: int, nums: Set[int], board: Board):
+        """! Prints the finding of the logic rule if text-based reporting is allowed.
+
+        @param house - The index of the house containing the subset.
+        @param nums - The values of the subset.
+        @param board - The board on which the finding was made.
+        """
+        if self.print_results:
+            find_type = get_house_name(house)
+            board.context.log(
+                f"Found Hidden Subset {tuple(sorted(nums))} in {find_type} {house % 9 + 1}. "
+                + "Removing all other possibilities from its cells."
             )
 
-    def __check_block(self, board: Board, block: int) -> bool:
-        """! Checks a column for a hidden pair.
+    def step(self, board: Board) -> bool:
+        """! Attempts to make progress on the board. Finds every group of k numbers (k = 2 to max_size),
+        which can only be placed in the same k cells of a house, and removes all other possibilities
+        from these cells. All eliminations are applied at once.
 
-        @param board - The current board state.
-        @param col - The index of the column containing the pair.
+        @param board - The board to attempt progress on.
+        @throws InvalidBoardException - If k numbers can only be placed in fewer than k cells.
 
-        @return Whether the check succeeded.
+        @return Whether the step succeeded.
         """
-        block_x, block_y = (block // 3) * 3, (block % 3) * 3
+        masks = np.where(board.board == 0, board.get_candidate_masks(), 0)
+
+        # For each house and number, a bitmask of the house cells which can contain the number.
+        house_masks = masks[HOUSE_ROWS, HOUSE_COLS].astype(np.int32)
+        has_num = (house_masks[:, :, np.newaxis] >> np.arange(9)) & 1
+        positions = (has_num << np.arange(9)[:, np.newaxis]).sum(axis=1)
+        n_positions = has_num.sum(axis=1)
+        n_unsolved = np.count_nonzero(house_masks, axis=1)
+
+        eliminations = {}
+        for house in range(len(HOUSES)):
+            for size in range(2, min(self.max_size, n_unsolved[house] - 1) + 1):
+                nums = [num for num in range(9) if 0 < n_positions[house, num] <= size]
+                for subset in combinations(nums, size):
+                    union = 0
+                    nums_mask = 0
+                    for num in subset:
+                        union |= int(positions[house, num])
+                        nums_mask |= 1 << num
+
+                    n_cells = bin(union).count("1")
+                    if n_cells < size:
+                        raise InvalidBoardException(
+                            f"{size} numbers can only be placed in {n_cells} cells."
+                        )
+                    if n_cells > size:
+                        continue
+
+                    found = False
+                    for idx in range(9):
+                        cell = HOUSES[house][idx]
+                        if union & (1 << idx) and masks[cell] & ~nums_mask:
+                            eliminations[cell] = eliminations.get(cell, 0) | (
+                                masks[cell] & ~nums_mask
+                            )
+                            found = True
+                    if found:
+                        self.print_msg(house, mask_to_possibilities(nums_mask), board)
 
-        for i in range(9):
-            i_coords = block_x + i // 3, block_y + i % 3
+        success = False
+        for (row, col), mask in eliminations.items():
+            success = board.eliminate(row, col, mask_to_possibilities(mask)) or success
 
-            # If the cell contains only 2 values,...
-            if len(board.cell_possibilities[i_coords]) != 2:
-                continue
-            # Or if it has already been checked - skip
-            elif (
-                tuple(sorted(board.cell_possibilities[i_coords]))
-                in self.pair_memory["block"][block]
-            ):
-                continue
-            for j in range(i + 1, 9):
-                if (
-                    board.cell_possibilities[i_coords]
-                    == board.cell_possibilities[block_x + j // 3, block_y + j % 3]
-                ):
-                    self.__clean_block(
-                        board, block, [i, j], board.cell_possibilities[i_coords]
-                    )
-                    self.print_msg("block", block, board.cell_possibilities[i_coords])
-                    return True
+        return success
 
-        return False
 
-    def step(self, board: Board):
-        """! Attempts to make progress on the board. Checks if a block contains
-        values only on a given row/column and removes all possibilities from the other blocks.
+class BoxLineReduction(BaseLogic):
+    """! A class implementing the detection of the Box-line reduction (claiming) rule - the
+    counterpart of the Hidden pointers rule."""
+
+    def __init__(self, print_results: bool = False):
+        """! Creates a logic rule to apply the Box-line reduction rule.
+
+        @param print_results - A configuration parameter on whether to print the step results.
+        """
+        super(BoxLineReduction, self).__init__(print_results)
+        self.name = "BoxLineReduction"
+
+    def print_msg(self, intersection: int, num: int, board: Board):
+        """! Prints the finding of the logic rule if text-based reporting is allowed.
+
+        @param intersection - The index of the line-block intersection containing the claim.
+        @param num - The value of the claim.
+        @param board - The board on which the finding was made.
+        """
+        if self.print_results:
+            line = INTERSECTION_LINES[intersection]
+            board.context.log(
+                f"Found claim of number {num} in {get_house_name(line)} {line % 9 + 1}. "
+                + f"Removing it from the rest of block {INTERSECTION_BLOCKS[intersection] + 1}."
+            )
+
+    def step(self, board: Board) -> bool:
+        """! Attempts to make progress on the board. Checks if a row/column contains a value
+        only within a single block and removes the value from the rest of the block.
+        All claims found are applied at once.
 
         @param board - The board to attempt progress on.
 
         @return Whether the step succeeded.
         """
-        success = False
+        possibilities = board.analysis.unsolved_tensor.reshape(9, 81)
 
-        for i in range(9):
-            row_result = self.__check_row(board, i)
-            col_result = self.__check_col(board, i)
-            block_result = self.__check_block(board, i)
+        # Indexed by number and intersection.
+        in_intersection = np.any(possibilities[:, INTERSECTION_CELLS], axis=2)
+        in_line_rest = np.any(possibilities[:, LINE_REST_CELLS], axis=2)
+        in_block_rest = np.any(possibilities[:, BLOCK_REST_CELLS], axis=2)
+        claims = in_intersection & ~in_line_rest & in_block_rest
+
+        # Bit (9 * intersection + number - 1) is set for each claim applied on this board state.
+        applied = board.applied.get(self.name, 0)
+        success = False
+        for num, intersection in zip(*np.nonzero(claims)):
+            bit = 1 << int(9 * intersection + num)
+            if applied & bit:
+                continue
+            applied |= bit
 
-            if not success:
-                success = row_result or col_result or block_result
+            for cell in BLOCK_REST_CELLS[intersection]:
+                success = board.eliminate(cell // 9, cell % 9, {num + 1}) or success
+            self.print_msg(intersection, num + 1, board)
 
+        board.applied[self.name] = applied
         return success
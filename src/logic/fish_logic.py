@@ -0,0 +1,120 @@
+"""!@file fish_logic.py
+@brief Logic components that operate on the positions of a single number across lines.
+
+@details Logic components that operate on the positions of a single number across lines. Currently
+includes the Fish rule, covering X-Wings, Swordfish and Jellyfish.
+"""
+from itertools import combinations
+from src.logic.base_logic import BaseLogic
+from src.solver.board import Board, POPCOUNT
+from src.exceptions import InvalidBoardException
+import numpy as np
+
+# All combinations of N out of 9 lines, for the supported fish sizes.
+LINE_COMBINATIONS = {
+    size: np.array(list(combinations(range(9), size))) for size in range(2, 5)
+}
+
+FISH_NAMES = {2: "X-Wing", 3: "Swordfish", 4: "Jellyfish"}
+
+
+class Fish(BaseLogic):
+    """! A class implementing the detection of the Fish rules - X-Wing, Swordfish and Jellyfish."""
+
+    def __init__(self, print_results: bool = False, max_size: int = 4):
+        """! Creates a logic rule to apply the Fish rules.
+
+        @param print_results - A configuration parameter on whether to print the step results.
+        @param max_size - The largest fish size to search for (2 - X-Wing, 3 - Swordfish, 4 - Jellyfish).
+        @throws ValueError - If the size is not one of the supported fish sizes.
+        """
+        if max_size not in FISH_NAMES:
+            raise ValueError(
+                f"Fish size should be between 2 and 4, received {max_size}."
+            )
+        super(Fish, self).__init__(print_results)
+        self.name = "Fish"
+        self.max_size = max_size
+
+    def print_msg(
+        self, size: int, base_type: str, lines: np.ndarray, num: int, board: Board
+    ):
+        """! Prints the finding of the logic rule if text-based reporting is allowed.
+
+        @param size - The number of base lines of the fish.
+        @param base_type - Whether the base lines are rows or columns.
+        @param lines - The indeces of the base lines.
+        @param num - The value of the fish.
+        @param board - The board on which the finding was made.
+        """
+        if self.print_results:
+            board.context.log(
+                f"Found {FISH_NAMES[size]} of number {num} in {base_type}s "
+                + f"{tuple(int(line) + 1 for line in lines)}."
+            )
+
+    def __find_fish(
+        self, board: Board, planes: np.ndarray, base_type: str
+    ) -> np.ndarray:
+        """! Finds all fish with base lines along the first axis of the digit planes.
+
+        @param board - The board on which the fish are searched.
+        @param planes - A 9x9x9 boolean array of possibilities of unsolved cells, indexed
+        by number, base line and cover line.
+        @param base_type - Whether the base lines are rows or columns.
+        @throws InvalidBoardException - If N base lines of a number are covered by fewer than N lines.
+
+        @return A 9x9x9 boolean array of the possibilities to be removed, indexed as the planes.
+        """
+        # For each number and base line, a bitmask and count of the cover lines containing the number.
+        line_masks = planes.astype(np.int32) @ (1 << np.arange(9))
+        line_counts = planes.sum(axis=2)
+
+        eliminations = np.zeros_like(planes)
+        for size in range(2, self.max_size + 1):
+            combos = LINE_COMBINATIONS[size]
+            # Lines in which the number is placed, or which have too many positions, cannot take part.
+            valid = np.all(
+                (line_counts[:, combos] >= 1) & (line_counts[:, combos] <= size),
+                axis=2,
+            )
+            cover_sizes = POPCOUNT[np.bitwise_or.reduce(line_masks[:, combos], axis=2)]
+
+            if np.any(valid & (cover_sizes < size)):
+                raise InvalidBoardException(
+                    f"{size} lines contain a number in fewer than {size} cells."
+                )
+
+            for num, combo in zip(*np.nonzero(valid & (cover_sizes == size))):
+                base_lines = combos[combo]
+                cover_lines = np.any(planes[num, base_lines], axis=0)
+                removed = planes[num] & cover_lines
+                removed[base_lines] = False
+                if np.any(removed):
+                    eliminations[num] |= removed
+                    self.print_msg(size, base_type, base_lines, num + 1, board)
+
+        return eliminations
+
+    def step(self, board: Board) -> bool:
+        """! Attempts to make progress on the board. For each number, finds sets of N rows (or columns)
+        in which the number can only be placed within the same N columns (or rows), and removes the
+        number from the rest of these columns (or rows). All eliminations are applied at once.
+
+        @param board - The board to attempt progress on.
+
+        @return Whether the step succeeded.
+        """
+        planes = board.analysis.unsolved_tensor
+
+        eliminations = self.__find_fish(board, planes, "row")
+        eliminations |= self.__find_fish(
+            board, planes.transpose(0, 2, 1), "column"
+        ).transpose(0, 2, 1)
+
+        success = False
+        for row, col in zip(*np.nonzero(np.any(eliminations, axis=0))):
+            nums = set((np.flatnonzero(eliminations[:, row, col]) + 1).tolist())
+            success = board.eliminate(row, col, nums) or success
+
+        return success
@@ -9,28 +9,54 @@ and Hidden singles rules.
 from src.logic.base_logic import BaseLogic
 from src.solver.board import Board
 import numpy as np
-from typing import Tuple
+from src.exceptions import InvalidBoardException
 
 
 class ObviousSingles(BaseLogic):
     """! A class implementing the detction of the Obvious singles rule."""
 
-    def __init__(self, print_results: bool = False):
+    def __init__(self, print_results: bool = False, batch: bool = True):
         """! Creates a logic rule to apply the Obvious singles rule.
 
         @param print_results - A configuration parameter on whether to print the step results.
+        @param batch - Whether to place all obvious singles in a single step.
         """
         super(ObviousSingles, self).__init__(print_results)
         self.name = "ObviousSingles"
+        self.batch = batch
+
+    def __step_batch(self, board: Board) -> bool:
+        """! Finds all cells containing only a single possibility and updates them at once.
+
+        @param board - The board to attempt progress on.
+        @throws InvalidBoardException - If two of the found values conflict with each other.
+
+        @return Whether the step succeeded.
+        """
+        masks = board.analysis.masks
+        rows, cols = np.nonzero((board.board == 0) & (board.analysis.counts == 1))
+        if len(rows) == 0:
+            return False
+
+        values = np.log2(masks[rows, cols]).astype(np.int8) + 1
+        board.update_many(rows, cols, values)
+        for row, col, value in zip(rows, cols, values):
+            self.print_msg(row + 1, col + 1, value, board)
+
+        return True
 
     def step(self, board: Board) -> bool:
         """! Attempts to make progress on the board. Checks if some cell
-        conatins only a single possibility and updates it if so.
+        conatins only a single possibility and updates it if so. In batch mode,
+        all such cells are updated at once.
 
         @param board - The board to attempt progress on.
 
         @return Whether the step succeeded.
         """
+        if self.batch:
+            return self.__step_batch(board)
+
         cell_possibilities = board.get_possibilities()
         for i in range(9):
             for j in range(9):
@@ -54,108 +80,38 @@ class HiddenSingles(BaseLogic):
         super(HiddenSingles, self).__init__(print_results)
         self.name = "HiddenSingles"
 
-    def __check_rows(self, board: Board) -> Tuple[int, int]:
-        """! Private method for determining whether there exists a row for which
-        there exists a number that can only occur in one cell.
-
-        @param board - The current board state.
-        """
-        for i in range(9):
-            found_nums = set(board.board[i].tolist())
-            for num in range(1, 10):
-                if num in found_nums:
-                    continue
-                num_in_cell = np.array(
-                    [num in cell for cell in board.get_possibilities()[i]], dtype=bool
-                )
-                if np.count_nonzero(num_in_cell) == 1:
-                    idx = np.argmax(num_in_cell)
-                    board.update(i, idx, num)
-                    return (i, idx, num)
-
-        return None
-
-    def __check_cols(self, board: Board) -> Tuple[int, int]:
-        """! Private method for determining whether there exists a column for which
-        there exists a number that can only occur in one cell.
-
-        @param board - The current board state.
-        """
-        for i in range(9):
-            found_nums = set(board.board[:, i].tolist())
-            for num in range(1, 10):
-                if num in found_nums:
-                    continue
-                num_in_cell = np.array(
-                    [num in cell for cell in board.get_possibilities()[:, i]],
-                    dtype=bool,
-                )
-                if np.count_nonzero(num_in_cell) == 1:
-                    idx = np.argmax(num_in_cell)
-                    board.update(idx, i, num)
-                    return (idx, i, num)
-
-        return None
-
-    def __check_blocks(self, board: Board) -> Tuple[int, int]:
-        """! Private method for determining whether there exists a block for which
-        there exists a number that can only occur in one cell.
-
-        @param board - The current board state.
-        """
-        for i in range(3):
-            for j in range(3):
-                found_nums = set(
-                    board.board[3 * i : 3 * i + 3, 3 * j : 3 * j + 3].flatten().tolist()
-                )
-                for num in range(1, 10):
-                    if num in found_nums:
-                        continue
-
-                    num_in_cell = np.array(
-                        [
-                            [num in cell for cell in row]
-                            for row in board.get_possibilities()[
-                                3 * i : 3 * i + 3, 3 * j : 3 * j + 3
-                            ]
-                        ],
-                        dtype=bool,
-                    )
-
-                    if np.count_nonzero(num_in_cell) == 1:
-                        idx = np.unravel_index(np.argmax(num_in_cell), (3, 3))
-                        board.update(i * 3 + idx[0], j * 3 + idx[1], num)
-                        return (i * 3 + idx[0], j * 3 + idx[1], num)
-
-        return None
-
     def step(self, board: Board) -> bool:
         """! Attempts to make progress on the board. Checks if a row, column or block
         conatins only a single possibility for a given number and updates it if so.
+        All such cells are found from the digit-plane possibilities and updated at once.
 
         @param board - The board to attempt progress on.
+        @throws InvalidBoardException - If a cell is the only option for two numbers.
 
         @return Whether the step succeeded.
         """
-        rows_result = self.__check_rows(board)
-        if rows_result:
-            self.print_msg(
-                rows_result[0] + 1, rows_result[1] + 1, rows_result[2], board
-            )
-            return True
-
-        cols_result = self.__check_cols(board)
-        if cols_result:
-            self.print_msg(
-                cols_result[0] + 1, cols_result[1] + 1, cols_result[2], board
-            )
-            return True
-
-        block_result = self.__check_blocks(board)
-        if block_result:
-            self.print_msg(
-                block_result[0] + 1, block_result[1] + 1, block_result[2], board
-            )
-            return True
-
-        return False
+        # Indexed by number, row and column.
+        possibilities = board.analysis.unsolved_tensor
+
+        row_counts = possibilities.sum(axis=2)
+        col_counts = possibilities.sum(axis=1)
+        block_counts = possibilities.reshape(9, 3, 3, 3, 3).sum(axis=(2, 4))
+        block_counts = block_counts.repeat(3, axis=1).repeat(3, axis=2)
+
+        singles = possibilities & (
+            (row_counts[:, :, np.newaxis] == 1)
+            | (col_counts[:, np.newaxis, :] == 1)
+            | (block_counts == 1)
+        )
+        nums, rows, cols = np.nonzero(singles)
+        if len(nums) == 0:
+            return False
+
+        if np.any(singles.sum(axis=0) > 1):
+            raise InvalidBoardException("A cell is the only option for two numbers.")
+
+        board.update_many(rows, cols, nums + 1)
+        for row, col, num in zip(rows, cols, nums):
+            self.print_msg(row + 1, col + 1, num + 1, board)
+
+        return True
@@ -0,0 +1,285 @@
+"""!@file template_logic.py
+@brief Logic components based on pattern overlay - the placements of a single number on the full board.
+
+@details Logic components based on pattern overlay. A valid placement of one number on the board (a
+template) puts it exactly once in every row, column and block, which results in 46656 templates. These
+are precomputed once and stored as packed bits, optionally cached on disk. For each number, the templates which are
+consistent with the current board state are found with vectorized masks and combined to either place
+numbers or remove possibilities. Includes both a logic rule and a backtracker based on the templates.
+"""
+import os
+import threading
+from typing import List
+from warnings import warn
+import numpy as np
+
+from src.logic.base_logic import BaseLogic, BaseBacktracker
+from src.solver.board import Board
+from src.exceptions import InvalidBoardException
+
+# Location of the cached templates, set through an environment variable. Generating the templates
+# only takes tens of milliseconds, so they are not cached on disk unless a location is given.
+TEMPLATE_CACHE_PATH = os.environ.get("SUDOKU_TEMPLATE_CACHE")
+N_TEMPLATES = 46656
+
+# Pairs of templates from different numbers are only cross-checked if there are at most this many.
+MAX_COMBINATIONS = 1 << 18
+
+_templates = None
+# Guards the generation of the templates, so that concurrent solves load them only once.
+_templates_lock = threading.Lock()
+
+
+def generate_templates() -> np.ndarray:
+    """! Enumerates all valid placements of a single number on the board.
+
+    @return A (46656, 9) array, in which entry [t, row] is the column of the number in that row.
+    """
+    placements = np.zeros((1, 0), dtype=np.int8)
+    for row in range(9):
+        previous = np.repeat(placements, 9, axis=0)
+        cols = np.tile(np.arange(9, dtype=np.int8), len(placements))
+
+        # The column must not be used by a previous row, and its stack must not be used in the band.
+        valid = ~np.any(previous == cols[:, np.newaxis], axis=1)
+        band = previous[:, 3 * (row // 3) : row]
+        valid &= ~np.any(band // 3 == (cols // 3)[:, np.newaxis], axis=1)
+
+        placements = np.hstack([previous, cols[:, np.newaxis]])[valid]
+
+    return placements
+
+
+def pack_cells(cells: np.ndarray) -> np.ndarray:
+    """! Packs boolean cell masks into two 64-bit words, in which bit i represents the flattened cell i.
+
+    @param cells - An (..., 81) boolean array.
+
+    @return An (..., 2) array of unsigned 64-bit integers.
+    """
+    padded = np.zeros(cells.shape[:-1] + (128,), dtype=bool)
+    padded[..., :81] = cells
+    return np.packbits(padded, axis=-1, bitorder="little").view(np.uint64)
+
+
+def unpack_cells(packed: np.ndarray) -> np.ndarray:
+    """! Reverses pack_cells.
+
+    @param packed - An (..., 2) array of unsigned 64-bit integers.
+
+    @return An (..., 81) boolean array.
+    """
+    bits = np.unpackbits(packed.view(np.uint8), axis=-1, bitorder="little")
+    return bits[..., :81].astype(bool)
+
+
+def get_templates() -> np.ndarray:
+    """! Obtains the packed templates, loading them from the disk cache if there is one, or generating them
+    (and storing them in the cache) if needed.
+
+    @return A (46656, 2) array of unsigned 64-bit integers, one packed cell mask per template.
+    """
+    global _templates
+    if _templates is not None:
+        return _templates
+
+    with _templates_lock:
+        if _templates is not None:
+            return _templates
+
+        if TEMPLATE_CACHE_PATH is not None and os.path.exists(TEMPLATE_CACHE_PATH):
+            try:
+                templates = np.load(TEMPLATE_CACHE_PATH)
+                if templates.shape == (N_TEMPLATES, 2) and templates.dtype == np.uint64:
+                    _templates = templates
+                    return _templates
+            except (OSError, ValueError):
+                pass
+            warn(f"Invalid template cache {TEMPLATE_CACHE_PATH} - regenerating.")
+
+        placements = generate_templates()
+        cells = np.zeros((N_TEMPLATES, 81), dtype=bool)
+        cells[
+            np.arange(N_TEMPLATES)[:, np.newaxis], 9 * np.arange(9) + placements
+        ] = True
+        templates = pack_cells(cells)
+
+        if TEMPLATE_CACHE_PATH is not None:
+            try:
+                os.makedirs(
+                    os.path.dirname(os.path.abspath(TEMPLATE_CACHE_PATH)), exist_ok=True
+                )
+                np.save(TEMPLATE_CACHE_PATH, templates)
+            except OSError:
+                warn(f"Could not store templates in {TEMPLATE_CACHE_PATH}.")
+
+        _templates = templates
+        return _templates
+
+
+def are_disjoint(templates_a: np.ndarray, templates_b: np.ndarray) -> np.ndarray:
+    """! Checks which pairs of packed templates do not share a cell.
+
+    @param templates_a - An (n, 2) array of packed templates.
+    @param templates_b - An (m, 2) array of packed templates.
+
+    @return An (n, m) boolean array.
+    """
+    overlap = templates_a[:, np.newaxis, :] & templates_b[np.newaxis, :, :]
+    return np.all(overlap == 0, axis=2)
+
+
+def filter_templates(board: Board) -> List[np.ndarray]:
+    """! Finds the templates of each number which are consistent with the board state. A template
+    must contain all cells in which the number is placed, and only cells in which it is possible.
+    Templates are then cross-checked between numbers: a template is dropped if it overlaps with all
+    remaining templates of another number.
+
+    As possibilities only shrink between backtracking steps, the result is stored with the board
+    state, and later calls only filter the previously surviving templates.
+
+    @param board - The current board state.
+    @throws InvalidBoardException - If a number has no consistent template.
+
+    @return A list of 9 packed template arrays, one for each number.
+    """
+    previous = board.applied.get("Templates")
+    if previous is None:
+        previous = [get_templates()] * 9
+    placed = pack_cells(
+        (board.board == np.arange(1, 10)[:, np.newaxis, np.newaxis]).reshape(9, 81)
+    )
+    allowed = pack_cells(board.get_candidate_tensor().reshape(9, 81))
+
+    surviving = []
+    for num, templates in enumerate(previous):
+        valid = np.all(templates & ~allowed[num] == 0, axis=1)
+        valid &= np.all(templates & placed[num] == placed[num], axis=1)
+        surviving.append(templates[valid])
+
+    # Cross-check the templates of pairs of numbers until no more templates can be dropped.
+    changed = True
+    while changed:
+        if any(len(num_templates) == 0 for num_templates in surviving):
+            raise InvalidBoardException("A number has no valid placement on the board.")
+        changed = False
+        for num_a in range(9):
+            for num_b in range(9):
+                n_pairs = len(surviving[num_a]) * len(surviving[num_b])
+                if (
+                    num_a == num_b
+                    or len(surviving[num_a]) == 1
+                    or n_pairs > MAX_COMBINATIONS
+                ):
+                    continue
+                compatible = np.any(
+                    are_disjoint(surviving[num_a], surviving[num_b]), axis=1
+                )
+                if not np.all(compatible):
+                    surviving[num_a] = surviving[num_a][compatible]
+                    changed = True
+
+    board.applied["Templates"] = surviving
+    return surviving
+
+
+class Templates(BaseLogic):
+    """! A class implementing the pattern overlay method as a logic rule."""
+
+    def __init__(self, print_results: bool = False):
+        """! Creates a logic rule to apply the pattern overlay method.
+
+        @param print_results - A configuration parameter on whether to print the step results.
+        """
+        super(Templates, self).__init__(print_results)
+        self.name = "Templates"
+
+    def step(self, board: Board) -> bool:
+        """! Attempts to make progress on the board. Filters the templates of each number against
+        the board state. A number is placed in every cell shared by all its remaining templates, and
+        removed as a possibility from every cell not covered by any of them.
+
+        @param board - The board to attempt progress on.
+
+        @return Whether the step succeeded.
+        """
+        surviving = filter_templates(board)
+
+        union = unpack_cells(
+            np.stack(
+                [
+                    np.bitwise_or.reduce(num_templates, axis=0)
+                    for num_templates in surviving
+                ]
+            )
+        ).reshape(9, 9, 9)
+        intersection = unpack_cells(
+            np.stack(
+                [
+                    np.bitwise_and.reduce(num_templates, axis=0)
+                    for num_templates in surviving
+                ]
+            )
+        ).reshape(9, 9, 9)
+
+        unsolved = board.board == 0
+        success = False
+
+        removed = board.get_candidate_tensor() & ~union & unsolved
+        for row, col in zip(*np.nonzero(np.any(removed, axis=0))):
+            nums = set((np.flatnonzero(removed[:, row, col]) + 1).tolist())
+            success = board.eliminate(row, col, nums) or success
+
+        for num, row, col in zip(*np.nonzero(intersection & unsolved)):
+            board.update(row, col, num + 1)
+            self.print_msg(row + 1, col + 1, num + 1, board)
+            success = True
+
+        return success
+
+
+class TemplateBacktracker(BaseBacktracker):
+    """! A class for backtracking guided by the templates of each number."""
+
+    def __init__(self, print_results: bool = False):
+        """! Creates a template backtracker.
+
+        @param print_results - A configuration parameter on whether to print the step results.
+        """
+        super(TemplateBacktracker, self).__init__(print_results)
+        self.name = "TemplateBacktracker"
+
+    def step(self, board: Board) -> bool:
+        """! Attempts to make progress on the board. Guesses the number with the fewest remaining
+        templates, in the unsolved cell which is covered by most of these templates.
+
+        @param board - The board to attempt progress on.
+        @throws - InvalidBoardException if a number has no valid placement on the board.
+
+        @return Whether the step succeeded.
+        """
+        surviving = filter_templates(board)
+        unsolved = (board.board == 0).flatten()
+
+        best = None
+        for num, num_templates in enumerate(surviving):
+            coverage = unpack_cells(num_templates).sum(axis=0) * unsolved
+            if coverage.max() == 0:
+                continue
+            if best is None or len(num_templates) < best[0]:
+                best = (len(num_templates), num + 1, coverage.argmax())
+
+        # An unsolved cell not covered by any template means the board has no solution.
+        if best is None:
+            raise InvalidBoardException("No option for number selection")
+
+        _, num, cell = best
+        i, j = cell // 9, cell % 9
+
+        # Store previous state in memory
+        self.remember(board, (i, j, num))
+
+        # Update the board with the new guess.
+        board.update(i, j, num)
+        self.print_msg(i + 1, j + 1, num, board)
+        return True
@@ -0,0 +1,96 @@
+"""!@file wing_logic.py
+@brief Logic components that operate on chains of cells with few possibilities.
+
+@details Logic components that operate on chains of cells with few possibilities. Currently includes
+the XY-Wing rule, alongside its XYZ-Wing extension.
+"""
+from src.logic.base_logic import BaseLogic
+from src.solver.board import Board, PEERS, POPCOUNT, possibilities_to_mask
+
+
+class XYWing(BaseLogic):
+    """! A class implementing the detection of the XY-Wing and XYZ-Wing rules."""
+
+    def __init__(self, print_results: bool = False):
+        """! Creates a logic rule to apply the XY-Wing and XYZ-Wing rules.
+
+        @param print_results - A configuration parameter on whether to print the step results.
+        """
+        super(XYWing, self).__init__(print_results)
+        self.name = "XYWing"
+
+    def print_msg(
+        self, wing_type: str, pivot: int, wings: tuple, num: int, board: Board
+    ):
+        """! Prints the finding of the logic rule if text-based reporting is allowed.
+
+        @param wing_type - Whether the pattern is an XY-Wing or an XYZ-Wing.
+        @param pivot - The flattened index of the pivot cell.
+        @param wings - The flattened indeces of the two wing cells.
+        @param num - The value removed from the cells seeing all wings.
+        @param board - The board on which the finding was made.
+        """
+        if self.print_results:
+            cells = ", ".join(
+                f"({cell // 9 + 1}, {cell % 9 + 1})" for cell in (pivot,) + wings
+            )
+            board.context.log(
+                f"Found {wing_type} at cells {cells}. Removing number {num}."
+            )
+
+    def step(self, board: Board) -> bool:
+        """! Attempts to make progress on the board. Finds pairs of bivalue wing cells {x, z}
+        and {y, z}, which both see a pivot cell with possibilities {x, y} (XY-Wing) or {x, y, z}
+        (XYZ-Wing). Whichever value the pivot takes, one of the wings must be z, so z is removed
+        from all cells seeing both wings (and the pivot, for an XYZ-Wing). All findings are
+        applied at once.
+
+        @param board - The board to attempt progress on.
+
+        @return Whether the step succeeded.
+        """
+        # Work on a snapshot, as the index changes while eliminations are applied.
+        bivalue_cells = dict(board.bivalue_cells)
+        cells = sorted(bivalue_cells)
+
+        eliminations = {}
+        for idx, wing_a in enumerate(cells):
+            mask_a = bivalue_cells[wing_a]
+            for wing_b in cells[idx + 1 :]:
+                mask_b = bivalue_cells[wing_b]
+                shared = mask_a & mask_b
+                # The wings must share exactly the value z.
+                if mask_a == mask_b or POPCOUNT[shared] != 1:
+                    continue
+
+                common_peers = PEERS[wing_a] & PEERS[wing_b]
+                xy_mask = (mask_a | mask_b) & ~shared
+                for pivot in common_peers:
+                    if board.board[pivot // 9, pivot % 9] != 0:
+                        continue
+                    if bivalue_cells.get(pivot) == xy_mask:
+                        wing_type, targets = "XY-Wing", common_peers
+                    elif possibilities_to_mask(
+                        board.cell_possibilities[pivot // 9, pivot % 9]
+                    ) == (mask_a | mask_b):
+                        wing_type, targets = "XYZ-Wing", common_peers & PEERS[pivot]
+                    else:
+                        continue
+
+                    num = shared.bit_length()
+                    found = False
+                    for cell in targets:
+                        if (
+                            cell != pivot
+                            and num in board.cell_possibilities[cell // 9, cell % 9]
+                        ):
+                            eliminations.setdefault(cell, set()).add(num)
+                            found = True
+                    if found:
+                        self.print_msg(wing_type, pivot, (wing_a, wing_b), num, board)
+
+        success = False
+        for cell, nums in eliminations.items():
+            success = board.eliminate(cell // 9, cell % 9, nums) or success
+
+        return success
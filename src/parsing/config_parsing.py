@@ -17,7 +17,16 @@ from datetime import datetime
 from src.exceptions import InvalidStepException
 
 from src.logic.singles_logic import ObviousSingles, HiddenSingles
-from src.logic.complex_logic import HiddenPointers, ObviousPairs
+from src.logic.complex_logic import (
+    HiddenPointers,
+    ObviousPairs,
+    ObviousSubsets,
+    HiddenSubsets,
+    BoxLineReduction,
+)
+from src.logic.fish_logic import Fish
+from src.logic.wing_logic import XYWing
+from src.logic.template_logic import Templates, TemplateBacktracker
 from src.logic.backtracking import NaiveBacktracker, SelectiveBacktracker
 from src.logic.base_logic import BaseLogic, BaseBacktracker
 
@@ -38,6 +47,18 @@ def string_to_step(item: str) -> BaseLogic:
         return HiddenPointers
     elif item == "ObviousPairs":
         return ObviousPairs
+    elif item == "ObviousSubsets":
+        return ObviousSubsets
+    elif item == "HiddenSubsets":
+        return HiddenSubsets
+    elif item == "BoxLineReduction":
+        return BoxLineReduction
+    elif item == "Fish":
+        return Fish
+    elif item == "XYWing":
+        return XYWing
+    elif item == "Templates":
+        return Templates
 
     raise InvalidStepException(f"No step called {item} found.")
 
@@ -72,6 +93,8 @@ def parse_backtracker(entry: str) -> BaseBacktracker:
         return NaiveBacktracker
     elif entry == "SelectiveBacktracker":
         return SelectiveBacktracker
+    elif entry == "TemplateBacktracker":
+        return TemplateBacktracker
 
     raise InvalidStepException(f"No backtracker called {entry} found.")
 
@@ -3,38 +3,63 @@
 
 @details The core methods for cleaning and re-formatting the input. This includes
 attempting to clean the lines to conform to the most likely input size, as well as
-converting to a numerical format.
+converting to a numerical format. Files are processed as raw bytes: the lines are cleaned with array
+operations and the bytes are translated to numbers through a lookup table. The problems found in an input
+are collected and reported in a single warning.
 
 @author Created by I. Petrov on 25/11/2023
 """
 from warnings import warn
 from typing import List
-import scipy.stats as stats
 import numpy as np
 from src.exceptions import InvalidBoardException
 
-has_non_numeric = False
+PADDED_MESSAGE = "Detected incomplete line - padding with empty spaces."
+TRIMMED_MESSAGE = "Line is too long, attempting to clean trailing symbols."
+NON_NUMERIC_MESSAGE = (
+    "Non-numeric character found - all non-numeric characters will default to 0."
+)
 
+# The value of every byte, with 0 for the bytes which are not digits.
+BYTE_VALUES = np.zeros(256, dtype=np.int8)
+BYTE_VALUES[ord("0") : ord("9") + 1] = np.arange(10)
+IS_DIGIT = np.zeros(256, dtype=bool)
+IS_DIGIT[ord("0") : ord("9") + 1] = True
 
-def clean_line(line: List[chr], length: int) -> List[chr]:
+
+def report(problems: List[str], source: str = None) -> None:
+    """! Reports the problems found in an input in a single warning, if there are any.
+
+    @param problems - The messages describing the problems, possibly repeated.
+    @param source - The name of the input, e.g. the file path.
+    """
+    if len(problems) == 0:
+        return
+    message = " ".join(dict.fromkeys(problems))
+    warn(message if source is None else f"{source}: {message}")
+
+
+def clean_line(line: List[chr], length: int, problems: List[str] = None) -> List[chr]:
     """! Attempts to clean a line to conform to a given length.
 
     @param line - A list of characters, comprising a line in the raw input.
     @param length - The final line length.
+    @param problems - A list collecting the problems found. If None, they are reported immediately.
 
     @return The best attempt of cleaning up the line.
     """
     new_line = line.copy()
+    found = [] if problems is None else problems
 
     # If line is smaller than desired - pad with spaces.
     if len(new_line) < length:
         new_line += " " * (length - len(line))
-        warn("Detected incomplete line - padding with empty spaces.")
+        found.append(PADDED_MESSAGE)
 
     # If line is larger than desired - try to remove non-numeric entries at both ends
     elif len(new_line) > length:
+        found.append(TRIMMED_MESSAGE)
         while len(new_line) != length:
-            warn("Line is too long, attempting to clean trailing symbols.")
             if not new_line[-1].isnumeric():
                 new_line.pop(-1)
             elif not new_line[0].isnumeric() and new_line[0] != ".":
@@ -42,65 +67,128 @@ def clean_line(line: List[chr], length: int) -> List[chr]:
             else:
                 break
 
+    if problems is None:
+        report(found)
     return new_line
 
 
-def clean_input(board: List[List[str]]) -> List[List[str]]:
+def clean_input(board: List[List[str]], problems: List[str] = None) -> List[List[str]]:
     """! Attempts to transform the input in a rectangular shape if it is not already.
 
     @param board - The raw input in a 2D list format.
+    @param problems - A list collecting the problems found. If None, they are reported immediately.
 
     @return The best possible inference for a clean board. If the board is initially
     correct, it should return the same values.
 
     """
-    global has_non_numeric
-    has_non_numeric = False
-
     line_lengths = [len(board_row) for board_row in board]
+    if len(line_lengths) == 0:
+        raise InvalidBoardException("Provided board is empty.")
 
-    # Assume actual width of grid is the mode.
-    true_length = stats.mode(line_lengths, keepdims=False).mode
+    # Assume actual width of grid is the mode, the smallest one in case of a tie.
+    true_length = np.bincount(line_lengths).argmax()
 
-    return list(map(lambda line: clean_line(line, true_length), board))
+    found = [] if problems is None else problems
+    board = [clean_line(line, true_length, found) for line in board]
+    if problems is None:
+        report(found)
+    return board
 
 
-def transform_non_numeric(char: chr) -> chr:
-    """! Transforms any non-numeric character into the '0' character.
+def clean_bytes(data: bytes, problems: List[str]) -> List[np.ndarray]:
+    """! Splits raw input into lines and attempts to clean them to a rectangular shape, as clean_input does.
 
-    @param char - The relevant character.
+    @param data - The raw ASCII input.
+    @param problems - A list collecting the problems found.
 
-    @return '0' if the character is non-numeric, otherwise returns the original character.
+    @return The cleaned lines, as arrays of bytes.
     """
-    global has_non_numeric
+    data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    codes = np.frombuffer(data, dtype=np.uint8)
+
+    # A final line break does not start another line.
+    ends = np.flatnonzero(codes == ord("\n"))
+    if len(codes) > 0 and (len(ends) == 0 or ends[-1] != len(codes) - 1):
+        ends = np.append(ends, len(codes))
+    if len(ends) == 0:
+        raise InvalidBoardException("Provided board is empty.")
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    lengths = ends - starts
+
+    # Assume actual width of grid is the mode, the smallest one in case of a tie.
+    true_length = np.bincount(lengths).argmax()
+
+    lines = []
+    for start, end in zip(starts, ends):
+        line = codes[start:end]
+        excess = len(line) - true_length
+        if excess < 0:
+            problems.append(PADDED_MESSAGE)
+            line = np.concatenate([line, np.full(-excess, ord(" "), dtype=np.uint8)])
+        elif excess > 0:
+            # Remove trailing non-numeric symbols, then leading ones which are not dots.
+            problems.append(TRIMMED_MESSAGE)
+            trailing = np.flatnonzero(IS_DIGIT[line[::-1]])
+            n_trailing = min(excess, trailing[0] if len(trailing) > 0 else len(line))
+            line = line[: len(line) - n_trailing]
+            leading = np.flatnonzero(IS_DIGIT[line] | (line == ord(".")))
+            n_leading = min(
+                excess - n_trailing, leading[0] if len(leading) > 0 else len(line)
+            )
+            line = line[n_leading:]
+        lines.append(line)
+    return lines
+
+
+def preprocess_bytes(board: np.ndarray, problems: List[str]) -> np.ndarray:
+    """! Transforms a 9x9 or 11x11 board of bytes into one containing numbers, as preprocess_input does.
+
+    @param board - The cleaned board as a 2D array of bytes.
+    @param problems - A list collecting the problems found.
+    @returns The finally parsed sudoku board with numerical values.
+    """
+    if board.shape == (11, 11):
+        # Mask the expected boundary rows/columns
+        relevant_indeces = np.arange(11) % 4 != 3
+        board = board[relevant_indeces][:, relevant_indeces]
+    elif board.shape != (9, 9):
+        raise InvalidBoardException(
+            f"Provided board should 9x9 or 11x11, received {board.shape}."
+        )
 
-    if not char.isnumeric():
-        has_non_numeric = True
-        return "0"
-    else:
-        return char
+    if not np.all(IS_DIGIT[board]):
+        problems.append(NON_NUMERIC_MESSAGE)
+    return BYTE_VALUES[board]
 
 
-def preprocess_input_9_by_9(board: np.ndarray) -> np.ndarray:
+def preprocess_input_9_by_9(
+    board: np.ndarray, problems: List[str] = None
+) -> np.ndarray:
     """! Transforms a 9x9 board containing characters into one containing numbers.
-    Non-numeric characters are interpreted as empty cells.
+    Non-numeric characters are interpreted as empty cells, with a warning.
 
     @param board - The parsed sudoku board.
+    @param problems - A list collecting the problems found. If None, they are reported immediately.
     @returns The finally parsed sudoku board with numerical values.
     """
-
-    # Apply the transformation to every member of the board
-    board_as_str = np.vectorize(transform_non_numeric)(board)
+    numeric = np.char.isnumeric(board.astype(str))
+    if not np.all(numeric):
+        if problems is None:
+            warn(NON_NUMERIC_MESSAGE)
+        else:
+            problems.append(NON_NUMERIC_MESSAGE)
 
     # Change the type to the integer type requiring the least memory
-    return board_as_str.astype(np.int8)
+    return np.where(numeric, board, "0").astype(np.int8)
 
 
-def preprocess_input_11_by_11(board):
+def preprocess_input_11_by_11(board, problems: List[str] = None):
     """! Transforms a 11x11 board containing characters into one containing numbers.
     Non-numeric characters not in the 4th/8th row/column are interpreted as empty cells.
 
     @param board - The parsed sudoku board.
+    @param problems - A list collecting the problems found. If None, they are reported immediately.
     @returns The finally parsed sudoku board with numerical values.
     """
 
@@ -109,22 +197,23 @@ def preprocess_input_11_by_11(board):
     board = board[relevant_indeces][:, relevant_indeces]
 
     # After removing, process the board as a 9x9
-    return preprocess_input_9_by_9(board)
+    return preprocess_input_9_by_9(board, problems)
 
 
-def preprocess_input(board):
+def preprocess_input(board, problems: List[str] = None):
     """! Transforms a board containing characters into one containing numbers.
     Non-numeric characters are interpreted as empty cells. The only accepted board
     sizes are 9x9 and 11x11.
 
     @param board - The parsed sudoku board.
+    @param problems - A list collecting the problems found. If None, they are reported immediately.
     @returns The finally parsed sudoku board with numerical values.
     """
 
     if board.shape == (9, 9):
-        return preprocess_input_9_by_9(board)
+        return preprocess_input_9_by_9(board, problems)
     elif board.shape == (11, 11):
-        return preprocess_input_11_by_11(board)
+        return preprocess_input_11_by_11(board, problems)
     else:
         raise InvalidBoardException(
             f"Provided board should 9x9 or 11x11, received {board.shape}."
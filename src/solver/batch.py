@@ -0,0 +1,210 @@
+"""!@file batch.py
+@brief Solves many boards at once by applying the logic rules to all of them with array operations.
+
+@details Solves many boards at once by applying the logic rules to all of them with array operations.
+The possibilities of N boards are held as an (N, 81) array of bitmasks, in which bit n - 1 is set if
+the number n is a possibility. Obvious singles, hidden singles and pointers (in both directions) are
+applied to all boards in lockstep, until none of them makes progress. Only the boards which still
+require guessing are searched, each with its own stack of guesses but still advancing in lockstep.
+"""
+from typing import List, Tuple, Union
+import numpy as np
+
+import src.parsing.sudoku_parser as sudparser
+from src.solver.board import HOUSE_CELLS, CELL_HOUSES, POPCOUNT
+from src.exceptions import InvalidBoardException
+from src.logic.complex_logic import (
+    INTERSECTION_CELLS,
+    LINE_REST_CELLS,
+    BLOCK_REST_CELLS,
+)
+
+
+ALL_NUMBERS = 0b111111111
+
+# The indeces of the row, column and block of every cell, as an 81x3 array.
+CELL_HOUSE_INDECES = np.array(CELL_HOUSES)
+
+# For every cell, the 4 intersections whose remaining line cells contain it,
+# and the 4 intersections whose remaining block cells contain it.
+LINE_REST_INTERSECTIONS = np.array(
+    [np.flatnonzero(np.any(LINE_REST_CELLS == cell, axis=1)) for cell in range(81)]
+)
+BLOCK_REST_INTERSECTIONS = np.array(
+    [np.flatnonzero(np.any(BLOCK_REST_CELLS == cell, axis=1)) for cell in range(81)]
+)
+
+# The value of every single-bit mask, 0 for all other masks.
+MASK_VALUES = np.zeros(ALL_NUMBERS + 1, dtype=np.int8)
+MASK_VALUES[1 << np.arange(9)] = np.arange(1, 10)
+
+
+def givens_to_masks(givens: np.ndarray) -> np.ndarray:
+    """! Converts boards to possibility bitmasks, in which empty cells may take any value.
+
+    @param givens - An (N, 81) array of values, 0 for empty cells.
+
+    @return The (N, 81) array of bitmasks.
+    """
+    shifts = np.maximum(givens.astype(np.int16) - 1, 0)
+    return np.where(givens > 0, 1 << shifts, ALL_NUMBERS).astype(np.uint16)
+
+
+def count_in_houses(house_masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """! Computes which numbers appear at least once and at least twice among the cells of each house.
+
+    @param house_masks - An (N, 27, 9) array of the bitmasks of the cells of every house.
+
+    @return The (N, 27) bitmasks of the numbers appearing at least once and at least twice.
+    """
+    once = np.zeros(house_masks.shape[:2], dtype=np.uint16)
+    twice = np.zeros(house_masks.shape[:2], dtype=np.uint16)
+    for position in range(9):
+        twice |= once & house_masks[:, :, position]
+        once |= house_masks[:, :, position]
+    return once, twice
+
+
+def propagate_masks(masks: np.ndarray) -> np.ndarray:
+    """! Applies obvious singles, hidden singles and pointers to all boards, until none of them changes.
+    Boards are dropped from the computation as soon as they stop changing or a contradiction is found.
+
+    @param masks - The (N, 81) array of bitmasks, which is updated in place.
+
+    @return A boolean array marking the boards found to have no solution.
+    """
+    failed = np.zeros(len(masks), dtype=bool)
+    active = np.arange(len(masks))
+
+    while len(active) > 0:
+        current = masks[active]
+        previous = current.copy()
+
+        # Obvious singles - remove the value of every solved cell from its houses.
+        counts = POPCOUNT[current]
+        singles = np.where(counts == 1, current, 0).astype(np.uint16)
+        seen, repeated = count_in_houses(singles[:, HOUSE_CELLS])
+        contradiction = np.any(repeated != 0, axis=1)
+        eliminated = np.bitwise_or.reduce(seen[:, CELL_HOUSE_INDECES], axis=2)
+        current = np.where(counts == 1, current, current & ~eliminated)
+
+        # Hidden singles - a number possible in a single cell of a house is placed there.
+        seen, repeated = count_in_houses(current[:, HOUSE_CELLS])
+        contradiction |= np.any(seen != ALL_NUMBERS, axis=1)
+        unique = seen & ~repeated
+        hidden = np.bitwise_or.reduce(
+            current[:, :, np.newaxis] & unique[:, CELL_HOUSE_INDECES], axis=2
+        )
+        contradiction |= np.any(POPCOUNT[hidden] > 1, axis=1)
+        current = np.where(hidden != 0, hidden, current)
+
+        # Pointers - a number confined to an intersection within its block (line) is removed from
+        # the rest of its line (block).
+        shared = np.bitwise_or.reduce(current[:, INTERSECTION_CELLS], axis=2)
+        line_rest = np.bitwise_or.reduce(current[:, LINE_REST_CELLS], axis=2)
+        block_rest = np.bitwise_or.reduce(current[:, BLOCK_REST_CELLS], axis=2)
+        pointing = shared & ~block_rest
+        claiming = shared & ~line_rest
+        eliminated = np.bitwise_or.reduce(
+            pointing[:, LINE_REST_INTERSECTIONS], axis=2
+        ) | np.bitwise_or.reduce(claiming[:, BLOCK_REST_INTERSECTIONS], axis=2)
+        current &= ~eliminated
+
+        contradiction |= np.any(current == 0, axis=1)
+        masks[active] = current
+        failed[active] |= contradiction
+
+        changed = np.any(current != previous, axis=1) & ~contradiction
+        active = active[changed]
+
+    return failed
+
+
+def search_masks(masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """! Searches for a solution of every board by guessing, depth-first, with the boards still advancing
+    in lockstep. Each board keeps its own stack of states. In every round, the top state of each stack
+    branches on the lowest possibility of its cell with the fewest possibilities - either placing it or
+    removing it - and the children of all boards are propagated together.
+
+    @param masks - The (N, 81) array of propagated bitmasks of unsolved boards.
+
+    @return An (N, 81) array of the solutions, and a boolean array marking the solved boards.
+    """
+    solutions = np.zeros(masks.shape, dtype=np.int8)
+    solved = np.zeros(len(masks), dtype=bool)
+    stacks = [[board] for board in masks]
+    active = list(range(len(masks)))
+
+    while len(active) > 0:
+        states = np.array([stacks[board].pop() for board in active])
+        counts = POPCOUNT[states]
+        cells = np.where(counts > 1, counts, 10).argmin(axis=1)
+        rows = np.arange(len(active))
+        cell_masks = states[rows, cells]
+        lowest = cell_masks & (~cell_masks + 1)
+
+        children = np.concatenate([states, states])
+        children[rows, cells] = cell_masks & ~lowest
+        children[len(active) + rows, cells] = lowest
+        failed = propagate_masks(children)
+        complete = np.all(POPCOUNT[children] == 1, axis=1) & ~failed
+
+        remaining = []
+        for index, board in enumerate(active):
+            # The guessed child is on top of the stack, so that it is searched first.
+            for child in (index, index + len(active)):
+                if complete[child]:
+                    solutions[board] = MASK_VALUES[children[child]]
+                    solved[board] = True
+                elif not failed[child]:
+                    stacks[board].append(children[child])
+            if not solved[board] and len(stacks[board]) > 0:
+                remaining.append(board)
+        active = remaining
+
+    return solutions, solved
+
+
+def solve_batch(
+    inputs: Union[List[str], np.ndarray], batch_size: int = 4096
+) -> Tuple[np.ndarray, np.ndarray]:
+    """! Solves many boards, applying the logic rules to all of them at once before guessing.
+
+    @param inputs - The paths to the board files, as accepted by sudoku_parser.parse,
+    or an (N, 9, 9) array of givens.
+    @param batch_size - The number of boards propagated together, which bounds the memory used.
+
+    @return An (N, 9, 9) array of the solutions, and a boolean array marking the solved boards.
+    Unsolved boards have a solution of zeros.
+    """
+    if isinstance(inputs, np.ndarray):
+        givens = inputs.reshape(-1, 81).astype(np.int8)
+        valid = np.ones(len(givens), dtype=bool)
+    else:
+        givens = np.zeros((len(inputs), 81), dtype=np.int8)
+        valid = np.zeros(len(inputs), dtype=bool)
+        for index, path in enumerate(inputs):
+            try:
+                givens[index] = sudparser.parse(path, verbose=False).flatten()
+                valid[index] = True
+            except (InvalidBoardException, FileNotFoundError):
+                pass
+
+    solutions = np.zeros((len(givens), 81), dtype=np.int8)
+    solved = np.zeros(len(givens), dtype=bool)
+    for start in range(0, len(givens), batch_size):
+        masks = givens_to_masks(givens[start : start + batch_size])
+        failed = propagate_masks(masks) | ~valid[start : start + batch_size]
+        values = MASK_VALUES[masks]
+        complete = np.all(values != 0, axis=1) & ~failed
+
+        solutions[start : start + batch_size][complete] = values[complete]
+        solved[start : start + batch_size] = complete
+
+        # The remaining boards require guessing.
+        guessing = np.flatnonzero(~complete & ~failed)
+        guessed, guessed_solved = search_masks(masks[guessing])
+        solutions[start + guessing] = guessed
+        solved[start + guessing] = guessed_solved
+
+    return solutions.reshape(-1, 9, 9), solved
@@ -7,8 +7,12 @@ consistent representations of the correct numbers, as well as all possibilites f
 @author Created by I. Petrov on 26/11/2023
 """
 
+import copy
 import numpy as np
+from typing import Set
 from src.exceptions import InvalidBoardException
+from src.solver.symmetry import find_automorphisms
+from src.solver.context import SolveContext
 
 
 def get_block_indeces(row, col):
@@ -18,33 +22,189 @@ def get_block_indeces(row, col):
     ]
 
 
+# The cell coordinates of all 27 houses - the 9 rows, followed by the 9 columns and the 9 blocks.
+HOUSES = (
+    [[(row, col) for col in range(9)] for row in range(9)]
+    + [[(row, col) for row in range(9)] for col in range(9)]
+    + [get_block_indeces(3 * (block // 3), 3 * (block % 3)) for block in range(9)]
+)
+
+# The same coordinates as a 27x9 array of row indeces and a 27x9 array of column indeces,
+# so that per-house views of a 9x9 array can be obtained with a single indexing operation.
+HOUSE_ROWS, HOUSE_COLS = np.moveaxis(np.array(HOUSES), -1, 0)
+# The flattened cell indeces of all houses, as a 27x9 array.
+HOUSE_CELLS = 9 * HOUSE_ROWS + HOUSE_COLS
+
+
+# For each flattened cell index, the set of flattened indeces of the 20 cells sharing a house with it.
+PEERS = [
+    frozenset(
+        9 * i + j
+        for house in HOUSES
+        if (cell // 9, cell % 9) in house
+        for i, j in house
+        if (i, j) != (cell // 9, cell % 9)
+    )
+    for cell in range(81)
+]
+# The same peers as an 81x20 array, for gathering the values of the peers with a single indexing operation.
+PEER_INDECES = np.array([sorted(peers) for peers in PEERS])
+
+
+# For each flattened cell index, the indeces (in HOUSES) of its row, column and block.
+CELL_HOUSES = [
+    (cell // 9, 9 + cell % 9, 18 + 3 * (cell // 27) + (cell % 9) // 3)
+    for cell in range(81)
+]
+
+
+def get_house_name(house: int) -> str:
+    """! Obtains the type of a house from its index in HOUSES.
+
+    @param house - The index of the house.
+
+    @return Either "row", "column" or "block".
+    """
+    return ("row", "column", "block")[house // 9]
+
+
+# The number of set bits for every 9-bit mask.
+POPCOUNT = np.array([bin(mask).count("1") for mask in range(512)], dtype=np.int8)
+
+
+def possibilities_to_mask(possibilities: Set[int]) -> int:
+    """! Converts a set of possibilities to a bitmask, in which bit n - 1 is set
+    if the number n is a possibility.
+
+    @param possibilities - The set of possible values.
+
+    @return The corresponding bitmask.
+    """
+    mask = 0
+    for num in possibilities:
+        mask |= 1 << (int(num) - 1)
+    return mask
+
+
+def mask_to_possibilities(mask: int) -> Set[int]:
+    """! Converts a bitmask of possibilities back to a set of values.
+
+    @param mask - The bitmask, in which bit n - 1 represents the number n.
+
+    @return The set of possible values.
+    """
+    return set(num for num in range(1, 10) if mask & (1 << (num - 1)))
+
+
+class BoardAnalysis:
+    """! Structures derived from a single version of a board state, shared between all logic rules.
+    Each structure is computed lazily, at most once per version, and is read-only."""
+
+    def __init__(self, board) -> None:
+        """! Creates an empty analysis of a board state.
+
+        @param board - The board to be analysed.
+        """
+        self.version = board.version
+        self.__board = board
+        self.__masks = None
+        self.__counts = None
+        self.__tensor = None
+        self.__unsolved_tensor = None
+
+    @property
+    def masks(self) -> np.ndarray:
+        """! A 9x9 integer array, in which bit n - 1 of a cell is set if n is a possibility."""
+        if self.__masks is None:
+            masks = np.fromiter(
+                (
+                    possibilities_to_mask(cell)
+                    for cell in self.__board.cell_possibilities.flat
+                ),
+                dtype=np.int16,
+                count=81,
+            ).reshape(9, 9)
+            masks.flags.writeable = False
+            self.__masks = masks
+        return self.__masks
+
+    @property
+    def counts(self) -> np.ndarray:
+        """! A 9x9 array of the number of possibilities of each cell."""
+        if self.__counts is None:
+            self.__counts = POPCOUNT[self.masks]
+            self.__counts.flags.writeable = False
+        return self.__counts
+
+    @property
+    def tensor(self) -> np.ndarray:
+        """! A 9x9x9 boolean array, in which entry [n - 1, row, col] is set if n is a possibility."""
+        if self.__tensor is None:
+            shifts = np.arange(9)[:, np.newaxis, np.newaxis]
+            self.__tensor = ((self.masks >> shifts) & 1).astype(bool)
+            self.__tensor.flags.writeable = False
+        return self.__tensor
+
+    @property
+    def unsolved_tensor(self) -> np.ndarray:
+        """! The digit-plane possibilities, restricted to unsolved cells."""
+        if self.__unsolved_tensor is None:
+            self.__unsolved_tensor = self.tensor & (self.__board.board == 0)
+            self.__unsolved_tensor.flags.writeable = False
+        return self.__unsolved_tensor
+
+    @property
+    def bivalue_cells(self) -> dict:
+        """! The index of unsolved cells with exactly 2 possibilities, which the board keeps up to date."""
+        return self.__board.bivalue_cells
+
+
 class Board:
     """! The class representing a board state.
     Is able to keep track of possibilities for each cell and also receive updates
     on the board state.
     """
 
-    def __init__(self, board: np.ndarray) -> None:
+    def __init__(self, board: np.ndarray, context: SolveContext = None) -> None:
         """! Creates a board state from an initial matrix.
 
         @param board - The initial parsed configuration. Must be a 9x9 NumPy array.
+        @param context - The state of the solve which is not part of the board state, by default a new one.
         @throws ValueError - if passed board is not of the correct shape or type.
         """
 
         if type(board) != np.ndarray or board.shape != (9, 9):
             raise ValueError("Invalid board type or shape passed to Board class.")
 
+        self.context = SolveContext() if context is None else context
+
         self.board = np.zeros((9, 9), dtype=np.int8)
         self.cell_possibilities = np.array(
             [[set(range(1, 10)) for _ in range(9)] for _ in range(9)]
         )
 
+        # Bookkeeping of the logic rules (e.g. bitsets of the findings already applied), keyed by the rule
+        # name. It is part of the board state, so that it is restored alongside it when backtracking.
+        self.applied = {}
+
+        # Incremented on every change of the state, to invalidate the shared analysis.
+        # Values and possibilities should therefore only be changed through the Board methods.
+        self.version = 0
+        self.__analysis = None
+
+        # Index of the unsolved cells with exactly 2 possibilities, mapping the flattened cell index
+        # to the bitmask of its possibilities. It is kept up to date on every change of possibilities.
+        self.bivalue_cells = {}
+
         # Create the board by performing updates on the known cells
         for i in range(9):
             for j in range(9):
                 if board[i, j] != 0:
                     self.update(i, j, board[i, j])
 
+        # Symmetries of the given numbers, used for pruning equivalent branches when backtracking.
+        self.automorphisms = find_automorphisms(self.board)
+
     def __format_row(self, row: np.ndarray) -> str:
         """! Creates a string representation of a board row for visualisation.
 
@@ -70,19 +230,139 @@ class Board:
         return out
 
     def check_validity(self) -> bool:
-        """! Verifies whether all possibility entries are non-empty."""
-        return np.all(
-            [
-                len(self.cell_possibilities[i, j]) >= 1
-                for i in range(9)
-                for j in range(9)
-            ]
-        )
+        """! Verifies whether the board state can still lead to a solution. A state is invalid if
+        some cell has no possibilities, some number cannot be placed anywhere in a house, or two cells
+        in a house are both forced to the same value.
+
+        @return Whether no contradiction has been detected.
+        """
+        possibilities = self.analysis.tensor.reshape(9, 81)
+        n_possibilities = self.analysis.counts.flatten()
+        if np.any(n_possibilities == 0):
+            return False
+
+        # Indexed by number, house and cell within the house.
+        in_house = possibilities[:, HOUSE_CELLS]
+        if not np.all(np.any(in_house, axis=2)):
+            return False
+
+        forced = in_house & (n_possibilities[HOUSE_CELLS] == 1)
+        return not np.any(forced.sum(axis=2) > 1)
 
     def get_possibilities(self) -> np.ndarray:
         """! Computes the possibilities for the value in each cell."""
         return self.cell_possibilities
 
+    @property
+    def analysis(self) -> BoardAnalysis:
+        """! The analysis of the current version of the board state, shared between logic rules."""
+        if self.__analysis is None or self.__analysis.version != self.version:
+            self.__analysis = BoardAnalysis(self)
+        return self.__analysis
+
+    def get_candidate_masks(self) -> np.ndarray:
+        """! Obtains a bitmask representation of the possibilities for each cell.
+
+        @return A read-only 9x9 integer array, in which bit n - 1 of a cell is set if n is a possibility.
+        """
+        return self.analysis.masks
+
+    def get_candidate_tensor(self) -> np.ndarray:
+        """! Obtains the digit-plane representation of the possibilities for each cell.
+
+        @return A read-only 9x9x9 boolean array, in which entry [n - 1, row, col] is set if n is a possibility.
+        """
+        return self.analysis.tensor
+
+    def __cell_changed(self, row: int, col: int) -> None:
+        """! Records a change of the value or possibilities of a cell. Updates the bivalue cell index
+        and invalidates the shared analysis.
+
+        @param row - The row of the cell.
+        @param col - The column of the cell.
+        """
+        self.version += 1
+        if self.board[row, col] == 0 and len(self.cell_possibilities[row, col]) == 2:
+            self.bivalue_cells[9 * row + col] = possibilities_to_mask(
+                self.cell_possibilities[row, col]
+            )
+        else:
+            self.bivalue_cells.pop(9 * row + col, None)
+
+    def restore(
+        self, board: np.ndarray, cell_possibilities: np.ndarray, applied: dict
+    ) -> None:
+        """! Replaces the whole board state, e.g. with a previously stored one when backtracking.
+
+        @param board - The values of the cells.
+        @param cell_possibilities - The possibilities of the cells.
+        @param applied - The bookkeeping of the logic rules.
+        """
+        self.board = board
+        self.cell_possibilities = cell_possibilities
+        self.applied = applied
+        self.bivalue_cells = {}
+        for i in range(9):
+            for j in range(9):
+                self.__cell_changed(i, j)
+
+    def copy(self) -> "Board":
+        """! Creates an independent copy of the board state. The copy has a new solve context,
+        reporting progress to the same output.
+
+        @return The copied board.
+        """
+        copied = copy.copy(self)
+        copied.context = SolveContext(self.context.output)
+        copied.__analysis = None
+        copied.restore(
+            self.board.copy(),
+            np.array([[set(cell) for cell in row] for row in self.cell_possibilities]),
+            self.applied.copy(),
+        )
+        return copied
+
+    def reset_cell(self, row: int, col: int, value: int = 0) -> None:
+        """! Sets or clears (value 0) a cell regardless of its possibilities, e.g. after a user edit.
+        The possibilities of the cell and its peers are recomputed from the values on the board only,
+        so eliminations made by logic rules on these cells are discarded, as is the rule bookkeeping.
+
+        @param row - The row of the cell.
+        @param col - The column of the cell.
+        @param value - The new value of the cell, or 0 to clear it.
+        """
+        self.board[row, col] = value
+        self.applied = {}
+        flat = self.board.reshape(81)
+        cell = 9 * row + col
+        for peer in (cell, *PEERS[cell]):
+            i, j = divmod(peer, 9)
+            if flat[peer] != 0:
+                self.cell_possibilities[i, j] = {int(flat[peer])}
+            else:
+                self.cell_possibilities[i, j] = set(range(1, 10)).difference(
+                    flat[PEER_INDECES[peer]].tolist()
+                )
+            self.__cell_changed(i, j)
+
+    def eliminate(self, row: int, col: int, nums: Set[int]) -> bool:
+        """! Removes a set of values from the possibilities of an unsolved cell.
+
+        @param row - The row of the cell.
+        @param col - The column of the cell.
+        @param nums - The values to be removed.
+
+        @return Whether any possibility was removed.
+        """
+        if self.board[row, col] != 0:
+            return False
+        n_possibilities = len(self.cell_possibilities[row, col])
+        self.cell_possibilities[row, col].difference_update(nums)
+        if len(self.cell_possibilities[row, col]) == n_possibilities:
+            return False
+        self.__cell_changed(row, col)
+        return True
+
     def update_possibilities(self, row, col, value):
         """! Efficiently updates the possibilities of a cell in a
         changed row, column or block.
@@ -91,20 +371,12 @@ class Board:
         @param col - The column of the updated cell.
         @param value - The value of the updated cell.
         """
-        # Update row
-        for i in range(9):
-            if i != col and self.board[row, i] == 0:
-                self.cell_possibilities[row, i].discard(value)
-
-        # Update column
-        for i in range(9):
-            if i != row and self.board[i, col] == 0:
-                self.cell_possibilities[i, col].discard(value)
-
-        block_idx = get_block_indeces(row, col)
-        for i, j in block_idx:
-            if (i, j) != (row, col) and self.board[i, j] == 0:
+        # Update the row, column and block
+        for cell in PEERS[9 * row + col]:
+            i, j = cell // 9, cell % 9
+            if self.board[i, j] == 0 and value in self.cell_possibilities[i, j]:
                 self.cell_possibilities[i, j].discard(value)
+                self.__cell_changed(i, j)
 
     def update(self, row: int, col: int, value: int) -> None:
         """! Enters a value for a particular cell if possible.
@@ -121,8 +393,54 @@ class Board:
             )
         self.cell_possibilities[row, col] = set([value])
         self.board[row, col] = value
+        self.__cell_changed(row, col)
         self.update_possibilities(row, col, value)
 
+    def update_many(
+        self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray
+    ) -> None:
+        """! Enters several values at once. The possibilities are updated once for every
+        affected row, column and block, rather than once for every value.
+
+        @param rows - The rows of the cells.
+        @param cols - The columns of the cells.
+        @param values - The values to be inserted.
+
+        @throws InvalidBoardException - If one of the values is impossible, or if two of the values
+        are the same within a house.
+        """
+        new_values = np.zeros(81, dtype=np.int8)
+        for row, col, value in zip(rows, cols, values):
+            if value not in self.cell_possibilities[row, col]:
+                raise InvalidBoardException(
+                    "Attempting to set a value that has been removed as an option."
+                )
+            new_values[9 * row + col] = value
+
+        # Check that no house receives the same value twice.
+        house_values = np.sort(new_values[HOUSE_CELLS], axis=1)
+        if np.any(
+            (house_values[:, 1:] == house_values[:, :-1]) & (house_values[:, 1:] != 0)
+        ):
+            raise InvalidBoardException(
+                "Attempting to set the same value twice in a house."
+            )
+
+        for row, col, value in zip(rows, cols, values):
+            self.cell_possibilities[row, col] = set([int(value)])
+            self.board[row, col] = value
+            self.__cell_changed(row, col)
+
+        # Update the affected rows, columns and blocks
+        for house in np.flatnonzero(np.any(house_values != 0, axis=1)):
+            removed = set(house_values[house][house_values[house] != 0].tolist())
+            for i, j in HOUSES[house]:
+                if self.board[i, j] == 0 and not removed.isdisjoint(
+                    self.cell_possibilities[i, j]
+                ):
+                    self.cell_possibilities[i, j].difference_update(removed)
+                    self.__cell_changed(i, j)
+
     def is_solved(self) -> bool:
         """! Checks if the state is solved. Assumes that consistent checks have been performed."""
         return np.all(self.board != 0)
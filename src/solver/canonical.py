@@ -0,0 +1,274 @@
+"""!@file canonical.py
+@brief Canonical forms of sudoku boards, and a cache of solutions keyed by them.
+
+@details Canonical forms of sudoku boards, and a cache of solutions keyed by them. Two boards are
+equivalent if one can be turned into the other by transposition, swapping bands and stacks, swapping
+rows within a band and columns within a stack, and relabeling the numbers - which maps solutions
+onto solutions. The canonical form of a board is the lexicographically smallest board equivalent
+to it, read row by row with empty cells as 0, in which the numbers are relabeled in the order
+of their first appearance.
+
+The canonical form is found row by row. Every candidate transformation is extended by each row
+which may be placed next, and only the candidates producing the smallest row are kept. As the numbers
+are relabeled in the order of their appearance, the rows produced so far do not depend on the later
+choices, so the pruned candidates cannot lead to a smaller board.
+"""
+import itertools
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import numpy as np
+
+from src.solver.solver import SudokuSolver
+from src.logic.base_logic import BaseLogic, BaseBacktracker
+from src.logic.backtracking import SelectiveBacktracker
+from src.logic.singles_logic import ObviousSingles, HiddenSingles
+from src.logic.complex_logic import HiddenPointers, ObviousPairs
+
+
+# All 1296 column orders - a permutation of the stacks, and of the columns within each stack.
+COLUMN_PERMUTATIONS = np.array(
+    [
+        [3 * stack + col for stack, order in zip(stacks, orders) for col in order]
+        for stacks in itertools.permutations(range(3))
+        for orders in itertools.product(itertools.permutations(range(3)), repeat=3)
+    ]
+)
+
+# The weights of the cells of a row, so that comparing weighted sums compares rows lexicographically.
+ROW_WEIGHTS = 10 ** np.arange(8, -1, -1, dtype=np.int64)
+POSITION_WEIGHTS = 2 ** np.arange(8, -1, -1, dtype=np.int64)
+
+# The number of candidate transformations above which equivalent candidates are merged.
+MAX_CANDIDATES = 64
+
+
+class Transformation:
+    """! A class representing a transformation between equivalent boards. The image of a board X
+    is given by X'[r, c] = nums[Y[rows[r], cols[c]]], where Y is X or its transpose.
+    """
+
+    def __init__(
+        self, transposed: bool, rows: np.ndarray, cols: np.ndarray, nums: np.ndarray
+    ):
+        """! Creates a transformation.
+
+        @param transposed - Whether the board is transposed first.
+        @param rows - For each row of the image, the row of the (transposed) board mapped onto it.
+        @param cols - For each column of the image, the column of the (transposed) board mapped onto it.
+        @param nums - An array of length 10, mapping each number to its relabeled value (0 is kept as 0).
+        """
+        self.transposed = transposed
+        self.rows = rows
+        self.cols = cols
+        self.nums = nums
+        self.inverse_nums = np.argsort(nums)
+
+    def apply(self, board: np.ndarray) -> np.ndarray:
+        """! Computes the image of a board.
+
+        @param board - A 9x9 array of values.
+
+        @return The transformed 9x9 array.
+        """
+        board = board.T if self.transposed else board
+        return self.nums[board[np.ix_(self.rows, self.cols)]].astype(np.int8)
+
+    def invert(self, board: np.ndarray) -> np.ndarray:
+        """! Computes the board whose image is the given board.
+
+        @param board - A 9x9 array of values.
+
+        @return The 9x9 array mapped onto the board by the transformation.
+        """
+        original = np.zeros((9, 9), dtype=np.int8)
+        original[np.ix_(self.rows, self.cols)] = self.inverse_nums[board]
+        return original.T if self.transposed else original
+
+
+def relabel(line: np.ndarray, labels: np.ndarray, n_labels: np.ndarray) -> np.ndarray:
+    """! Relabels the next row of every candidate, assigning new labels in the order of first appearance.
+
+    @param line - The (K, 9) values of the next row of every candidate.
+    @param labels - The (K, 10) labels assigned so far, 0 for unassigned numbers. Updated in place.
+    @param n_labels - The number of labels assigned so far by every candidate. Updated in place.
+
+    @return The (K, 9) relabeled rows.
+    """
+    relabeled = np.zeros_like(line)
+    indeces = np.arange(len(line))
+    for col in range(9):
+        nums = line[:, col]
+        new = (nums != 0) & (labels[indeces, nums] == 0)
+        n_labels[new] += 1
+        labels[indeces[new], nums[new]] = n_labels[new]
+        relabeled[:, col] = labels[indeces, nums]
+    return relabeled
+
+
+def canonicalize(board: np.ndarray) -> Tuple[np.ndarray, Transformation]:
+    """! Computes the canonical form of a board.
+
+    @param board - A 9x9 array of the given numbers, with 0 marking an empty cell.
+
+    @return The 9x9 canonical form, and a transformation mapping the board onto it.
+    """
+    values = np.asarray(board, dtype=np.int64).reshape(9, 9)
+    grids = np.stack([values, values.T])
+
+    # The first row is relabeled in increasing order, so it is mostly decided by the positions of its givens.
+    # Only the rows and column orders placing them last are considered.
+    positions = (grids != 0).reshape(18, 9)[:, COLUMN_PERMUTATIONS] @ POSITION_WEIGHTS
+    source, order = np.nonzero(positions == positions.min())
+    transposed, next_row = source // 9, source % 9
+    cols = COLUMN_PERMUTATIONS[order]
+    rows = np.zeros((len(source), 0), dtype=np.int64)
+    labels = np.zeros((len(source), 10), dtype=np.int64)
+    n_labels = np.zeros(len(source), dtype=np.int64)
+
+    for row in range(9):
+        if row > 0:
+            # A row starting a band may come from any unused band, otherwise from the current band.
+            bands = np.arange(9) // 3
+            if row % 3 == 0:
+                used = np.zeros((len(rows), 3), dtype=bool)
+                used[np.arange(len(rows))[:, np.newaxis], rows[:, ::3] // 3] = True
+                allowed = ~used[:, bands]
+            else:
+                allowed = bands == rows[:, [-1]] // 3
+                allowed[np.arange(len(rows))[:, np.newaxis], rows] = False
+            candidate, next_row = np.nonzero(allowed)
+            transposed, cols = transposed[candidate], cols[candidate]
+            labels, n_labels = labels[candidate], n_labels[candidate]
+            rows = rows[candidate]
+        rows = np.column_stack([rows, next_row])
+
+        line = grids[transposed[:, np.newaxis], next_row[:, np.newaxis], cols]
+        keys = relabel(line, labels, n_labels) @ ROW_WEIGHTS
+        keep = keys == keys.min()
+        transposed, cols, rows = transposed[keep], cols[keep], rows[keep]
+        labels, n_labels = labels[keep], n_labels[keep]
+
+        if len(rows) > MAX_CANDIDATES:
+            # Candidates whose remaining rows look the same, after reordering the columns and relabeling,
+            # produce the same rows from now on, so only one of them is kept. This happens on sparse boards.
+            remaining = grids[
+                transposed[:, np.newaxis, np.newaxis],
+                np.arange(9)[:, np.newaxis],
+                cols[:, np.newaxis],
+            ]
+            indeces = np.arange(len(rows))[:, np.newaxis, np.newaxis]
+            remaining = np.where(
+                labels[indeces, remaining] != 0,
+                labels[indeces, remaining],
+                remaining + 10,
+            )
+            remaining[np.arange(len(rows))[:, np.newaxis], rows] = 0
+            used = np.zeros((len(rows), 9), dtype=np.int64)
+            used[np.arange(len(rows))[:, np.newaxis], rows] = 1
+            state = np.column_stack([remaining.reshape(len(rows), 81), used]).astype(
+                np.int8
+            )
+            _, unique = np.unique(
+                state.view(f"V{state.shape[1]}").ravel(), return_index=True
+            )
+            transposed, cols, rows = transposed[unique], cols[unique], rows[unique]
+            labels, n_labels = labels[unique], n_labels[unique]
+
+    # Numbers which are not given receive the remaining labels in order.
+    nums = labels[0].copy()
+    missing = [num for num in range(1, 10) if nums[num] == 0]
+    nums[missing] = np.arange(n_labels[0] + 1, 10)
+
+    transformation = Transformation(bool(transposed[0]), rows[0], cols[0], nums)
+    return transformation.apply(values), transformation
+
+
+class SolutionCache:
+    """! A bounded cache of solutions in front of the solver, keyed by the canonical form of the boards,
+    so that a board equivalent to a previously solved one is answered without solving. The least
+    recently used entries are evicted first.
+
+    Canonicalizing a board takes several milliseconds, and up to about 0.1 s on sparse boards, which is
+    comparable to solving an easy board. Boards whose exact givens were seen before are therefore looked up
+    by their givens first, and only other boards are canonicalized.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        logic_rules: List[BaseLogic] = None,
+        backtracker: BaseBacktracker = SelectiveBacktracker,
+    ):
+        """! Creates an empty cache.
+
+        @param max_size - The maximum number of cached solutions.
+        @param logic_rules - A list of logic rules used on cache misses.
+        @param backtracker - The backtracking algorithm used on cache misses.
+        """
+        if logic_rules is None:
+            logic_rules = [ObviousSingles, HiddenSingles, HiddenPointers, ObviousPairs]
+
+        self.max_size = max_size
+        self.logic_rules = logic_rules
+        self.backtracker = backtracker
+        self.hits = 0
+        self.misses = 0
+        # Canonical solutions by the bytes of the canonical forms, None for boards without a solution.
+        self.__entries = OrderedDict()
+        # The canonical form and transformation of recently seen boards, by the bytes of their givens.
+        self.__givens = OrderedDict()
+
+    def __len__(self) -> int:
+        """! Obtains the number of cached solutions."""
+        return len(self.__entries)
+
+    def solve(self, board_value: np.ndarray) -> Optional[np.ndarray]:
+        """! Solves a board, looking up the solution of its canonical form first.
+
+        @param board_value - The 9x9 array of givens.
+
+        @return The 9x9 solution, or None if the board has no solution.
+        """
+        givens = np.asarray(board_value, dtype=np.int8).reshape(9, 9).tobytes()
+        if givens in self.__givens:
+            key, transformation = self.__givens[givens]
+        else:
+            canonical, transformation = canonicalize(board_value)
+            key = canonical.tobytes()
+        self.__givens[givens] = key, transformation
+        self.__givens.move_to_end(givens)
+        if len(self.__givens) > self.max_size:
+            self.__givens.popitem(last=False)
+
+        if key in self.__entries:
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            solution = self.__entries[key]
+            return None if solution is None else transformation.invert(solution)
+
+        self.misses += 1
+        solver = SudokuSolver(
+            logic_rules=self.logic_rules,
+            backtracker=self.backtracker,
+            verbose=False,
+            board_value=np.asarray(board_value, dtype=np.int8).reshape(9, 9),
+        )
+        if solver.run():
+            solution = solver.board.board.copy()
+            self.__store(key, transformation.apply(solution))
+            return solution
+
+        # Only boards proven to have no solution are cached, not those which ran out of steps.
+        if solver.is_solvable is False:
+            self.__store(key, None)
+        return None
+
+    def __store(self, key: bytes, solution: Optional[np.ndarray]) -> None:
+        """! Stores a canonical solution, evicting the least recently used one if the cache is full.
+
+        @param key - The bytes of the canonical form.
+        @param solution - The canonical solution, or None if the board has no solution.
+        """
+        self.__entries[key] = solution
+        if len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
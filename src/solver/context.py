@@ -0,0 +1,49 @@
+"""!@file context.py
+@brief The mutable state of a single solve, apart from the board state.
+
+@details The mutable state of a single solve, apart from the board state. It holds the memory of the
+backtracker, the random generators of the randomised components and the destination of the reported
+progress. Each board owns a context, so that the logic rule and backtracker instances themselves only
+hold their configuration and can be shared between many solves, e.g. running in different threads.
+"""
+from typing import Callable, Hashable
+import numpy as np
+
+
+class SolveContext:
+    """! The state of a single solve, which is not part of the board state."""
+
+    def __init__(self, output: Callable = print) -> None:
+        """! Creates an empty context.
+
+        @param output - The function receiving the reported progress, or None to discard it.
+        """
+        self.output = output
+
+        # The states before every guess of the backtracker, and the guesses themselves.
+        self.board_memory = []
+        self.cell_pos_memory = []
+        self.applied_memory = []
+        self.guess_memory = []
+
+        self.generators = {}
+
+    def log(self, *args) -> None:
+        """! Reports progress of the solve.
+
+        @param args - The values to report.
+        """
+        if self.output is not None:
+            self.output(*args)
+
+    def get_generator(self, key: Hashable, seed: int) -> np.random.Generator:
+        """! Obtains the random generator of a component, creating it on the first use within this solve.
+
+        @param key - The component using the generator.
+        @param seed - The seed of the generator.
+
+        @return The random generator.
+        """
+        if key not in self.generators:
+            self.generators[key] = np.random.default_rng(seed)
+        return self.generators[key]
@@ -0,0 +1,360 @@
+"""!@file corpus.py
+@brief Runs the solver over a corpus of board files in parallel.
+
+@details Runs the solver over a corpus of board files in parallel. The files are parsed once into an array
+of givens, which is placed in shared memory and distributed in ranges over a pool of worker processes. Each
+worker solves its boards without printing and writes the outcomes into shared output arrays. The result and
+duration of every board are collected in the order of the files and can be summarised per directory.
+Results can be reused from a persistent ResultCache, so that only the boards without a stored result are solved.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+
+import src.parsing.sudoku_parser as sudparser
+from src.solver.solver import SudokuSolver
+from src.solver.result_cache import ResultCache
+from src.exceptions import InvalidBoardException
+from src.logic.base_logic import BaseLogic, BaseBacktracker
+
+
+def load_corpus(paths: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """! Parses all board files into a single array of givens.
+
+    @param paths - The paths to the files containing the boards.
+
+    @return An (N, 81) int8 array of the givens, and a boolean array marking the files
+    which were parsed successfully.
+    """
+    givens = np.zeros((len(paths), 81), dtype=np.int8)
+    valid = np.zeros(len(paths), dtype=bool)
+    for index, path in enumerate(paths):
+        try:
+            givens[index] = sudparser.parse(path, verbose=False).flatten()
+            valid[index] = True
+        except (InvalidBoardException, FileNotFoundError):
+            pass
+    return givens, valid
+
+
+def solve_range(
+    arrays: Dict[str, np.ndarray],
+    start: int,
+    stop: int,
+    logic_rules: List[BaseLogic],
+    backtracker: BaseBacktracker,
+    rules: List[BaseLogic] = None,
+    backtracker_instance: BaseBacktracker = None,
+) -> None:
+    """! Solves a range of boards without printing, writing the outcomes into the output arrays.
+
+    @param arrays - The "givens" and "valid" input arrays, and the "solved", "unsolvable", "steps", "durations"
+    and "solutions" output arrays, as created by create_arrays.
+    @param start - The index of the first board.
+    @param stop - The index after the last board.
+    @param logic_rules - A list of logic rules.
+    @param backtracker - The backtracking algorithm to apply when a deadlock is reached.
+    @param rules - Instances of the logic rules shared by all solves, by default created for every solve.
+    @param backtracker_instance - An instance of the backtracker shared by all solves,
+    by default created for every solve.
+    """
+    for index in range(start, stop):
+        if not arrays["valid"][index]:
+            continue
+        begin = time.perf_counter()
+        solver = SudokuSolver(
+            logic_rules=logic_rules,
+            backtracker=backtracker,
+            verbose=False,
+            board_value=arrays["givens"][index].reshape(9, 9),
+        )
+        if solver.run(rules=rules, backtracker=backtracker_instance):
+            arrays["solved"][index] = True
+            arrays["solutions"][index] = solver.board.board.flatten()
+        arrays["unsolvable"][index] = solver.is_solvable is False
+        arrays["steps"][index] = solver.n_steps
+        arrays["durations"][index] = time.perf_counter() - begin
+
+
+def create_arrays(
+    givens: np.ndarray, valid: np.ndarray, create: Callable = None
+) -> Dict[str, np.ndarray]:
+    """! Creates the input and output arrays for solving a corpus, with the inputs filled in.
+
+    @param givens - The (N, 81) int8 array of givens.
+    @param valid - The boolean array marking the boards to be solved.
+    @param create - A function creating a zero-filled array from its shape and type,
+    by default numpy.zeros.
+
+    @return The "givens" and "valid" input arrays, and the "solved", "unsolvable", "steps", "durations"
+    and "solutions" output arrays.
+    """
+    if create is None:
+        create = np.zeros
+    arrays = {
+        "givens": create((len(givens), 81), np.int8),
+        "valid": create((len(givens),), bool),
+        "solved": create((len(givens),), bool),
+        "unsolvable": create((len(givens),), bool),
+        "steps": create((len(givens),), np.int64),
+        "durations": create((len(givens),), np.float64),
+        "solutions": create((len(givens), 81), np.int8),
+    }
+    arrays["givens"][:] = givens
+    arrays["valid"][:] = valid
+    return arrays
+
+
+def solve_threaded(
+    givens: np.ndarray,
+    valid: np.ndarray,
+    logic_rules: List[BaseLogic],
+    backtracker: BaseBacktracker,
+    workers: int = None,
+    chunksize: int = 16,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """! Solves all boards of a parsed corpus on a pool of threads, sharing a single set of logic rule and
+    backtracker instances. This scales with the number of threads on free-threaded builds of Python,
+    and otherwise within the sections of NumPy which release the GIL.
+
+    @param givens - The (N, 81) int8 array of givens.
+    @param valid - The boolean array marking the boards to be solved.
+    @param logic_rules - A list of logic rules.
+    @param backtracker - The backtracking algorithm to apply when a deadlock is reached.
+    @param workers - The number of threads, by default the number of CPUs.
+    @param chunksize - The number of boards solved by a thread at once.
+
+    @return Whether every board was solved, the durations in seconds and the (N, 81) solutions.
+    """
+    arrays = create_arrays(givens, valid)
+    solve = partial(
+        solve_range,
+        arrays,
+        logic_rules=logic_rules,
+        backtracker=backtracker,
+        rules=[rule() for rule in logic_rules],
+        backtracker_instance=backtracker(),
+    )
+    starts = range(0, len(givens), chunksize)
+    stops = [min(start + chunksize, len(givens)) for start in starts]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        list(executor.map(solve, starts, stops))
+    return arrays["solved"], arrays["durations"], arrays["solutions"]
+
+
+# The shared memory blocks and the arrays on top of them, attached to once per worker process.
+WORKER_MEMORY = []
+WORKER_ARRAYS = {}
+
+
+def attach_shared_arrays(layout: Dict[str, Tuple[str, tuple, str]]) -> None:
+    """! Attaches a worker process to the shared arrays of a corpus.
+
+    @param layout - The name of the shared memory block, the shape and the type of every array.
+    """
+    for key, (name, shape, dtype) in layout.items():
+        memory = shared_memory.SharedMemory(name=name)
+        WORKER_MEMORY.append(memory)
+        WORKER_ARRAYS[key] = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def solve_shared_range(
+    start: int,
+    stop: int,
+    logic_rules: List[BaseLogic],
+    backtracker: BaseBacktracker,
+) -> None:
+    """! Solves a range of boards of the shared corpus. Run in a worker process.
+
+    @param start - The index of the first board.
+    @param stop - The index after the last board.
+    @param logic_rules - A list of logic rules.
+    @param backtracker - The backtracking algorithm to apply when a deadlock is reached.
+    """
+    solve_range(WORKER_ARRAYS, start, stop, logic_rules, backtracker)
+
+
+def solve_corpus_arrays(
+    givens: np.ndarray,
+    valid: np.ndarray,
+    logic_rules: List[BaseLogic],
+    backtracker: BaseBacktracker,
+    workers: int = None,
+    chunksize: int = None,
+) -> Dict[str, np.ndarray]:
+    """! Solves all boards of a parsed corpus. With several workers, the givens are placed in shared memory,
+    from which the workers read their ranges of boards without copying. The workers write the outcomes
+    into shared output arrays, so only the bounds of the ranges are sent between the processes.
+
+    @param givens - The (N, 81) int8 array of givens.
+    @param valid - The boolean array marking the boards to be solved.
+    @param logic_rules - A list of logic rules.
+    @param backtracker - The backtracking algorithm to apply when a deadlock is reached.
+    @param workers - The number of worker processes, by default the number of CPUs.
+    A single worker solves the boards in the current process.
+    @param chunksize - The number of boards sent to a worker at once, by default chosen so that
+    every worker receives about 4 ranges.
+
+    @return The input and output arrays, as created by create_arrays.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1 or len(givens) <= 1:
+        arrays = create_arrays(givens, valid)
+        solve_range(arrays, 0, len(givens), logic_rules, backtracker)
+        return arrays
+
+    if chunksize is None:
+        chunksize = max(1, len(givens) // (4 * workers))
+
+    memory, specs = [], []
+
+    def create_shared(shape: tuple, dtype: type) -> np.ndarray:
+        """! Creates a zero-filled array in a new shared memory block."""
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        block = shared_memory.SharedMemory(create=True, size=size)
+        memory.append(block)
+        specs.append((block.name, shape, np.dtype(dtype).str))
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array[:] = 0
+        return array
+
+    arrays = {}
+    try:
+        arrays = create_arrays(givens, valid, create_shared)
+        # The arrays are created in the order of their keys.
+        layout = dict(zip(arrays, specs))
+
+        solve = partial(
+            solve_shared_range, logic_rules=logic_rules, backtracker=backtracker
+        )
+        starts = range(0, len(givens), chunksize)
+        stops = [min(start + chunksize, len(givens)) for start in starts]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=attach_shared_arrays,
+            initargs=(layout,),
+        ) as executor:
+            list(executor.map(solve, starts, stops))
+
+        return {key: array.copy() for key, array in arrays.items()}
+    finally:
+        arrays.clear()
+        for block in memory:
+            block.close()
+            block.unlink()
+
+
+def solve_corpus(
+    givens: np.ndarray,
+    valid: np.ndarray,
+    logic_rules: List[BaseLogic],
+    backtracker: BaseBacktracker,
+    workers: int = None,
+    chunksize: int = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """! Solves all boards of a parsed corpus, as solve_corpus_arrays does.
+
+    @param givens - The (N, 81) int8 array of givens.
+    @param valid - The boolean array marking the boards to be solved.
+    @param logic_rules - A list of logic rules.
+    @param backtracker - The backtracking algorithm to apply when a deadlock is reached.
+    @param workers - The number of worker processes, by default the number of CPUs.
+    @param chunksize - The number of boards sent to a worker at once.
+
+    @return Whether every board was solved, the durations in seconds and the (N, 81) solutions.
+    """
+    arrays = solve_corpus_arrays(
+        givens, valid, logic_rules, backtracker, workers, chunksize
+    )
+    return arrays["solved"], arrays["durations"], arrays["solutions"]
+
+
+def run_corpus(
+    paths: List[str],
+    logic_rules: List[BaseLogic],
+    backtracker: BaseBacktracker,
+    workers: int = None,
+    chunksize: int = None,
+    cache: ResultCache = None,
+) -> List[Tuple[str, bool, float]]:
+    """! Solves all board files, distributing them over a pool of worker processes.
+    The files are parsed once, in the current process.
+
+    @param paths - The paths to the files containing the boards.
+    @param logic_rules - A list of logic rules.
+    @param backtracker - The backtracking algorithm to apply when a deadlock is reached.
+    @param workers - The number of worker processes, by default the number of CPUs.
+    A single worker solves the boards in the current process.
+    @param chunksize - The number of boards sent to a worker at once, by default chosen so that
+    every worker receives about 4 ranges.
+    @param cache - A cache of results to reuse, in which the results of the solved boards are stored.
+    The duration of a reused result is the one stored.
+
+    @return The path, whether the board was solved and the duration in seconds, for every file in order.
+    """
+    givens, valid = load_corpus(paths)
+    solved = np.zeros(len(paths), dtype=bool)
+    durations = np.zeros(len(paths))
+    pending = valid.copy()
+
+    if cache is not None:
+        keys = [
+            cache.make_key(board, logic_rules, backtracker) if valid[index] else None
+            for index, board in enumerate(givens)
+        ]
+        stored = cache.get_many([key for key in keys if key is not None])
+        for index, key in enumerate(keys):
+            if key in stored:
+                solvable, _, _, durations[index] = stored[key]
+                solved[index] = bool(solvable)
+                pending[index] = False
+
+    indeces = np.flatnonzero(pending)
+    arrays = solve_corpus_arrays(
+        givens[indeces], valid[indeces], logic_rules, backtracker, workers, chunksize
+    )
+    solved[indeces] = arrays["solved"]
+    durations[indeces] = arrays["durations"]
+
+    if cache is not None:
+        cache.put_many(
+            [
+                (
+                    keys[index],
+                    True
+                    if arrays["solved"][position]
+                    else (False if arrays["unsolvable"][position] else None),
+                    arrays["solutions"][position]
+                    if arrays["solved"][position]
+                    else None,
+                    arrays["steps"][position],
+                    arrays["durations"][position],
+                )
+                for position, index in enumerate(indeces)
+            ]
+        )
+
+    return list(zip(paths, solved.tolist(), durations.tolist()))
+
+
+def summarize(
+    results: List[Tuple[str, bool, float]]
+) -> Dict[str, Tuple[int, int, float]]:
+    """! Groups the results of a corpus run by the directory of the files.
+
+    @param results - The results returned by run_corpus.
+
+    @return For every directory, the number of solved boards, the total number of boards
+    and the total solving time in seconds.
+    """
+    summary = {}
+    for path, result, duration in results:
+        directory = os.path.basename(os.path.dirname(path))
+        success, total, total_duration = summary.get(directory, (0, 0, 0.0))
+        summary[directory] = (success + result, total + 1, total_duration + duration)
+    return summary
@@ -0,0 +1,249 @@
+"""!@file parallel_search.py
+@brief Searches the guessing tree of a single board on several worker processes.
+
+@details Searches the guessing tree of a single board on several worker processes. The tree is the one
+of the selective backtracker: after applying the logic rules, the cell with the fewest possibilities
+is branched on, with one subtree per possibility. A subproblem is described by the list of guesses
+leading to it, from which a worker rebuilds the board state.
+
+The top levels of the tree are expanded up front into a shared queue of subproblems. Every worker
+searches its subproblem depth-first and, whenever another worker is idle, hands over the shallowest
+unexplored subtree on its stack through the same queue. The search either stops at the first solution
+or counts all of them.
+"""
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+import numpy as np
+
+from src.solver.board import Board
+from src.exceptions import InvalidBoardException
+from src.logic.base_logic import BaseLogic
+from src.logic.singles_logic import ObviousSingles, HiddenSingles
+from src.logic.complex_logic import HiddenPointers, ObviousPairs
+
+
+def propagate(board: Board, rules: List[BaseLogic]) -> bool:
+    """! Applies the logic rules until none of them makes progress, restarting from the first rule
+    after every success, as the solver does.
+
+    @param board - The board to apply the rules on.
+    @param rules - The logic rule instances.
+
+    @return Whether the resulting state is free of contradictions.
+    """
+    try:
+        while board.check_validity() and not board.is_solved():
+            if not any(rule.step(board) for rule in rules):
+                return True
+    except InvalidBoardException:
+        return False
+    return board.check_validity()
+
+
+def branch(board: Board, guesses: list) -> List[Tuple[list, Board]]:
+    """! Branches on the unsolved cell with the fewest possibilities.
+
+    @param board - The unsolved, propagated board state.
+    @param guesses - The guesses leading to the board state.
+
+    @return The guesses and the board state of every child, in the order of the guessed values.
+    """
+    counts = np.where(board.board == 0, board.analysis.counts, 10)
+    row, col = np.unravel_index(counts.argmin(), (9, 9))
+    children = []
+    for num in sorted(int(num) for num in board.cell_possibilities[row, col]):
+        child = board.copy()
+        try:
+            child.update(row, col, num)
+        except InvalidBoardException:
+            continue
+        children.append((guesses + [(int(row), int(col), num)], child))
+    return children
+
+
+def rebuild(givens: np.ndarray, guesses: list) -> Optional[Board]:
+    """! Rebuilds the board state of a subproblem from the givens and its guesses.
+
+    @param givens - The 9x9 array of givens.
+    @param guesses - The row, column and value of every guess.
+
+    @return The board state, or None if the guesses contradict each other.
+    """
+    try:
+        board = Board(givens)
+        for row, col, num in guesses:
+            board.update(row, col, num)
+    except InvalidBoardException:
+        return None
+    return board
+
+
+def search_worker(
+    givens: np.ndarray,
+    logic_rules: List[BaseLogic],
+    count_all: bool,
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    pending: multiprocessing.Value,
+    idle: multiprocessing.Value,
+    n_solutions: multiprocessing.Value,
+    stop: multiprocessing.Event,
+) -> None:
+    """! Searches subproblems from the shared queue until the search is stopped or no subproblem
+    is pending anymore. Run in a worker process.
+
+    @param givens - The 9x9 array of givens.
+    @param logic_rules - A list of logic rules.
+    @param count_all - Whether to count all solutions instead of stopping at the first one.
+    @param tasks - The queue of subproblems, each given by its list of guesses.
+    @param results - The queue receiving the first solution found.
+    @param pending - The number of subproblems which are queued or being searched.
+    @param idle - The number of workers waiting for a subproblem.
+    @param n_solutions - The number of solutions found.
+    @param stop - Set when the search should end.
+    """
+    # Donated subproblems are always consumed before the search ends, so there is no need to wait
+    # for them to be flushed on exit.
+    tasks.cancel_join_thread()
+    rules = [rule() for rule in logic_rules]
+
+    while not stop.is_set():
+        with idle.get_lock():
+            idle.value += 1
+        try:
+            guesses = tasks.get(timeout=0.01)
+        except queue.Empty:
+            guesses = None
+        with idle.get_lock():
+            idle.value -= 1
+        if guesses is None:
+            if pending.value == 0:
+                return
+            continue
+
+        stack = [(guesses, rebuild(givens, guesses))]
+        while len(stack) > 0 and not stop.is_set():
+            # Hand over the shallowest subtree to an idle worker.
+            if len(stack) > 1 and idle.value > 0:
+                with pending.get_lock():
+                    pending.value += 1
+                tasks.put(stack.pop(0)[0])
+
+            guesses, board = stack.pop()
+            if board is None or not propagate(board, rules):
+                continue
+            if board.is_solved():
+                with n_solutions.get_lock():
+                    n_solutions.value += 1
+                    if n_solutions.value == 1:
+                        results.put(board.board.copy())
+                if not count_all:
+                    stop.set()
+                    return
+                continue
+            stack.extend(reversed(branch(board, guesses)))
+
+        with pending.get_lock():
+            pending.value -= 1
+
+
+def parallel_search(
+    board_value: np.ndarray,
+    logic_rules: List[BaseLogic] = None,
+    workers: int = None,
+    count_all: bool = False,
+    timeout: float = None,
+) -> Tuple[Optional[np.ndarray], int, bool]:
+    """! Searches for the solutions of a board on a pool of worker processes.
+
+    @param board_value - The 9x9 array of givens.
+    @param logic_rules - A list of logic rules applied before every guess.
+    @param workers - The number of worker processes, by default the number of CPUs.
+    @param count_all - Whether to count all solutions instead of stopping at the first one.
+    @param timeout - The maximum time in seconds to search for, or None to search until done.
+
+    @return A solution, or None if none was found, the number of solutions found, and whether the search
+    finished before the timeout. If it did not, the board may have (further) solutions which were not found.
+    The solution may also be missing if the worker which found it had to be terminated.
+    """
+    if logic_rules is None:
+        logic_rules = [ObviousSingles, HiddenSingles, HiddenPointers, ObviousPairs]
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Expand the top levels of the tree until every worker can receive a few subproblems.
+    rules = [rule() for rule in logic_rules]
+    root = rebuild(board_value, [])
+    frontier = deque([([], root)] if root is not None else [])
+    solution, n_found = None, 0
+    while 0 < len(frontier) < 2 * workers:
+        guesses, board = frontier.popleft()
+        if not propagate(board, rules):
+            continue
+        if board.is_solved():
+            solution = board.board.copy() if solution is None else solution
+            n_found += 1
+            if not count_all:
+                return solution, n_found, True
+            continue
+        frontier.extend(branch(board, guesses))
+    if len(frontier) == 0:
+        return solution, n_found, True
+
+    tasks = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    pending = multiprocessing.Value("i", len(frontier))
+    idle = multiprocessing.Value("i", 0)
+    n_solutions = multiprocessing.Value("q", 0)
+    stop = multiprocessing.Event()
+    for guesses, _ in frontier:
+        tasks.put(guesses)
+
+    processes = [
+        multiprocessing.Process(
+            target=search_worker,
+            args=(
+                board_value,
+                logic_rules,
+                count_all,
+                tasks,
+                results,
+                pending,
+                idle,
+                n_solutions,
+                stop,
+            ),
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    # The search ends once it is stopped by a solution, or no subproblem is left.
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while not stop.is_set() and pending.value > 0:
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        stop.wait(0.01)
+    finished = stop.is_set() or pending.value == 0
+    stop.set()
+
+    for process in processes:
+        process.join(timeout=1)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    if n_solutions.value > 0 and solution is None:
+        try:
+            # A terminated worker may not have sent the solution it counted.
+            solution = results.get(timeout=1)
+        except queue.Empty:
+            pass
+    tasks.cancel_join_thread()
+    return solution, n_found + n_solutions.value, finished
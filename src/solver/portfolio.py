@@ -0,0 +1,134 @@
+"""!@file portfolio.py
+@brief Solves a board by racing several solver configurations in parallel.
+
+@details Solves a board by racing several solver configurations in parallel. Every configuration
+of logic rules and backtracker runs in its own worker process. The first configuration to finish
+determines the result, after which the other workers are terminated. This bounds the solving time
+on boards on which a single configuration makes unlucky guesses.
+"""
+import multiprocessing
+import queue
+import time
+from functools import partial
+from typing import List, Optional, Tuple
+import numpy as np
+
+from src.solver.solver import SudokuSolver
+from src.logic.base_logic import BaseLogic, BaseBacktracker
+from src.logic.backtracking import SelectiveBacktracker
+from src.logic.template_logic import TemplateBacktracker
+from src.logic.singles_logic import ObviousSingles, HiddenSingles
+from src.logic.complex_logic import HiddenPointers, ObviousPairs
+
+
+# The default configurations - differing in the choice and order of guesses.
+PORTFOLIO = [
+    (
+        [ObviousSingles, HiddenSingles, HiddenPointers, ObviousPairs],
+        SelectiveBacktracker,
+    ),
+    (
+        [ObviousSingles, HiddenSingles, HiddenPointers, ObviousPairs],
+        partial(SelectiveBacktracker, seed=1),
+    ),
+    (
+        [ObviousSingles, HiddenSingles, HiddenPointers, ObviousPairs],
+        partial(SelectiveBacktracker, seed=2),
+    ),
+    ([ObviousSingles, HiddenSingles], TemplateBacktracker),
+]
+
+# The time in seconds between checks for workers which stopped without reporting.
+POLL_INTERVAL = 0.1
+
+
+def solve_configuration(
+    index: int,
+    board_value: np.ndarray,
+    logic_rules: List[BaseLogic],
+    backtracker: BaseBacktracker,
+    results: multiprocessing.Queue,
+) -> None:
+    """! Solves a board with a single configuration and reports the outcome. Run in a worker process.
+
+    @param index - The index of the configuration.
+    @param board_value - The 9x9 array of givens.
+    @param logic_rules - A list of logic rules.
+    @param backtracker - The backtracking algorithm to apply when a deadlock is reached.
+    @param results - The queue receiving the index, whether the board was solved or proven to have
+    no solution, and the solution or None.
+    """
+    try:
+        solver = SudokuSolver(
+            logic_rules=logic_rules,
+            backtracker=backtracker,
+            verbose=False,
+            board_value=board_value,
+        )
+        if solver.run():
+            results.put((index, True, solver.board.board.copy()))
+        else:
+            # A solver which ran out of steps has proven nothing, so it does not decide the result.
+            results.put((index, solver.is_solvable is False, None))
+    except Exception:
+        results.put((index, False, None))
+
+
+def solve_portfolio(
+    board_value: np.ndarray,
+    configurations: List[Tuple[List[BaseLogic], BaseBacktracker]] = None,
+    timeout: float = None,
+) -> Tuple[Optional[int], Optional[np.ndarray]]:
+    """! Races the configurations on a board and returns the result of the first one to finish.
+
+    @param board_value - The 9x9 array of givens.
+    @param configurations - The pairs of logic rules and backtracker to race, by default PORTFOLIO.
+    @param timeout - The maximum time in seconds to wait for a result, or None to wait indefinitely.
+
+    @return The index of the configuration that finished first and the solution, which is None if the
+    board has no solution. The index is None as well if no configuration finished in time, e.g. because
+    all of them failed or ran out of steps.
+    """
+    if configurations is None:
+        configurations = PORTFOLIO
+
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(
+            target=solve_configuration,
+            args=(index, board_value, logic_rules, backtracker, results),
+            daemon=True,
+        )
+        for index, (logic_rules, backtracker) in enumerate(configurations)
+    ]
+    for worker in workers:
+        worker.start()
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        # Configurations that failed with an error or gave up do not decide the result.
+        n_reported = 0
+        while n_reported < len(workers):
+            wait = POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, max(0, deadline - time.monotonic()))
+            try:
+                index, finished, solution = results.get(timeout=wait)
+            except queue.Empty:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                # Workers which were killed never report, so the wait ends once all of them stopped.
+                if not any(worker.is_alive() for worker in workers) and results.empty():
+                    break
+                continue
+            n_reported += 1
+            if finished:
+                return index, solution
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+        results.close()
+
+    return None, None
@@ -0,0 +1,232 @@
+"""!@file result_cache.py
+@brief A persistent cache of solver results, stored in an SQLite database.
+
+@details A persistent cache of solver results, stored in an SQLite database. Every result is keyed by
+a hash of the givens and the solver configuration - the logic rules, the backtracker and the step limit.
+It holds whether the board was solved or proven to have no solution, the solution, the number of steps
+and the solving time. Results are stored together with the version of the solver which produced them,
+and the results of other versions are removed when the cache is opened. Once the cache holds more than
+its maximum number of results, the least recently used ones are evicted.
+"""
+import hashlib
+import sqlite3
+import time
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from src.solver.solver import SOLVER_VERSION, MAX_STEPS
+from src.logic.base_logic import BaseLogic, BaseBacktracker
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    solvable INTEGER,
+    solution TEXT,
+    n_steps INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+# The number of keys looked up by a single query.
+QUERY_SIZE = 500
+
+
+def describe(component) -> str:
+    """! Describes a logic rule or backtracker, including the arguments bound to it.
+
+    @param component - The class of the component, or a partial application of it.
+
+    @return The description.
+    """
+    if isinstance(component, partial):
+        arguments = [repr(arg) for arg in component.args]
+        arguments += [
+            f"{key}={value!r}" for key, value in sorted(component.keywords.items())
+        ]
+        return f"{describe(component.func)}({', '.join(arguments)})"
+    return f"{component.__module__}.{component.__qualname__}"
+
+
+class ResultCache:
+    """! A persistent cache of solver results in an SQLite database."""
+
+    def __init__(
+        self, path: str, max_entries: int = 100000, version: str = SOLVER_VERSION
+    ):
+        """! Opens a cache, creating the database if it does not exist, and removes the results
+        of other solver versions.
+
+        @param path - The path of the database file.
+        @param max_entries - The maximum number of stored results.
+        @param version - The version of the solver whose results are stored.
+        """
+        self.max_entries = max_entries
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+        self.invalidate()
+
+    def __len__(self) -> int:
+        """! Obtains the number of stored results."""
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        """! Closes the database."""
+        self.connection.close()
+
+    def make_key(
+        self,
+        board_value: np.ndarray,
+        logic_rules: List[BaseLogic],
+        backtracker: BaseBacktracker,
+        max_steps: int = MAX_STEPS,
+    ) -> str:
+        """! Computes the key of a board and solver configuration.
+
+        @param board_value - The 9x9 array of givens.
+        @param logic_rules - A list of logic rules.
+        @param backtracker - The backtracking algorithm to apply when a deadlock is reached.
+        @param max_steps - The maximum amount of steps of a solve.
+
+        @return The hexadecimal hash of the givens and the configuration.
+        """
+        givens = "".join(str(value) for value in np.asarray(board_value).flat)
+        configuration = [describe(rule) for rule in logic_rules]
+        configuration += [describe(backtracker), str(max_steps), self.version]
+        return hashlib.sha256("|".join([givens] + configuration).encode()).hexdigest()
+
+    def get_many(
+        self, keys: List[str]
+    ) -> Dict[str, Tuple[Optional[bool], Optional[np.ndarray], int, float]]:
+        """! Looks up the stored results of several keys, marking them as recently used.
+
+        @param keys - The keys to look up.
+
+        @return For every key with a stored result, whether the board has a solution (None if the solver
+        ran out of steps), the 9x9 solution or None, the number of steps and the solving time in seconds.
+        """
+        results = {}
+        for start in range(0, len(keys), QUERY_SIZE):
+            chunk = keys[start : start + QUERY_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.connection.execute(
+                "SELECT key, solvable, solution, n_steps, duration FROM results"
+                f" WHERE version = ? AND key IN ({placeholders})",
+                [self.version] + chunk,
+            )
+            for key, solvable, solution, n_steps, duration in rows:
+                if solution is not None:
+                    solution = np.array(
+                        [int(char) for char in solution], dtype=np.int8
+                    ).reshape(9, 9)
+                results[key] = (
+                    None if solvable is None else bool(solvable),
+                    solution,
+                    n_steps,
+                    duration,
+                )
+
+        self.hits += len(results)
+        self.misses += len(keys) - len(results)
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE results SET last_used = ? WHERE key = ?",
+                [(now, key) for key in results],
+            )
+        return results
+
+    def get(
+        self, key: str
+    ) -> Optional[Tuple[Optional[bool], Optional[np.ndarray], int, float]]:
+        """! Looks up the stored result of a key, marking it as recently used.
+
+        @param key - The key to look up.
+
+        @return The stored result as returned by get_many, or None if there is none.
+        """
+        return self.get_many([key]).get(key)
+
+    def put_many(
+        self,
+        results: List[Tuple[str, Optional[bool], Optional[np.ndarray], int, float]],
+    ) -> None:
+        """! Stores several results, replacing previous results of the same keys, and evicts
+        the least recently used results if the cache is full.
+
+        @param results - The key, whether the board has a solution (None if the solver ran out of steps),
+        the 9x9 solution or None, the number of steps and the solving time in seconds of every result.
+        """
+        now = time.time()
+        rows = [
+            (
+                key,
+                self.version,
+                None if solvable is None else int(solvable),
+                None
+                if solution is None
+                else "".join(str(value) for value in np.asarray(solution).flat),
+                int(n_steps),
+                float(duration),
+                now,
+            )
+            for key, solvable, solution, n_steps, duration in results
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        self.evict()
+
+    def put(
+        self,
+        key: str,
+        solvable: Optional[bool],
+        solution: Optional[np.ndarray],
+        n_steps: int,
+        duration: float,
+    ) -> None:
+        """! Stores a single result, as put_many does.
+
+        @param key - The key of the result.
+        @param solvable - Whether the board has a solution, None if the solver ran out of steps.
+        @param solution - The 9x9 solution, or None.
+        @param n_steps - The number of steps of the solve.
+        @param duration - The solving time in seconds.
+        """
+        self.put_many([(key, solvable, solution, n_steps, duration)])
+
+    def evict(self) -> int:
+        """! Removes the least recently used results beyond the maximum number of results.
+
+        @return The number of removed results.
+        """
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM results WHERE key IN"
+                " (SELECT key FROM results ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+        return excess
+
+    def invalidate(self) -> int:
+        """! Removes the results of solver versions other than the version of the cache.
+
+        @return The number of removed results.
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM results WHERE version != ?", (self.version,)
+            )
+        return cursor.rowcount
@@ -0,0 +1,388 @@
+"""!@file service.py
+@brief A local solving service, answering requests of a line-delimited JSON protocol.
+
+@details A local solving service, answering requests of a line-delimited JSON protocol over a Unix socket
+or a TCP port. Every line sent by a client is a request, such as
+{"id": 1, "board": "4.....8.5.3...", "logic": ["ObviousSingles"], "backtracker": "SelectiveBacktracker",
+"timeout": 1.5}, in which the board is a string of 81 characters (digits, with any other character for an
+empty cell) or a 9x9 list. Only the board is required. Every request is answered by a line such as
+{"id": 1, "status": "solved", "solution": "417369825...", "time": 0.012}, with the status being one of
+"solved", "unsolvable" (the board was proven to have no solution), "unknown" (the solver reached its step
+limit without finding out), "timeout", "cancelled" or "error". Answers may be sent in a different order
+than the requests.
+
+The requests are solved on a pool of worker processes, started when the service starts. The number of
+requests being solved at once is bounded - once the bound is reached, further requests wait for a request
+to finish. The number of unanswered requests of a single client is bounded as well, and requests beyond
+that bound are answered with an error. The requests of a client keep being read while they wait, so that
+when the client disconnects, its unfinished requests are cancelled and their workers stop solving them.
+A client which only closes its side of the connection still receives the answers to its requests - they
+are only cancelled once reading from or writing to the client fails.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import numpy as np
+
+import src.parsing.config_parsing as cfg_parse
+from src.solver.solver import SudokuSolver, MAX_STEPS
+from src.exceptions import InvalidBoardException, InvalidStepException
+from src.logic.base_logic import BaseLogic, BaseBacktracker
+from src.logic.backtracking import SelectiveBacktracker
+from src.logic.singles_logic import ObviousSingles, HiddenSingles
+from src.logic.complex_logic import HiddenPointers, ObviousPairs
+
+
+# The cancellation flags of the request slots, shared with the worker processes.
+WORKER_CANCELLED = None
+
+
+def init_worker(cancelled: multiprocessing.Array) -> None:
+    """! Initialises a worker process of the service.
+
+    @param cancelled - The cancellation flags of the request slots.
+    """
+    global WORKER_CANCELLED
+    WORKER_CANCELLED = cancelled
+
+
+def warm_up() -> int:
+    """! Does nothing, so that the worker processes are started before the first request.
+
+    @return The process ID of the worker.
+    """
+    return os.getpid()
+
+
+def parse_request_board(board) -> np.ndarray:
+    """! Converts the board of a request to an array of values.
+
+    @param board - A string of 81 characters, in which characters other than digits are empty cells,
+    or a 9x9 list of values, in which 0 is an empty cell.
+    @throws InvalidBoardException - If the board is not in one of these formats.
+
+    @return The 9x9 array of values.
+    """
+    if isinstance(board, str):
+        if len(board) != 81:
+            raise InvalidBoardException(
+                f"Board should have 81 characters, received {len(board)}."
+            )
+        values = [int(char) if char.isdigit() else 0 for char in board]
+        return np.array(values, dtype=np.int8).reshape(9, 9)
+
+    try:
+        values = np.array(board, dtype=np.int64)
+    except (TypeError, ValueError):
+        raise InvalidBoardException("Board should be a 9x9 list of numbers.")
+    if values.shape != (9, 9) or np.any((values < 0) | (values > 9)):
+        raise InvalidBoardException(
+            "Board should be a 9x9 list of numbers from 0 to 9."
+        )
+    return values.astype(np.int8)
+
+
+def solve_request(
+    slot: int,
+    board_value: np.ndarray,
+    logic_rules: List[BaseLogic],
+    backtracker: BaseBacktracker,
+    deadline: Optional[float],
+    max_steps: int = MAX_STEPS,
+) -> Tuple[str, Optional[str]]:
+    """! Solves the board of a request. Run in a worker process.
+
+    @param slot - The request slot, whose cancellation flag is checked during solving.
+    @param board_value - The 9x9 array of givens.
+    @param logic_rules - A list of logic rules.
+    @param backtracker - The backtracking algorithm to apply when a deadlock is reached.
+    @param deadline - The time.monotonic() time after which to give up, or None.
+    @param max_steps - The maximum amount of steps of the solve.
+
+    @return The status of the request, and the solution as a string of 81 digits if it was solved.
+    """
+
+    def should_stop() -> bool:
+        """! Checks whether the request has been cancelled or has run out of time."""
+        if WORKER_CANCELLED[slot]:
+            return True
+        return deadline is not None and time.monotonic() > deadline
+
+    solver = SudokuSolver(
+        logic_rules=logic_rules,
+        backtracker=backtracker,
+        verbose=False,
+        board_value=board_value,
+    )
+    if solver.run(max_steps=max_steps, should_stop=should_stop):
+        return "solved", "".join(str(value) for value in solver.board.board.flat)
+    if WORKER_CANCELLED[slot]:
+        return "cancelled", None
+    if deadline is not None and time.monotonic() > deadline:
+        return "timeout", None
+    if solver.is_solvable is False:
+        return "unsolvable", None
+    return "unknown", None
+
+
+class SolverService:
+    """! A service solving the requests of its clients on a pool of worker processes."""
+
+    def __init__(
+        self,
+        workers: int = None,
+        max_pending: int = None,
+        timeout: float = None,
+        max_queued: int = None,
+        max_steps: int = MAX_STEPS,
+    ):
+        """! Creates a service. The worker processes are started by start.
+
+        @param workers - The number of worker processes, by default the number of CPUs.
+        @param max_pending - The maximum number of requests being solved or waiting for a worker,
+        by default 4 per worker.
+        @param timeout - The time limit in seconds of requests which do not specify one, or None.
+        @param max_queued - The maximum number of unanswered requests of a single client,
+        by default 4 times max_pending.
+        @param max_steps - The maximum amount of steps of a solve.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.timeout = timeout
+        self.max_queued = max_queued or 4 * self.max_pending
+        self.max_steps = max_steps
+
+        # Every request being solved holds a slot, with a flag for cancelling it in the worker.
+        self.cancelled = multiprocessing.Array("b", self.max_pending, lock=False)
+        self.free_slots = list(range(self.max_pending))
+        self.pending = asyncio.Semaphore(self.max_pending)
+        self.executor = None
+
+    async def start(self) -> None:
+        """! Starts the worker processes."""
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_worker,
+            initargs=(self.cancelled,),
+        )
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self.executor, warm_up) for _ in range(self.workers))
+        )
+
+    async def serve(
+        self, path: str = None, host: str = "127.0.0.1", port: int = 0
+    ) -> asyncio.AbstractServer:
+        """! Starts the worker processes and listens for clients.
+
+        @param path - The path of the Unix socket to listen on. If None, a TCP port is used instead.
+        @param host - The host to listen on with TCP.
+        @param port - The TCP port to listen on, 0 for any free port.
+
+        @return The listening server.
+        """
+        await self.start()
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, path=path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self) -> None:
+        """! Cancels all requests and stops the worker processes."""
+        for slot in range(self.max_pending):
+            self.cancelled[slot] = 1
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def parse_request(self, request: dict) -> tuple:
+        """! Validates a request.
+
+        @param request - The decoded request.
+        @throws InvalidBoardException - If the board or the time limit is missing or invalid.
+        @throws InvalidStepException - If the logic rules or the backtracker do not exist.
+
+        @return The board, the logic rules, the backtracker and the time limit of the request.
+        """
+        if not isinstance(request, dict) or "board" not in request:
+            raise InvalidBoardException("Request should be an object with a board.")
+        board_value = parse_request_board(request["board"])
+
+        logic_rules = [ObviousSingles, HiddenSingles, HiddenPointers, ObviousPairs]
+        if request.get("logic") is not None:
+            logic_rules = [cfg_parse.string_to_step(name) for name in request["logic"]]
+        backtracker = SelectiveBacktracker
+        if request.get("backtracker") is not None:
+            backtracker = cfg_parse.parse_backtracker(request["backtracker"])
+
+        timeout = request.get("timeout", self.timeout)
+        if timeout is not None and (
+            isinstance(timeout, bool)
+            or not isinstance(timeout, (int, float))
+            or not timeout >= 0
+        ):
+            raise InvalidBoardException(
+                "Timeout should be a non-negative number of seconds."
+            )
+
+        return board_value, logic_rules, backtracker, timeout
+
+    def __release(self, slot: int) -> None:
+        """! Makes a request slot available again, once its worker has stopped.
+
+        @param slot - The request slot.
+        """
+        self.free_slots.append(slot)
+        self.pending.release()
+
+    async def solve(self, job: tuple, start: float) -> Tuple[str, Optional[str]]:
+        """! Solves a validated request in a worker process, once a request slot is free.
+        The slot is released once the worker has stopped.
+
+        @param job - The board, the logic rules, the backtracker and the time limit of the request.
+        @param start - The time.monotonic() time at which the request was received.
+
+        @return The status of the request, and the solution if it was solved.
+        """
+        board_value, logic_rules, backtracker, timeout = job
+        deadline = None if timeout is None else start + timeout
+
+        await self.pending.acquire()
+        slot = self.free_slots.pop()
+        self.cancelled[slot] = 0
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                solve_request,
+                slot,
+                board_value,
+                logic_rules,
+                backtracker,
+                deadline,
+                self.max_steps,
+            )
+        except BaseException:
+            self.__release(slot)
+            raise
+        future.add_done_callback(lambda _: self.__release(slot))
+
+        try:
+            # The worker keeps running when the waiting is cancelled, so it is stopped through its flag.
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            self.cancelled[slot] = 1
+            raise
+
+    async def __answer(
+        self, request: dict, job: tuple, start: float, writer, lock: asyncio.Lock
+    ) -> None:
+        """! Solves a request and sends the answer to the client.
+
+        @param request - The decoded request.
+        @param job - The validated request.
+        @param start - The time.monotonic() time at which the request was received.
+        @param writer - The stream writer of the client.
+        @param lock - The lock serialising the answers to the client.
+        """
+        try:
+            status, solution = await self.solve(job, start)
+            response = {"id": request.get("id"), "status": status}
+            if solution is not None:
+                response["solution"] = solution
+        except Exception as error:
+            response = {"id": request.get("id"), "status": "error", "error": str(error)}
+        response["time"] = time.monotonic() - start
+        await self.__send(writer, lock, response)
+
+    async def __send(self, writer, lock: asyncio.Lock, response: dict) -> None:
+        """! Sends an answer to a client.
+
+        @param writer - The stream writer of the client.
+        @param lock - The lock serialising the answers to the client.
+        @param response - The answer.
+        """
+        async with lock:
+            writer.write((json.dumps(response) + "\n").encode())
+            await writer.drain()
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """! Answers the requests of a client until it disconnects, or until it closed its side of the
+        connection and all of its requests are answered.
+
+        @param reader - The stream reader of the client.
+        @param writer - The stream writer of the client.
+        """
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError as error:
+                    # The line exceeded the limit of the stream reader, and was dropped.
+                    response = {"id": None, "status": "error", "error": str(error)}
+                    await self.__send(writer, lock, response)
+                    continue
+                if not line:
+                    # The answers are still sent, unless sending one of them fails.
+                    if tasks:
+                        await asyncio.wait(
+                            set(tasks), return_when=asyncio.FIRST_EXCEPTION
+                        )
+                    break
+                if not line.strip():
+                    continue
+
+                start = time.monotonic()
+                request = {}
+                try:
+                    request = json.loads(line)
+                    job = self.parse_request(request)
+                except (
+                    ValueError,
+                    TypeError,
+                    InvalidBoardException,
+                    InvalidStepException,
+                ) as error:
+                    request_id = (
+                        request.get("id") if isinstance(request, dict) else None
+                    )
+                    response = {
+                        "id": request_id,
+                        "status": "error",
+                        "error": str(error),
+                    }
+                    await self.__send(writer, lock, response)
+                    continue
+
+                if len(tasks) >= self.max_queued:
+                    response = {
+                        "id": request.get("id"),
+                        "status": "error",
+                        "error": "Too many unanswered requests.",
+                    }
+                    await self.__send(writer, lock, response)
+                    continue
+
+                # The request waits for a free slot in its task, while further requests are read.
+                task = asyncio.create_task(
+                    self.__answer(request, job, start, writer, lock)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                # Failures to send the answer are handled below, so they are not logged as unretrieved.
+                task.add_done_callback(
+                    lambda task: task.cancelled() or task.exception()
+                )
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
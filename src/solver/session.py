@@ -0,0 +1,165 @@
+"""!@file session.py
+@brief A live solving session for interactive editing of a board.
+
+@details A live solving session for interactive editing of a board. It keeps the board state between edits,
+so that setting or clearing a cell only recomputes the possibilities of the affected cells. Hints are produced
+by running the logic rules on a separate copy of the state, which is kept and extended for as long as the
+edits are consistent with it. The last solution found is reused for solvability checks while it still
+agrees with the board.
+"""
+from typing import List, Optional, Tuple
+import numpy as np
+from src.solver.board import Board
+from src.solver.solver import SudokuSolver
+from src.exceptions import InvalidBoardException
+
+from src.logic.base_logic import BaseLogic, BaseBacktracker
+from src.logic.backtracking import SelectiveBacktracker
+from src.logic.singles_logic import ObviousSingles, HiddenSingles
+from src.logic.complex_logic import HiddenPointers, ObviousPairs
+
+
+class SolverSession:
+    """! A board being edited by a user, which can be queried for hints and solvability after every edit."""
+
+    def __init__(
+        self,
+        board_value: np.ndarray = None,
+        logic_rules: List[BaseLogic] = None,
+        backtracker: BaseBacktracker = SelectiveBacktracker,
+    ):
+        """! Creates a session from an initial matrix of values.
+
+        @param board_value - The initial 9x9 array of values, or None for an empty board.
+        @param logic_rules - The logic rules used for hints and solving.
+        @param backtracker - The backtracking algorithm used for checking solvability.
+        @throws InvalidBoardException - If the initial values contradict each other.
+        """
+        if board_value is None:
+            board_value = np.zeros((9, 9), dtype=np.int8)
+        self.board = Board(board_value)
+
+        if logic_rules is None:
+            self.logic_rules = [
+                ObviousSingles,
+                HiddenSingles,
+                HiddenPointers,
+                ObviousPairs,
+            ]
+        else:
+            self.logic_rules = logic_rules
+        self.rules = [rule() for rule in self.logic_rules]
+        self.backtracker = backtracker
+
+        # The last solution found, which still answers solvability while it agrees with the board.
+        self.solution = None
+
+        # The state on which the logic rules have been run for hints, and the rule which placed each
+        # of its values that are not on the board yet, keyed by the flattened cell index.
+        self.__hint_board = None
+        self.__hint_sources = {}
+
+    def set_cell(self, row: int, col: int, value: int) -> None:
+        """! Enters a value in a cell, replacing any previous value. Contradicting values are accepted,
+        the board then has no solution until they are cleared.
+
+        @param row - The row of the cell.
+        @param col - The column of the cell.
+        @param value - The value to be entered.
+        @throws ValueError - If the value is not between 1 and 9.
+        """
+        if not 1 <= value <= 9:
+            raise ValueError(f"Cannot enter the value {value} in a cell.")
+        if self.board.board[row, col] == value:
+            return
+        cleared = self.board.board[row, col] != 0
+        self.board.reset_cell(row, col, value)
+
+        # Deductions remain valid when a value is added, as long as the value was still possible.
+        hint_board = self.__hint_board
+        if cleared or hint_board is None:
+            self.__drop_hints()
+        elif hint_board.board[row, col] != value:
+            try:
+                hint_board.update(row, col, value)
+            except InvalidBoardException:
+                self.__drop_hints()
+        self.__hint_sources.pop(9 * row + col, None)
+
+    def clear_cell(self, row: int, col: int) -> None:
+        """! Removes the value of a cell.
+
+        @param row - The row of the cell.
+        @param col - The column of the cell.
+        """
+        if self.board.board[row, col] == 0:
+            return
+        self.board.reset_cell(row, col)
+        self.__drop_hints()
+
+    def __drop_hints(self) -> None:
+        """! Discards the deductions made for hints, as they may not hold after the last edit."""
+        self.__hint_board = None
+        self.__hint_sources = {}
+
+    def hint(self) -> Optional[Tuple[str, int, int, int]]:
+        """! Finds the next value which can be deduced by the logic rules.
+
+        @return The name of the rule, the row, the column and the value of the deduction,
+        or None if the rules make no further progress.
+        @throws InvalidBoardException - If the rules find that the board has no solution.
+        """
+        if self.__hint_board is None:
+            self.__hint_board = self.board.copy()
+        hint_board = self.__hint_board
+
+        while len(self.__hint_sources) == 0:
+            if not hint_board.check_validity():
+                raise InvalidBoardException("The board has no solution.")
+            for rule in self.rules:
+                if not rule.step(hint_board):
+                    continue
+                placed = np.flatnonzero(
+                    (hint_board.board != 0) & (self.board.board == 0)
+                )
+                for cell in placed.tolist():
+                    self.__hint_sources.setdefault(cell, rule.name)
+                break
+            else:
+                return None
+
+        if hint_board.is_solved():
+            self.solution = hint_board.board.copy()
+
+        cell = min(self.__hint_sources)
+        return (
+            self.__hint_sources[cell],
+            cell // 9,
+            cell % 9,
+            int(hint_board.board.flat[cell]),
+        )
+
+    def is_solvable(self) -> Optional[bool]:
+        """! Checks whether the board can still be completed. A full solve is only run if the last solution
+        found does not agree with the board.
+
+        @return Whether the board has a solution, or None if the solver ran out of steps without finding out.
+        """
+        if not self.board.check_validity():
+            return False
+        values = self.board.board
+        if self.solution is not None and np.all(
+            (values == 0) | (values == self.solution)
+        ):
+            return True
+
+        solver = SudokuSolver(
+            logic_rules=self.logic_rules,
+            backtracker=self.backtracker,
+            verbose=False,
+            board_value=values.copy(),
+        )
+        if not solver.run():
+            return False if solver.is_solvable is False else None
+        self.solution = solver.board.board.copy()
+        return True
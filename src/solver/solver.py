@@ -8,9 +8,11 @@ The rules are executed sequentially and if there is no result, the backtracker i
 @author Created by I. Petrov on 26/11/2023
 """
 import copy
-from typing import List
+from typing import Callable, List
+import numpy as np
 import src.parsing.sudoku_parser as sudparser
 from src.solver.board import Board
+from src.solver.context import SolveContext
 from src.exceptions import InvalidBoardException
 
 from src.logic.base_logic import BaseLogic, BaseBacktracker
@@ -19,50 +21,66 @@ from src.logic.singles_logic import ObviousSingles
 
 from src.animation import animate
 
+# The version of the solving behaviour. It should be increased whenever a change to the logic rules or the
+# backtrackers changes the outcome of a solve, which invalidates the results stored in a ResultCache.
+SOLVER_VERSION = "1"
+
+# The default maximum amount of steps of a solve.
+MAX_STEPS = 300000
+
 
 class SudokuSolver:
     """! The core class for executing a solution for a board."""
 
     def __init__(
         self,
-        file_path: str,
+        file_path: str = None,
         logic_rules: List[BaseLogic] = None,
         backtracker: BaseBacktracker = NaiveBacktracker,
         visualization: str = "none",
+        verbose: bool = True,
+        board_value: np.ndarray = None,
     ):
         """! Creates a solver wrapper for solving a board and displaying the sudoku logic.
 
         @param file_path - The path to the file containing the board.
         @param logic_rules - A list of logic rules.
         @param backtracker - The backtracking algorithm to apply when a deadlock is reached.
-        @param visualization - What type of visualization to use."""
+        @param visualization - What type of visualization to use.
+        @param verbose - Whether to print progress and results.
+        @param board_value - A 9x9 array of givens to solve instead of reading file_path."""
 
         self.is_solvable = None
+        self.n_steps = 0
+        self.verbose = verbose
+        # All progress of this solve is reported through its context.
+        self.context = SolveContext(print if verbose else None)
 
         self.print_results = visualization == "text"
         self.store_states = visualization == "animate"
 
-        # Read from given file
-        try:
-            board_value = sudparser.parse(file_path)
-        except InvalidBoardException as error:
-            print(error)
-            print("Invalid input setup - sudoku has no solution")
-            self.is_solvable = False
-            return
-        except FileNotFoundError:
-            print(f"Could not find file {file_path}.")
-            self.is_solvable = False
-            return
+        # Read from given file unless the givens were passed directly
+        if board_value is None:
+            try:
+                board_value = sudparser.parse(file_path, verbose)
+            except InvalidBoardException as error:
+                self.log(error)
+                self.log("Invalid input setup - sudoku has no solution")
+                self.is_solvable = False
+                return
+            except FileNotFoundError:
+                self.log(f"Could not find file {file_path}.")
+                self.is_solvable = False
+                return
 
         # Attempt board setup
         try:
-            self.board = Board(board_value)
-            print("Final preprocessed board:")
-            print(self.__str__())
+            self.board = Board(board_value, self.context)
+            self.log("Final preprocessed board:")
+            self.log(self.__str__())
         except InvalidBoardException as error:
-            print(error)
-            print("Invalid board setup - sudoku has no solution")
+            self.log(error)
+            self.log("Invalid board setup - sudoku has no solution")
             self.is_solvable = False
             return
 
@@ -79,6 +97,12 @@ class SudokuSolver:
 
         self.backtracker = backtracker
 
+    def log(self, *args):
+        """! Prints the given arguments unless the solver was created as non-verbose.
+
+        @param args - The values to print."""
+        self.context.log(*args)
+
     def attempt_backtrack(self, backtracker: BaseBacktracker) -> bool:
         """! Attempts to backtrack a single step.
 
@@ -90,7 +114,7 @@ class SudokuSolver:
             backtracker.backtrack(self.board)
             return True
         except InvalidBoardException:
-            print("Backtracking failed: the board has no solution.")
+            self.log("Backtracking failed: the board has no solution.")
             return False
 
     def execute_step(
@@ -114,20 +138,25 @@ class SudokuSolver:
                 rule_result = rule.step(self.board)
             except InvalidBoardException:
                 if self.print_results:
-                    print("Board failed - backtracking to previous state.")
+                    self.log("Board failed - backtracking to previous state.")
                 # If there was an issue with executing a rule - attempt backtracking or fail otherwise.
                 backtrack_result = self.attempt_backtrack(backtracker)
             # End step if board is not solved and rule has succeeded
             if rule_result and not self.board.is_solved():
                 break
             elif rule_result:
-                print("Solution found:")
-                print(self.board)
+                self.log("Solution found:")
+                self.log(self.board)
                 return True
 
-        # If last rule failed (meaning all failed), backtracker makes a guess.
+        # If a contradiction is detected, abandon the branch immediately.
+        # Otherwise, if last rule failed (meaning all failed), backtracker makes a guess.
 
-        if not rule_result or not self.board.check_validity():
+        if backtrack_result and not self.board.check_validity():
+            if self.print_results:
+                self.log("Contradiction found - backtracking to previous state.")
+            backtrack_result = self.attempt_backtrack(backtracker)
+        elif not rule_result:
             try:
                 backtracker.step(self.board)
             except InvalidBoardException:
@@ -138,28 +167,47 @@ class SudokuSolver:
 
         return None
 
-    def run(self, max_steps: int = 300000, animation_path: str = None) -> bool:
+    def run(
+        self,
+        max_steps: int = MAX_STEPS,
+        animation_path: str = None,
+        rules: List[BaseLogic] = None,
+        backtracker: BaseBacktracker = None,
+        should_stop: Callable[[], bool] = None,
+    ) -> bool:
         """! Executes steps sequentially until either a solution is reached or a lot of time has passed.
 
         @param max_steps - The maximum amount of steps the solver is allowed to take.
         @param animation_path - The path in which to store the animation_file.
+        @param rules - Instances of the logic rules, which may be shared with other solves.
+        By default, they are created from the logic rules of the solver.
+        @param backtracker - An instance of the backtracker, which may be shared with other solves.
+        By default, it is created from the backtracker of the solver.
+        @param should_stop - A function checked before every step, e.g. for a deadline or cancellation.
+        The solver gives up once it returns True.
         @return Whether the solver succeeded.
         """
         if not self.is_solvable and self.is_solvable is not None:
-            print("The board has no solution")
+            self.log("The board has no solution")
             return False
 
-        # Instantiate rules and backtracker
+        # Instantiate rules and backtracker, unless shared instances were given.
+        # The instances keep no state of the solve, which is held by the board and its context.
+        if rules is None:
+            rules = []
+            for rule in self.logic_rules:
+                rules.append(rule(print_results=self.print_results))
 
-        rules = []
-        for rule in self.logic_rules:
-            rules.append(rule(print_results=self.print_results))
+        if backtracker is None:
+            backtracker = self.backtracker(print_results=self.print_results)
 
-        backtracker = self.backtracker(print_results=self.print_results)
+        self.n_steps = 0
 
-        n_steps = 0
+        while self.is_solvable is None and self.n_steps < max_steps:
+            if should_stop is not None and should_stop():
+                self.log(f"Solving stopped after {self.n_steps} steps.")
+                return False
 
-        while self.is_solvable is None and n_steps < max_steps:
             step_result = self.execute_step(rules, backtracker)
 
             # Store state sequence for animation
@@ -169,17 +217,20 @@ class SudokuSolver:
                     copy.deepcopy(self.board.cell_possibilities)
                 )
 
-            n_steps += 1
+            self.n_steps += 1
 
             # Animate state sequence if we have reached a solution
             if step_result is not None:
+                # A failed step means the board was proven to have no solution.
+                if not step_result:
+                    self.is_solvable = False
                 if self.store_states:
                     ani = animate(self.board_states, self.possibility_states)
                     if animation_path is not None:
                         ani.save(animation_path, writer='imagemagick', fps=10)
                 return step_result
 
-        print(f"Could not find solution within {max_steps}.")
+        self.log(f"Could not find solution within {max_steps}.")
         return False
 
     def get_solution(self):
@@ -0,0 +1,282 @@
+"""!@file spool.py
+@brief Solves a corpus on several machines, coordinated only through a shared spool directory.
+
+@details Solves a corpus on several machines, coordinated only through a shared spool directory,
+e.g. on a network filesystem. The corpus is split into job files in the "pending" directory of the spool,
+each holding the paths and givens of a range of boards. A worker claims a job by renaming its file into
+the "claimed" directory under its own name - as renames are atomic, only one worker can succeed.
+The job is solved with the logic rules and backtracker recorded in the spool, and its results are
+written as a shard into the "results" directory, after which the claim is removed.
+
+While solving, a worker renews the lease on its job by touching the claimed file. A job whose lease has
+not been renewed within the lease timeout, e.g. because its worker crashed, is renamed back into the
+"pending" directory by any other worker. Lease times are compared with the local clock, so the clocks
+of the machines should be roughly synchronised, relative to the lease timeout. A job may still be solved
+twice, e.g. if its worker stalls for longer than the lease timeout - its shards then hold the same results,
+apart from the measured durations, and the last one written is kept. Once all shards are written, they are
+merged into a single report.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from typing import List, Optional, Tuple
+import numpy as np
+
+import src.parsing.config_parsing as cfg_parse
+from src.solver.corpus import load_corpus, create_arrays, solve_range, summarize
+
+
+def write_atomically(path: str, data: dict) -> None:
+    """! Writes a JSON file, so that other workers either see all of it or none of it.
+
+    @param path - The path of the file.
+    @param data - The content of the file.
+    """
+    directory, name = os.path.split(path)
+    temporary = os.path.join(
+        directory, f".{name}.{socket.gethostname()}-{os.getpid()}.tmp"
+    )
+    with open(temporary, "w") as f:
+        json.dump(data, f)
+    os.replace(temporary, path)
+
+
+def split_corpus(
+    paths: List[str],
+    spool_dir: str,
+    logic_names: List[str],
+    backtracker_name: str,
+    jobsize: int = 16,
+) -> int:
+    """! Parses a corpus and splits it into job files in a new spool directory.
+
+    @param paths - The paths to the files containing the boards.
+    @param spool_dir - The spool directory, which should not contain a previous spool.
+    @param logic_names - The names of the logic rules to solve with.
+    @param backtracker_name - The name of the backtracker to solve with.
+    @param jobsize - The number of boards of every job.
+    @throws InvalidStepException - If the logic rules or the backtracker do not exist.
+
+    @return The number of jobs.
+    """
+    for name in logic_names:
+        cfg_parse.string_to_step(name)
+    cfg_parse.parse_backtracker(backtracker_name)
+
+    for directory in ("pending", "claimed", "results"):
+        os.makedirs(os.path.join(spool_dir, directory), exist_ok=True)
+
+    givens, valid = load_corpus(paths)
+    n_jobs = 0
+    for start in range(0, len(paths), jobsize):
+        boards = [
+            "".join(str(value) for value in givens[index]) if valid[index] else None
+            for index in range(start, min(start + jobsize, len(paths)))
+        ]
+        job = {"paths": paths[start : start + jobsize], "boards": boards}
+        write_atomically(
+            os.path.join(spool_dir, "pending", f"job-{n_jobs:06d}.json"), job
+        )
+        n_jobs += 1
+
+    # The configuration is written last, so that workers only start on a complete spool.
+    config = {"logic": logic_names, "backtracker": backtracker_name, "n_jobs": n_jobs}
+    write_atomically(os.path.join(spool_dir, "spool.json"), config)
+    return n_jobs
+
+
+def claim_job(spool_dir: str, owner: str) -> Optional[str]:
+    """! Claims a pending job, renaming it into the claimed directory.
+
+    @param spool_dir - The spool directory.
+    @param owner - The name of the claiming worker.
+
+    @return The path of the claimed job file, or None if no job is pending.
+    """
+    pending = os.path.join(spool_dir, "pending")
+    for name in sorted(os.listdir(pending)):
+        if not name.startswith("job-"):
+            continue
+        claimed = os.path.join(spool_dir, "claimed", f"{name}@{owner}")
+        try:
+            os.rename(os.path.join(pending, name), claimed)
+        except FileNotFoundError:
+            # Another worker claimed the job first.
+            continue
+        os.utime(claimed)
+        return claimed
+    return None
+
+
+def recover_expired(spool_dir: str, lease: float) -> int:
+    """! Returns the claimed jobs whose lease has expired to the pending directory.
+
+    @param spool_dir - The spool directory.
+    @param lease - The lease timeout in seconds.
+
+    @return The number of recovered jobs.
+    """
+    claimed = os.path.join(spool_dir, "claimed")
+    n_recovered = 0
+    for name in os.listdir(claimed):
+        if not name.startswith("job-"):
+            continue
+        path = os.path.join(claimed, name)
+        try:
+            # Renaming a claimed file updates its change time, before its modification time is renewed.
+            status = os.stat(path)
+            if time.time() - max(status.st_mtime, status.st_ctime) < lease:
+                continue
+            os.rename(path, os.path.join(spool_dir, "pending", name.split("@")[0]))
+            n_recovered += 1
+        except FileNotFoundError:
+            # The job was finished, or recovered by another worker.
+            continue
+    return n_recovered
+
+
+def solve_job(
+    spool_dir: str, claimed: str, logic_rules: list, backtracker, lease: float
+) -> bool:
+    """! Solves a claimed job and writes its result shard, renewing the lease from a background thread.
+
+    @param spool_dir - The spool directory.
+    @param claimed - The path of the claimed job file.
+    @param logic_rules - A list of logic rules.
+    @param backtracker - The backtracking algorithm to apply when a deadlock is reached.
+    @param lease - The lease timeout in seconds.
+
+    @return Whether the shard was written, which is not the case if the lease was lost.
+    """
+    name = os.path.basename(claimed).split("@")[0]
+    shard = os.path.join(spool_dir, "results", name)
+    if not os.path.exists(shard):
+        with open(claimed) as f:
+            job = json.load(f)
+
+        givens = np.array(
+            [
+                [int(char) for char in board] if board is not None else [0] * 81
+                for board in job["boards"]
+            ],
+            dtype=np.int8,
+        ).reshape(-1, 81)
+        valid = np.array([board is not None for board in job["boards"]], dtype=bool)
+        arrays = create_arrays(givens, valid)
+
+        # The lease is renewed while a board is being solved, as a single board may take longer than it.
+        finished = threading.Event()
+        lost = threading.Event()
+
+        def renew() -> None:
+            """! Renews the lease until the job is finished or the claim is lost."""
+            while not finished.wait(lease / 4):
+                try:
+                    os.utime(claimed)
+                except FileNotFoundError:
+                    # The lease expired and the job was recovered by another worker.
+                    lost.set()
+                    return
+
+        renewer = threading.Thread(target=renew, daemon=True)
+        renewer.start()
+        try:
+            for index in range(len(givens)):
+                if lost.is_set():
+                    return False
+                solve_range(arrays, index, index + 1, logic_rules, backtracker)
+        finally:
+            finished.set()
+            renewer.join()
+
+        results = [
+            {
+                "path": path,
+                "solved": bool(arrays["solved"][index]),
+                "duration": float(arrays["durations"][index]),
+                "solution": "".join(str(value) for value in arrays["solutions"][index])
+                if arrays["solved"][index]
+                else None,
+            }
+            for index, path in enumerate(job["paths"])
+        ]
+        write_atomically(shard, {"results": results})
+
+    try:
+        os.remove(claimed)
+    except FileNotFoundError:
+        pass
+    return True
+
+
+def run_worker(
+    spool_dir: str, owner: str = None, lease: float = 60.0, poll: float = 1.0
+) -> int:
+    """! Claims and solves jobs until the shards of all jobs have been written.
+
+    @param spool_dir - The spool directory.
+    @param owner - The name of the worker, unique among all workers. By default, the host name
+    and the process ID.
+    @param lease - The time in seconds after which the job of a worker which stopped renewing its lease
+    is recovered.
+    @param poll - The time in seconds to wait between checks for jobs, once none is pending.
+
+    @return The number of jobs solved by this worker.
+    """
+    if owner is None:
+        owner = f"{socket.gethostname()}-{os.getpid()}"
+    with open(os.path.join(spool_dir, "spool.json")) as f:
+        config = json.load(f)
+    logic_rules = [cfg_parse.string_to_step(name) for name in config["logic"]]
+    backtracker = cfg_parse.parse_backtracker(config["backtracker"])
+    results = os.path.join(spool_dir, "results")
+
+    n_solved = 0
+    while True:
+        claimed = claim_job(spool_dir, owner)
+        if claimed is not None:
+            n_solved += solve_job(spool_dir, claimed, logic_rules, backtracker, lease)
+            continue
+
+        n_shards = sum(name.startswith("job-") for name in os.listdir(results))
+        if n_shards >= config["n_jobs"]:
+            return n_solved
+        if recover_expired(spool_dir, lease) == 0:
+            time.sleep(poll)
+
+
+def merge_results(
+    spool_dir: str, report_path: str = None
+) -> List[Tuple[str, bool, float]]:
+    """! Merges the result shards of all jobs, in the order of the corpus.
+
+    @param spool_dir - The spool directory.
+    @param report_path - The path of a JSON report to write, with the result of every board and the
+    summary per directory, or None.
+    @throws FileNotFoundError - If the shard of a job has not been written yet.
+
+    @return The path, whether the board was solved and the duration in seconds, for every file in order,
+    as returned by corpus.run_corpus.
+    """
+    with open(os.path.join(spool_dir, "spool.json")) as f:
+        config = json.load(f)
+
+    records = []
+    for job in range(config["n_jobs"]):
+        with open(os.path.join(spool_dir, "results", f"job-{job:06d}.json")) as f:
+            records += json.load(f)["results"]
+
+    results = [
+        (record["path"], record["solved"], record["duration"]) for record in records
+    ]
+    if report_path is not None:
+        report = {
+            "logic": config["logic"],
+            "backtracker": config["backtracker"],
+            "results": records,
+            "summary": summarize(results),
+        }
+        write_atomically(report_path, report)
+    return results
@@ -0,0 +1,122 @@
+"""!@file symmetry.py
+@brief Detection of the symmetries of a sudoku board.
+
+@details Detection of the symmetries of a sudoku board. An automorphism is a combination of
+a geometric transformation of the board (a rotation or reflection) and a relabeling of the numbers,
+which maps the board onto itself. If a board state is invariant under an automorphism, any
+branch of the search is equivalent to its image, which allows for pruning during backtracking.
+"""
+from typing import List
+import numpy as np
+
+_cells = np.arange(81).reshape(9, 9)
+
+# For each geometric transformation, the flattened index of the cell mapped onto each cell.
+GEOMETRIC_MAPS = {
+    "identity": _cells.flatten(),
+    "transposition": _cells.T.flatten(),
+    "anti-transposition": _cells[::-1, ::-1].T.flatten(),
+    "rotation 90": np.rot90(_cells, 1).flatten(),
+    "rotation 180": np.rot90(_cells, 2).flatten(),
+    "rotation 270": np.rot90(_cells, 3).flatten(),
+    "horizontal reflection": _cells[::-1].flatten(),
+    "vertical reflection": _cells[:, ::-1].flatten(),
+}
+
+
+class Automorphism:
+    """! A class representing a symmetry of the board - a geometric transformation, combined with
+    a relabeling of the numbers. The image of a board X is given by X'[q] = nums[X[cells[q]]].
+    """
+
+    def __init__(self, name: str, cells: np.ndarray, nums: np.ndarray):
+        """! Creates an automorphism.
+
+        @param name - A description of the automorphism.
+        @param cells - For each flattened cell index, the index of the cell mapped onto it.
+        @param nums - An array of length 10, mapping each number to its relabeled value (0 is kept as 0).
+        """
+        self.name = name
+        self.cells = cells
+        self.inverse_cells = np.argsort(cells)
+        self.nums = nums
+
+    def __str__(self) -> str:
+        """! Creates a string representation of the automorphism."""
+        relabeled = [
+            f"{num}->{self.nums[num]}" for num in range(1, 10) if self.nums[num] != num
+        ]
+        if len(relabeled) == 0:
+            return self.name
+        return f"{self.name} ({', '.join(relabeled)})"
+
+    def preserves(self, values: np.ndarray, possibilities: np.ndarray) -> bool:
+        """! Checks whether a board state, including the possibilities of each cell, is invariant.
+
+        @param values - The flattened board values.
+        @param possibilities - The digit-plane possibilities of the board, reshaped to 9x81.
+
+        @return Whether the automorphism maps the board state onto itself.
+        """
+        if not np.array_equal(self.nums[values[self.cells]], values):
+            return False
+
+        image = np.zeros_like(possibilities)
+        image[self.nums[1:] - 1] = possibilities[:, self.cells]
+        return np.array_equal(image, possibilities)
+
+    def map_guess(self, row: int, col: int, num: int) -> tuple:
+        """! Computes the image of a guess.
+
+        @param row - The row of the guessed cell.
+        @param col - The column of the guessed cell.
+        @param num - The guessed value.
+
+        @return The row, column and value of the equivalent guess.
+        """
+        cell = self.inverse_cells[9 * row + col]
+        return cell // 9, cell % 9, int(self.nums[num])
+
+
+def find_automorphisms(board: np.ndarray) -> List[Automorphism]:
+    """! Finds the automorphisms of a set of given numbers. For every geometric transformation, which
+    preserves the positions of the given numbers, the relabeling of the numbers is inferred if it exists.
+    Numbers which are not given can be freely swapped, so the swaps of pairs of these are also included.
+
+    @param board - A 9x9 array of the given numbers, with 0 marking an empty cell.
+
+    @return A list of all found non-trivial automorphisms.
+    """
+    values = np.asarray(board, dtype=np.int64).flatten()
+    missing = [num for num in range(1, 10) if num not in values]
+
+    automorphisms = []
+    for name, cells in GEOMETRIC_MAPS.items():
+        image = values[cells]
+        if not np.array_equal(image != 0, values != 0):
+            continue
+
+        # Infer the relabeling from the given cells - it must be consistent and injective.
+        nums = np.arange(10)
+        mapping = {}
+        for source, target in zip(image[values != 0], values[values != 0]):
+            if mapping.setdefault(source, target) != target:
+                break
+        else:
+            if len(set(mapping.values())) != len(mapping):
+                continue
+            for source, target in mapping.items():
+                nums[source] = target
+            if name != "identity" or np.any(nums != np.arange(10)):
+                automorphisms.append(Automorphism(name, cells, nums))
+
+    # Numbers which are not given can be swapped without changing the board.
+    for idx, num_a in enumerate(missing):
+        for num_b in missing[idx + 1 :]:
+            nums = np.arange(10)
+            nums[num_a], nums[num_b] = num_b, num_a
+            automorphisms.append(
+                Automorphism("identity", GEOMETRIC_MAPS["identity"], nums)
+            )
+
+    return automorphisms
@@ -0,0 +1,44 @@
+"""!@file test_batch.py
+@brief Unit tests for validating the batched solver.
+
+@details Unit tests for validating the batched solver. Verifies whether the lockstep propagation
+and search solve boards correctly and detect boards without a solution.
+"""
+
+import glob
+import numpy as np
+import src.parsing.sudoku_parser as sudparser
+from src.solver.board import HOUSE_ROWS, HOUSE_COLS
+from src.solver.batch import solve_batch, propagate_masks, givens_to_masks
+
+
+def test_batch_propagation() -> None:
+    """! Tests whether propagation alone solves an easy board and keeps all possibilities
+    of an empty board."""
+    givens = np.zeros((2, 81), dtype=np.int8)
+    givens[0] = sudparser.parse("test/samples/easy/0.txt", verbose=False).flatten()
+    masks = givens_to_masks(givens)
+    failed = propagate_masks(masks)
+
+    assert not np.any(failed)
+    assert np.all(np.isin(masks[0], 1 << np.arange(9)))
+    assert np.all(masks[1] == 0b111111111)
+
+
+def test_solve_batch() -> None:
+    """! Tests whether the hard, impossible and multiple solution samples are solved by a batch
+    with valid solutions agreeing with their givens."""
+    paths = sorted(glob.glob("test/samples/hard/*.txt"))
+    paths += sorted(glob.glob("test/samples/many_solutions/*.txt"))
+    paths += sorted(glob.glob("test/samples/impossible/*.txt"))
+    paths += ["test/samples/missing.txt"]
+    solutions, solved = solve_batch(paths, batch_size=5)
+
+    n_solvable = len(paths) - len(glob.glob("test/samples/impossible/*.txt")) - 1
+    assert np.all(solved[:n_solvable])
+    assert not np.any(solved[n_solvable:])
+    for path, solution in zip(paths[:n_solvable], solutions):
+        givens = sudparser.parse(path, verbose=False)
+        assert np.all((givens == 0) | (givens == solution))
+        houses = np.sort(solution[HOUSE_ROWS, HOUSE_COLS], axis=1)
+        assert np.all(houses == np.arange(1, 10))
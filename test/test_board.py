@@ -10,6 +10,7 @@ possibility recomputation.
 
 import numpy as np
 from src.solver.board import Board
+from src.exceptions import InvalidBoardException
 
 
 def test_board_initialization() -> None:
@@ -68,3 +69,71 @@ def test_board_update():
         assert 7 not in cell_possibilities[0, i]
         # Check block updates
         assert 7 not in cell_possibilities[i % 3, i // 3]
+
+
+def test_board_symmetry():
+    """! Tests whether the symmetries of the given numbers are detected on board creation.
+    The board below contains the numbers 1-9 on the main diagonal, so it is invariant under transposition,
+    as well as under anti-transposition and a 180 degree rotation, if each number n is relabeled to 10 - n.
+    """
+    board_nums = np.diag(np.arange(1, 10))
+    board = Board(board_nums)
+
+    names = set(automorphism.name for automorphism in board.automorphisms)
+    assert names == set(["transposition", "anti-transposition", "rotation 180"])
+    for automorphism in board.automorphisms:
+        if automorphism.name == "rotation 180":
+            assert automorphism.map_guess(0, 1, 4) == (8, 7, 6)
+
+
+def test_board_validity():
+    """! Tests whether contradictions are detected on an empty board. The board becomes invalid if
+    a number cannot be placed anywhere in the first row, or if two cells of the first row are
+    both forced to the same value, even though every cell still has possibilities."""
+    board = Board(np.zeros((9, 9)))
+    assert board.check_validity()
+
+    for i in range(9):
+        board.eliminate(0, i, set([1]))
+    assert not board.check_validity()
+
+    board = Board(np.zeros((9, 9)))
+    board.eliminate(0, 0, set(range(2, 10)))
+    assert board.check_validity()
+    board.eliminate(0, 5, set(range(2, 10)))
+    assert not board.check_validity()
+
+
+def test_board_update_many():
+    """! Tests whether the board implementation correctly handles entering several values at once.
+    The possibilities of the affected rows, columns and blocks must match those after separate updates,
+    and entering the same value twice in a house must fail."""
+    board = Board(np.zeros((9, 9)))
+    board.update_many([0, 4], [0, 5], [7, 3])
+
+    expected = Board(np.zeros((9, 9)))
+    expected.update(0, 0, 7)
+    expected.update(4, 5, 3)
+
+    assert np.all(board.board == expected.board)
+    assert np.all(board.get_possibilities() == expected.get_possibilities())
+
+    try:
+        board.update_many([1, 1], [1, 8], [5, 5])
+        assert False
+    except InvalidBoardException:
+        pass
+
+
+def test_board_analysis():
+    """! Tests whether the shared analysis of the board is reused while the state is unchanged,
+    and recomputed once the possibilities change."""
+    board = Board(np.zeros((9, 9)))
+    analysis = board.analysis
+    assert board.analysis is analysis
+    assert np.all(analysis.counts == 9)
+
+    board.eliminate(0, 0, set([1, 2]))
+    assert board.analysis is not analysis
+    assert board.analysis.counts[0, 0] == 7
+    assert not board.analysis.tensor[0, 0, 0]
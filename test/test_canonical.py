@@ -0,0 +1,70 @@
+"""!@file test_canonical.py
+@brief Unit tests for validating canonical forms and the solution cache.
+
+@details Unit tests for validating canonical forms and the solution cache. Verifies whether
+equivalent boards share their canonical form, and whether cached solutions are mapped back
+onto the transformed boards.
+"""
+
+import numpy as np
+import src.parsing.sudoku_parser as sudparser
+from src.solver.board import HOUSE_ROWS, HOUSE_COLS
+from src.solver.canonical import canonicalize, SolutionCache
+
+
+def transform(board: np.ndarray) -> np.ndarray:
+    """! Transposes a board, swaps two of its bands, two columns within a stack and relabels the numbers.
+
+    @param board - A 9x9 array of values.
+
+    @return The transformed board.
+    """
+    rows = [3, 4, 5, 0, 1, 2, 6, 7, 8]
+    cols = [0, 2, 1, 3, 4, 5, 6, 7, 8]
+    nums = np.array([0, 5, 3, 9, 1, 2, 8, 7, 4, 6])
+    return nums[board.T[np.ix_(rows, cols)]].astype(np.int8)
+
+
+def test_canonicalize() -> None:
+    """! Tests whether equivalent boards have the same canonical form, and whether the transformation
+    maps a board onto its canonical form and back."""
+    for path in ["test/samples/hard/0.txt", "test/samples/many_solutions/0.txt"]:
+        givens = sudparser.parse(path, verbose=False)
+        canonical, transformation = canonicalize(givens)
+        assert np.array_equal(transformation.apply(givens), canonical)
+        assert np.array_equal(transformation.invert(canonical), givens)
+
+        transformed = transform(givens)
+        assert not np.array_equal(transformed, givens)
+        assert np.array_equal(canonicalize(transformed)[0], canonical)
+
+
+def test_solution_cache() -> None:
+    """! Tests whether a transformed board is answered from the cache with a valid solution, whether boards
+    without a solution are cached, whether repeated givens are answered, and whether the least recently used
+    solution is evicted.
+    """
+    cache = SolutionCache(max_size=2)
+    givens = sudparser.parse("test/samples/hard/0.txt", verbose=False)
+    assert cache.solve(givens) is not None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    transformed = transform(givens)
+    solution = cache.solve(transformed)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert np.all((transformed == 0) | (transformed == solution))
+    houses = np.sort(solution[HOUSE_ROWS, HOUSE_COLS], axis=1)
+    assert np.all(houses == np.arange(1, 10))
+    # The same givens are found without canonicalizing again.
+    assert np.array_equal(cache.solve(transformed.copy()), solution)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    impossible = sudparser.parse("test/samples/impossible/2.txt", verbose=False)
+    assert cache.solve(impossible) is None
+    assert cache.solve(transform(impossible)) is None
+    assert (cache.hits, cache.misses) == (3, 2)
+
+    cache.solve(sudparser.parse("test/samples/easy/0.txt", verbose=False))
+    assert len(cache) == 2
+    cache.solve(givens)
+    assert (cache.hits, cache.misses) == (3, 4)
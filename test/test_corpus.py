@@ -0,0 +1,75 @@
+"""!@file test_corpus.py
+@brief Unit tests for validating the parallel corpus runner.
+
+@details Unit tests for validating the parallel corpus runner. Verifies whether the results
+of a run over worker processes match the order and outcome of the files.
+"""
+
+import glob
+from functools import partial
+import numpy as np
+from src.solver.board import HOUSE_ROWS, HOUSE_COLS
+from src.solver.corpus import (
+    run_corpus,
+    summarize,
+    load_corpus,
+    solve_corpus,
+    solve_threaded,
+)
+from src.logic.backtracking import SelectiveBacktracker
+from src.logic.singles_logic import ObviousSingles, HiddenSingles
+
+
+def test_run_corpus() -> None:
+    """! Tests whether the easy and impossible samples are solved and summarised correctly
+    by a pool of 2 workers."""
+    paths = sorted(glob.glob("test/samples/easy/*.txt"))[:6]
+    paths += sorted(glob.glob("test/samples/impossible/*.txt"))
+    results = run_corpus(
+        paths,
+        [ObviousSingles, HiddenSingles],
+        SelectiveBacktracker,
+        workers=2,
+        chunksize=2,
+    )
+
+    assert [path for path, _, _ in results] == paths
+    summary = summarize(results)
+    assert summary["easy"][:2] == (6, 6)
+    assert summary["impossible"][:2] == (0, len(paths) - 6)
+
+
+def test_shared_corpus() -> None:
+    """! Tests whether the solutions written by the workers into shared memory are valid
+    and agree with the givens, and whether unparsable files are skipped."""
+    paths = sorted(glob.glob("test/samples/hard/*.txt"))[:4] + [
+        "test/samples/missing.txt"
+    ]
+    givens, valid = load_corpus(paths)
+    assert valid.tolist() == [True] * 4 + [False]
+
+    solved, durations, solutions = solve_corpus(
+        givens, valid, [ObviousSingles, HiddenSingles], SelectiveBacktracker, workers=2
+    )
+    assert solved.tolist() == [True] * 4 + [False]
+    assert np.all(durations[:4] > 0)
+    assert np.all((givens == 0) | (givens == solutions))
+    houses = np.sort(solutions[:4].reshape(-1, 9, 9)[:, HOUSE_ROWS, HOUSE_COLS], axis=2)
+    assert np.all(houses == np.arange(1, 10))
+
+
+def test_threaded_corpus() -> None:
+    """! Tests whether solving on several threads with shared rule and (seeded) backtracker instances
+    gives the same solutions as solving the boards one after the other."""
+    paths = sorted(glob.glob("test/samples/hard/*.txt"))
+    givens, valid = load_corpus(paths)
+    rules = [ObviousSingles, HiddenSingles]
+    backtracker = partial(SelectiveBacktracker, seed=3)
+
+    solved, _, solutions = solve_corpus(givens, valid, rules, backtracker, workers=1)
+    threaded_solved, _, threaded_solutions = solve_threaded(
+        givens, valid, rules, backtracker, workers=4, chunksize=1
+    )
+    assert np.all(solved)
+    assert np.array_equal(solved, threaded_solved)
+    assert np.array_equal(solutions, threaded_solutions)
@@ -7,9 +7,20 @@ correctly finds the signal it was designed for.
 @author Created by I. Petrov on 26/11/2023
 """
 import numpy as np
+import pytest
 from src.solver.board import Board
 from src.logic.singles_logic import ObviousSingles, HiddenSingles
-from src.logic.complex_logic import HiddenPointers, ObviousPairs
+from src.logic.complex_logic import (
+    HiddenPointers,
+    ObviousPairs,
+    ObviousSubsets,
+    HiddenSubsets,
+    BoxLineReduction,
+)
+from src.logic.fish_logic import Fish
+from src.logic.wing_logic import XYWing
+import src.logic.template_logic as template_logic
+from src.logic.template_logic import Templates, get_templates, unpack_cells
 
 
 def test_obvious_singles_block():
@@ -307,3 +318,181 @@ def test_obvious_pairs():
     logic.step(board)
 
     assert board.cell_possibilities[0, 3] == set([6])
+
+
+def test_obvious_subsets():
+    """! Tests the Obvious subsets rule implementation for a triple. On an empty board, the first
+    three cells of the first row are restricted to {1, 2}, {2, 3} and {1, 3}. As these three cells
+    share only three values, the values 1, 2 and 3 must be removed from the rest of the first row
+    and the first block, while the other cells remain unaffected."""
+    board = Board(np.zeros((9, 9)))
+    board.cell_possibilities[0, 0] = set([1, 2])
+    board.cell_possibilities[0, 1] = set([2, 3])
+    board.cell_possibilities[0, 2] = set([1, 3])
+
+    logic = ObviousSubsets()
+    assert logic.step(board)
+
+    for i in range(3, 9):
+        assert board.cell_possibilities[0, i] == set(range(4, 10))
+    for i in range(3, 9):
+        assert board.cell_possibilities[i // 3, i % 3] == set(range(4, 10))
+    assert board.cell_possibilities[3, 0] == set(range(1, 10))
+    assert board.cell_possibilities[0, 1] == set([2, 3])
+
+    # All eliminations have been applied, so the next step makes no progress.
+    assert not logic.step(board)
+
+
+def test_hidden_subsets():
+    """! Tests the Hidden subsets rule implementation for a pair. On an empty board, the values
+    1 and 2 are removed from all cells of the first row, except the first two. As these values
+    can only be placed in these two cells, all other possibilities must be removed from them.
+    """
+    board = Board(np.zeros((9, 9)))
+    for i in range(2, 9):
+        board.cell_possibilities[0, i] -= set([1, 2])
+
+    logic = HiddenSubsets()
+    assert logic.step(board)
+
+    assert board.cell_possibilities[0, 0] == set([1, 2])
+    assert board.cell_possibilities[0, 1] == set([1, 2])
+    assert board.cell_possibilities[0, 2] == set(range(3, 10))
+    assert board.cell_possibilities[1, 0] == set(range(1, 10))
+
+    assert not logic.step(board)
+
+
+def test_fish():
+    """! Tests the Fish rule implementation for an X-Wing. On an empty board, the value 1 is
+    removed from the first and fifth rows, except for the second and eighth columns. As the value
+    must be placed in these columns in one of the two rows, it must be removed from the rest of
+    the second and eighth columns. Fish sizes without a name are rejected."""
+    board = Board(np.zeros((9, 9)))
+    for row in [0, 4]:
+        for col in range(9):
+            if col not in [1, 7]:
+                board.cell_possibilities[row, col].discard(1)
+
+    logic = Fish()
+    assert logic.step(board)
+
+    for row in range(9):
+        for col in [1, 7]:
+            assert (1 in board.cell_possibilities[row, col]) == (row in [0, 4])
+    assert 1 in board.cell_possibilities[2, 0]
+
+    assert not logic.step(board)
+    with pytest.raises(ValueError):
+        Fish(max_size=5)
+
+
+def test_box_line_reduction():
+    """! Tests the Box-line reduction rule implementation. On an empty board, the value 1 is
+    removed from the first row, except for the cells in the first block. As the value must be
+    placed within the first block for the first row, it must be removed from the rest of the block.
+    """
+    board = Board(np.zeros((9, 9)))
+    for col in range(3, 9):
+        board.cell_possibilities[0, col].discard(1)
+
+    logic = BoxLineReduction()
+    assert logic.step(board)
+
+    for row in range(1, 3):
+        for col in range(3):
+            assert 1 not in board.cell_possibilities[row, col]
+    assert 1 in board.cell_possibilities[0, 0]
+    assert 1 in board.cell_possibilities[3, 0]
+
+    assert not logic.step(board)
+
+
+def test_xy_wing():
+    """! Tests the XY-Wing rule implementation. On an empty board, the pivot cell (1, 1) is restricted
+    to {1, 2}, and the wing cells (1, 5) and (5, 1) to {1, 3} and {2, 3}. Whichever value the pivot
+    takes, one of the wings must be a 3, so the value is removed from the cell (5, 5), which sees both
+    wings."""
+    board = Board(np.zeros((9, 9)))
+    board.eliminate(0, 0, set(range(3, 10)))
+    board.eliminate(0, 4, set([2]) | set(range(4, 10)))
+    board.eliminate(4, 0, set([1]) | set(range(4, 10)))
+
+    logic = XYWing()
+    assert logic.step(board)
+
+    assert 3 not in board.cell_possibilities[4, 4]
+    assert 3 in board.cell_possibilities[4, 5]
+    assert 3 in board.cell_possibilities[0, 4]
+
+    assert not logic.step(board)
+
+
+def test_xyz_wing():
+    """! Tests the XYZ-Wing rule implementation. On an empty board, the pivot cell (1, 1) is restricted
+    to {1, 2, 3}, and the wing cells (1, 5) and (2, 2) to {1, 3} and {2, 3}. The value 3 is removed
+    from the cells which see the pivot and both wings - (1, 2) and (1, 3), but not from (2, 5), which
+    does not see the pivot."""
+    board = Board(np.zeros((9, 9)))
+    board.eliminate(0, 0, set(range(4, 10)))
+    board.eliminate(0, 4, set([2]) | set(range(4, 10)))
+    board.eliminate(1, 1, set([1]) | set(range(4, 10)))
+
+    logic = XYWing()
+    assert logic.step(board)
+
+    assert 3 not in board.cell_possibilities[0, 1]
+    assert 3 not in board.cell_possibilities[0, 2]
+    assert 3 in board.cell_possibilities[1, 4]
+    assert 3 in board.cell_possibilities[0, 0]
+
+
+def test_template_generation():
+    """! Tests whether the generated templates are all distinct and contain exactly one cell
+    in every row, column and block."""
+    templates = get_templates()
+    cells = unpack_cells(templates).reshape(-1, 9, 9)
+
+    assert len(np.unique(templates, axis=0)) == 46656
+    assert np.all(cells.sum(axis=1) == 1)
+    assert np.all(cells.sum(axis=2) == 1)
+    assert np.all(cells.reshape(-1, 3, 3, 3, 3).sum(axis=(2, 4)) == 1)
+
+
+def test_template_cache(tmp_path, monkeypatch):
+    """! Tests whether the templates are stored in the disk cache when a location is given,
+    and loaded from it afterwards."""
+    path = tmp_path / "templates.npy"
+    monkeypatch.setattr(template_logic, "TEMPLATE_CACHE_PATH", str(path))
+    monkeypatch.setattr(template_logic, "_templates", None)
+    templates = get_templates()
+    assert path.exists()
+
+    monkeypatch.setattr(template_logic, "_templates", None)
+    assert np.array_equal(get_templates(), templates)
+
+
+def test_templates():
+    """! Tests the Templates rule implementation. Given the board below, all templates of the
+    number 1 must pass through the first cell of the second row, so it is placed there.
+    Board:
+    [0, 0, 0, 0, 0, 0, 0, 0, 1],
+    [0, 4, 5, 0, 0, 0, 0, 0, 0],
+    [6, 7, 8, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0]"""
+    board_nums = np.zeros((9, 9))
+    board_nums[0, 8] = 1
+    board_nums[1, 1:3] = [4, 5]
+    board_nums[2, 0:3] = [6, 7, 8]
+    board = Board(board_nums)
+
+    logic = Templates()
+    assert logic.step(board)
+
+    assert board.board[1, 0] == 1
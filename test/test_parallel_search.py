@@ -0,0 +1,45 @@
+"""!@file test_parallel_search.py
+@brief Unit tests for validating the parallel search of a single board.
+
+@details Unit tests for validating the parallel search of a single board. Verifies whether the
+first solution found is valid, whether all solutions are counted across the workers, and whether
+a search cut short by its timeout is reported as unfinished.
+"""
+
+import numpy as np
+import src.parsing.sudoku_parser as sudparser
+from src.solver.board import HOUSE_ROWS, HOUSE_COLS
+from src.solver.parallel_search import parallel_search
+
+
+def test_parallel_first_solution() -> None:
+    """! Tests whether the first solution found for a hard board is valid and agrees with its givens."""
+    givens = sudparser.parse("test/samples/hard/1.txt", verbose=False)
+    solution, n_solutions, finished = parallel_search(givens, workers=2)
+
+    assert finished
+    assert n_solutions >= 1
+    assert np.all((givens == 0) | (givens == solution))
+    houses = np.sort(solution[HOUSE_ROWS, HOUSE_COLS], axis=1)
+    assert np.all(houses == np.arange(1, 10))
+
+
+def test_parallel_count_all() -> None:
+    """! Tests whether all 125 solutions of the sample with multiple solutions are counted,
+    and whether an impossible board has none."""
+    givens = sudparser.parse("test/samples/many_solutions/0.txt", verbose=False)
+    solution, n_solutions, finished = parallel_search(givens, workers=2, count_all=True)
+    assert finished
+    assert n_solutions == 125
+    assert solution is not None
+
+    givens = sudparser.parse("test/samples/impossible/1.txt", verbose=False)
+    assert parallel_search(givens, workers=2, count_all=True) == (None, 0, True)
+
+
+def test_parallel_timeout() -> None:
+    """! Tests whether counting the solutions of an empty board is reported as unfinished once
+    the timeout is reached."""
+    givens = np.zeros((9, 9), dtype=np.int8)
+    _, _, finished = parallel_search(givens, workers=2, count_all=True, timeout=0.2)
+    assert not finished
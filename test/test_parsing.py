@@ -13,6 +13,7 @@ import src.parsing.sudoku_parser as sudparser
 import src.parsing.config_parsing as cfg_parser
 import numpy as np
 import os
+import warnings
 
 from src.logic.singles_logic import ObviousSingles
 from src.logic.backtracking import SelectiveBacktracker
@@ -146,6 +147,33 @@ def test_cleaning() -> None:
     )
 
 
+def test_single_warning(capsys, tmp_path) -> None:
+    """! Tests whether all problems found while cleaning a noisy file are reported in a single warning,
+    also when parsing quietly or reading a non-ASCII file, and whether the raw data is not printed.
+    """
+    dir = os.path.dirname(os.path.realpath(__file__))
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        sudparser.parse(f"{dir}/samples/noisy_11x11.txt")
+    assert len(caught) == 1
+    assert "too long" in str(caught[0].message)
+    assert "noisy_11x11.txt" in str(caught[0].message)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        sudparser.parse(f"{dir}/samples/noisy_11x11.txt", verbose=False)
+    assert len(caught) == 1
+
+    path = tmp_path / "accented.txt"
+    with open(f"{dir}/samples/noisy_11x11.txt", encoding="utf-8") as f:
+        path.write_text("é" + f.read(), encoding="utf-8")
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        sudparser.parse(str(path), verbose=False)
+    assert len(caught) == 1
+    assert "accented.txt" in str(caught[0].message)
+    assert "Raw data" not in capsys.readouterr().out
+
+
 def test_config_parsing():
     """! Tests whether the configuration parser behaves
     correctly on valid input. The assertions must match the provided sample configuration.
@@ -0,0 +1,45 @@
+"""!@file test_portfolio.py
+@brief Unit tests for validating the portfolio solver.
+
+@details Unit tests for validating the portfolio solver. Verifies whether the result of the
+first configuration to finish is a valid solution, or a failure for an impossible board,
+and whether failing configurations are ignored.
+"""
+
+import numpy as np
+import src.parsing.sudoku_parser as sudparser
+from src.solver.board import HOUSE_ROWS, HOUSE_COLS
+from src.solver.portfolio import solve_portfolio
+
+
+def test_portfolio() -> None:
+    """! Tests whether racing the default configurations solves a hard board and agrees
+    with its givens, and whether an impossible board is reported as having no solution.
+    """
+    givens = sudparser.parse("test/samples/hard/0.txt", verbose=False)
+    index, solution = solve_portfolio(givens)
+
+    assert index is not None
+    assert np.all((givens == 0) | (givens == solution))
+    houses = np.sort(solution[HOUSE_ROWS, HOUSE_COLS], axis=1)
+    assert np.all(houses == np.arange(1, 10))
+
+    givens = sudparser.parse("test/samples/impossible/1.txt", verbose=False)
+    index, solution = solve_portfolio(givens)
+    assert index is not None
+    assert solution is None
+
+
+def failing_backtracker(*args, **kwargs):
+    """! A backtracker which fails as soon as it is created."""
+    raise RuntimeError("Failed on purpose.")
+
+
+def test_portfolio_failures() -> None:
+    """! Tests whether configurations which fail do not decide the result, and whether the race
+    ends without a timeout once all of them failed.
+    """
+    givens = sudparser.parse("test/samples/hard/0.txt", verbose=False)
+    index, solution = solve_portfolio(givens, [([], failing_backtracker)] * 2)
+    assert index is None
+    assert solution is None
@@ -0,0 +1,67 @@
+"""!@file test_result_cache.py
+@brief Unit tests for validating the persistent result cache.
+
+@details Unit tests for validating the persistent result cache. Verifies whether corpus runs reuse
+stored results, and whether results are evicted when the cache is full or the solver version changes.
+"""
+
+import glob
+from functools import partial
+import numpy as np
+from src.solver.corpus import run_corpus
+from src.solver.result_cache import ResultCache
+from src.logic.backtracking import SelectiveBacktracker
+from src.logic.singles_logic import ObviousSingles, HiddenSingles
+
+
+def test_cached_corpus(tmp_path) -> None:
+    """! Tests whether a repeated corpus run reuses all stored results, including the failures,
+    and whether a different configuration does not."""
+    path = str(tmp_path / "results.db")
+    paths = sorted(glob.glob("test/samples/hard/*.txt"))[:3]
+    paths += sorted(glob.glob("test/samples/impossible/*.txt"))
+    rules = [ObviousSingles, HiddenSingles]
+
+    cache = ResultCache(path)
+    results = run_corpus(paths, rules, SelectiveBacktracker, workers=1, cache=cache)
+    assert (cache.hits, cache.misses) == (0, len(paths))
+    cache.close()
+
+    cache = ResultCache(path)
+    assert (
+        run_corpus(paths, rules, SelectiveBacktracker, workers=1, cache=cache)
+        == results
+    )
+    assert (cache.hits, cache.misses) == (len(paths), 0)
+
+    seeded = partial(SelectiveBacktracker, seed=1)
+    run_corpus(paths, rules, seeded, workers=1, cache=cache)
+    assert cache.misses == len(paths)
+
+    key = cache.make_key(np.zeros((9, 9), dtype=np.int8), rules, SelectiveBacktracker)
+    assert cache.get(key) is None
+    cache.close()
+
+
+def test_cache_eviction(tmp_path) -> None:
+    """! Tests whether the least recently used results are evicted, and whether the results
+    of another solver version are removed."""
+    path = str(tmp_path / "results.db")
+    cache = ResultCache(path, max_entries=2)
+    solution = np.arange(81).reshape(9, 9) % 9 + 1
+    cache.put("a", True, solution, 10, 0.1)
+    cache.put("b", False, None, 5, 0.2)
+    assert cache.get("a")[0] is True
+    cache.put("c", None, None, 300000, 1.0)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    solvable, stored, n_steps, duration = cache.get("a")
+    assert np.array_equal(stored, solution)
+    assert (n_steps, duration) == (10, 0.1)
+    assert cache.get("c")[0] is None
+    cache.close()
+
+    cache = ResultCache(path, version="other")
+    assert len(cache) == 0
+    cache.close()
@@ -0,0 +1,138 @@
+"""!@file test_service.py
+@brief Unit tests for validating the local solving service.
+
+@details Unit tests for validating the local solving service. Verifies the answers to valid and
+invalid requests, the per-request time and step limits, and the cancellation of the requests of a client
+which disconnects.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import socket
+import struct
+import numpy as np
+import src.parsing.sudoku_parser as sudparser
+from src.solver.board import HOUSE_ROWS, HOUSE_COLS
+from src.logic.backtracking import NaiveBacktracker
+from src.solver.service import SolverService, init_worker, solve_request
+
+
+BOARD = "".join(
+    str(value)
+    for value in sudparser.parse("test/samples/hard/0.txt", verbose=False).flat
+)
+
+
+async def exchange(port: int, requests: list) -> dict:
+    """! Sends requests to the service and waits for all of their answers.
+
+    @param port - The TCP port of the service.
+    @param requests - The requests to send.
+
+    @return The answers, by request ID.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for request in requests:
+        writer.write((json.dumps(request) + "\n").encode())
+    writer.write(b"not json\n")
+    await writer.drain()
+
+    answers = {}
+    for _ in range(len(requests) + 1):
+        answer = json.loads(await reader.readline())
+        answers[answer["id"]] = answer
+    writer.close()
+    await writer.wait_closed()
+    return answers
+
+
+async def run_service_requests() -> None:
+    """! Runs the requests of test_service against a service on a single worker process."""
+    service = SolverService(workers=1, max_pending=1)
+    server = await service.serve(port=0)
+    port = server.sockets[0].getsockname()[1]
+    slow = {"board": BOARD, "logic": [], "backtracker": "NaiveBacktracker"}
+
+    try:
+        answers = await exchange(
+            port,
+            [
+                {"id": 1, "board": BOARD},
+                {"id": 2, "board": BOARD[:80]},
+                {"id": 3, "board": BOARD, "logic": ["NoSuchRule"]},
+                dict(slow, id=4, timeout=0.5),
+                {"id": 7, "board": BOARD, "timeout": "x"},
+                {"id": 8, "board": BOARD, "timeout": -1},
+            ],
+        )
+        assert answers[1]["status"] == "solved"
+        solution = np.array([int(char) for char in answers[1]["solution"]]).reshape(
+            9, 9
+        )
+        givens = np.array([int(char) for char in BOARD]).reshape(9, 9)
+        assert np.all((givens == 0) | (givens == solution))
+        houses = np.sort(solution[HOUSE_ROWS, HOUSE_COLS], axis=1)
+        assert np.all(houses == np.arange(1, 10))
+
+        assert answers[2]["status"] == "error"
+        assert answers[3]["status"] == "error"
+        assert answers[4]["status"] == "timeout"
+        assert answers[7]["status"] == "error"
+        assert answers[8]["status"] == "error"
+        assert answers[None]["status"] == "error"
+
+        # A client which closes its side of the connection still receives its answers.
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write((json.dumps({"id": 11, "board": BOARD}) + "\n").encode())
+        writer.write(b"x" * 70000 + b"\n")
+        writer.write_eof()
+        answers = [json.loads(line) for line in (await reader.read()).splitlines()]
+        writer.close()
+        await writer.wait_closed()
+        statuses = {answer["id"]: answer["status"] for answer in answers}
+        assert statuses[11] == "solved"
+        assert statuses[None] == "error"
+
+        # A disconnecting client frees the only slot, even with requests waiting for it,
+        # so the next request is solved.
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        for request_id in (5, 9, 10):
+            writer.write((json.dumps(dict(slow, id=request_id)) + "\n").encode())
+        await writer.drain()
+        await asyncio.sleep(0.5)
+        # Resetting the connection, rather than closing it gracefully.
+        linger = struct.pack("ii", 1, 0)
+        writer.get_extra_info("socket").setsockopt(
+            socket.SOL_SOCKET, socket.SO_LINGER, linger
+        )
+        writer.transport.abort()
+
+        answers = await asyncio.wait_for(
+            exchange(port, [{"id": 6, "board": BOARD}]), timeout=10
+        )
+        assert answers[6]["status"] == "solved"
+    finally:
+        server.close()
+        await server.wait_closed()
+        service.close()
+
+
+def test_service() -> None:
+    """! Tests whether the service solves valid requests, reports invalid requests and requests
+    out of time, and cancels the requests of a client once it disconnects.
+    """
+    asyncio.run(run_service_requests())
+
+
+def test_step_limit() -> None:
+    """! Tests whether a request which reaches the step limit is reported as unknown, and only a board
+    proven to have no solution as unsolvable.
+    """
+    init_worker(multiprocessing.Array("b", 1, lock=False))
+    givens = np.array([int(char) for char in BOARD], dtype=np.int8).reshape(9, 9)
+    assert solve_request(0, givens, [], NaiveBacktracker, None, 10) == ("unknown", None)
+
+    impossible = sudparser.parse("test/samples/impossible/1.txt", verbose=False)
+    status, _ = solve_request(0, impossible, [], NaiveBacktracker, None)
+    assert status == "unsolvable"
@@ -0,0 +1,45 @@
+"""!@file test_session.py
+@brief Unit tests for validating the interactive solving session.
+
+@details Unit tests for validating the interactive solving session. Verifies whether edits recompute
+the affected possibilities and whether hints and solvability checks follow the edits.
+"""
+
+import numpy as np
+import src.parsing.sudoku_parser as sudparser
+from src.solver.session import SolverSession
+
+
+def test_session_edits() -> None:
+    """! Tests whether setting and clearing a cell updates the possibilities of its peers,
+    and whether the board is solved by following the hints."""
+    session = SolverSession(sudparser.parse("test/samples/medium/0.txt"))
+    assert session.is_solvable()
+
+    session.set_cell(0, 1, 6)
+    assert session.board.board[0, 1] == 6
+    assert 6 not in session.board.cell_possibilities[8, 1]
+    session.clear_cell(0, 1)
+    assert session.board.board[0, 1] == 0
+    assert 6 in session.board.cell_possibilities[8, 1]
+
+    hint = session.hint()
+    while hint is not None:
+        rule, row, col, value = hint
+        assert session.solution[row, col] == value
+        session.set_cell(row, col, value)
+        hint = session.hint()
+    assert session.board.is_solved()
+
+
+def test_session_contradiction() -> None:
+    """! Tests whether entering a wrong value makes the board unsolvable until it is corrected."""
+    session = SolverSession(sudparser.parse("test/samples/medium/0.txt"))
+    assert session.is_solvable()
+    solution = session.solution.copy()
+
+    session.set_cell(0, 1, solution[0, 1] % 9 + 1)
+    assert session.is_solvable() is False
+    session.set_cell(0, 1, solution[0, 1])
+    assert session.is_solvable()
+    assert np.array_equal(session.solution, solution)
@@ -0,0 +1,89 @@
+"""!@file test_spool.py
+@brief Unit tests for validating the spool-based distributed runner.
+
+@details Unit tests for validating the spool-based distributed runner. Verifies whether jobs
+solved by several worker processes, including a job left behind by a crashed worker,
+are merged into the results of the whole corpus in order, and whether the lease is kept
+while a single board takes longer than it.
+"""
+
+import glob
+import json
+import multiprocessing
+import os
+import time
+import src.solver.spool as spool_module
+from src.logic.backtracking import SelectiveBacktracker
+from src.logic.singles_logic import ObviousSingles
+from src.solver.corpus import summarize
+from src.solver.spool import (
+    split_corpus,
+    claim_job,
+    recover_expired,
+    solve_job,
+    run_worker,
+    merge_results,
+)
+
+
+def test_spool(tmp_path) -> None:
+    """! Tests whether 2 worker processes solve all jobs of a spool, recovering the job of a worker
+    which claimed it and never renewed its lease, and whether the merged report is complete.
+    """
+    paths = sorted(glob.glob("test/samples/easy/*.txt"))[:7]
+    paths += sorted(glob.glob("test/samples/impossible/*.txt"))
+    spool = str(tmp_path / "spool")
+    n_jobs = split_corpus(
+        paths, spool, ["ObviousSingles", "HiddenSingles"], "SelectiveBacktracker", 3
+    )
+    assert n_jobs == 4
+
+    # A worker which crashes right after claiming a job.
+    assert claim_job(spool, "crashed") is not None
+
+    workers = [
+        multiprocessing.Process(
+            target=run_worker, args=(spool, f"worker-{index}", 0.5, 0.05)
+        )
+        for index in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    assert os.listdir(os.path.join(spool, "pending")) == []
+    assert os.listdir(os.path.join(spool, "claimed")) == []
+
+    report_path = str(tmp_path / "report.json")
+    results = merge_results(spool, report_path)
+    assert [path for path, _, _ in results] == paths
+    summary = summarize(results)
+    assert summary["easy"][:2] == (7, 7)
+    assert summary["impossible"][:2] == (0, len(paths) - 7)
+
+    with open(report_path) as f:
+        report = json.load(f)
+    assert all(len(record["solution"]) == 81 for record in report["results"][:7])
+
+
+def test_lease_renewal(tmp_path, monkeypatch) -> None:
+    """! Tests whether the lease on a job is renewed while a board takes longer than the lease timeout."""
+    spool = str(tmp_path / "spool")
+    split_corpus(
+        ["test/samples/easy/0.txt"], spool, ["ObviousSingles"], "SelectiveBacktracker"
+    )
+    claimed = claim_job(spool, "worker")
+    solve_range = spool_module.solve_range
+
+    def slow_solve_range(*args) -> None:
+        """! Solves a board slowly, while another worker looks for expired leases."""
+        time.sleep(1)
+        assert recover_expired(spool, 0.5) == 0
+        solve_range(*args)
+
+    monkeypatch.setattr(spool_module, "solve_range", slow_solve_range)
+    logic_rules = [ObviousSingles]
+    assert solve_job(spool, claimed, logic_rules, SelectiveBacktracker, 0.5)
+    assert os.path.exists(os.path.join(spool, "results", "job-000000.json"))